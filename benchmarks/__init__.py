@@ -0,0 +1,11 @@
+"""
+Benchmarks of the PCA functions of pca_module.
+
+Run from the directory holding benchmarks, with pca_module installed:
+
+  python -m benchmarks --grid quick
+  python -m benchmarks --output results.json
+  python -m benchmarks --baseline results.json --threshold 10
+
+See suite for the cases and data for the data sets.
+"""
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Run the benchmarks: python -m benchmarks [options]
+
+The exit status is 1 if a case is slower than the baseline by more than the threshold.
+"""
+import argparse
+import sys
+
+from benchmarks.suite import compare, grids, read_results, run, write_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmarks of the PCA functions, with their default preprocessing '
+                                                 '(X is mean centered and standardized).')
+    parser.add_argument('--grid', choices=sorted(grids), default='full', help='cases to run (default: full)')
+    parser.add_argument('--engines', help='comma separated PCA functions, e.g. svd,nipals_c (default: all)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs of each case (default: 5)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare with the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent slower than the baseline that is a regression (default: 10)')
+    args = parser.parse_args(argv)
+
+    engines = args.engines and args.engines.split(',') or None
+    try:
+        results = run(args.grid, engines, args.repeat)
+    except ValueError as e: # unknown engine
+        parser.error(str(e))
+    if args.output:
+        write_results(results, args.output)
+
+    if args.baseline:
+        changes, regressions = compare(results, read_results(args.baseline), args.threshold)
+        print()
+        print('compared with %s (%i cases):' % (args.baseline, len(changes)))
+        for name, old, new, change in changes:
+            flag = change > args.threshold and '  REGRESSION' or ''
+            print('%-32s %10.3f ms -> %10.3f ms  %+7.1f%%%s' % (name, old * 1000, new * 1000, change, flag))
+        if regressions:
+            print('%i regressions above %g%%' % (len(regressions), args.threshold))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
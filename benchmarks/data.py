@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+"""
+Data sets of the benchmarks.
+
+The averaged Cheese data set (12 sets of 14 cheeses, from the speed test of
+PCA Module 1.0) and random matrices made the same way on every run.
+"""
+from numpy import array
+from numpy.random import RandomState
+
+
+# averaged Cheese data set:
+Cheese = {}
+Cheese[1] = array([[7.10, 2.70, 4.95, 5.35, 1.00, 4.50, 6.75, 3.20, 3.90,
+                    5.20, 4.60, 5.15, 4.65, 4.90, 1.00, 4.65, 4.90],
+                   [6.95, 1.95, 5.80, 5.65, 1.00, 5.65, 7.15, 2.35, 3.45,
+                    5.05, 5.10, 5.90, 5.20, 5.10, 1.00, 5.70, 5.00],
+                   [6.55, 4.00, 3.40, 2.65, 1.00, 2.40, 6.30, 4.00, 3.75,
+                    5.00, 5.00, 3.35, 4.10, 3.15, 1.00, 2.20, 4.55],
+                   [6.95, 2.65, 5.35, 4.75, 1.00, 4.90, 7.05, 2.55, 3.40,
+                    5.30, 5.25, 5.65, 4.40, 4.50, 1.00, 4.55, 5.10],
+                   [7.30, 1.75, 6.00, 5.35, 1.00, 6.20, 7.15, 1.70, 3.45,
+                    5.80, 5.75, 6.10, 4.95, 4.95, 1.00, 6.60, 5.10],
+                   [6.40, 4.05, 4.10, 2.95, 1.00, 2.80, 6.15, 3.85, 4.00,
+                    5.10, 5.00, 4.15, 4.55, 3.60, 1.00, 3.15, 4.65],
+                   [7.80, 1.60, 5.75, 5.65, 1.00, 6.35, 7.80, 1.00, 3.75,
+                    5.15, 5.15, 6.05, 5.05, 5.20, 1.00, 7.80, 4.90],
+                   [7.80, 1.00, 5.90, 5.50, 1.00, 7.55, 7.95, 1.00, 3.45,
+                    5.30, 5.70, 5.80, 5.05, 5.15, 1.00, 7.65, 4.80],
+                   [6.55, 3.80, 3.65, 2.50, 1.00, 2.15, 6.45, 3.40, 3.55,
+                    4.90, 4.75, 4.65, 4.30, 4.35, 1.00, 3.15, 4.55],
+                   [6.75, 4.05, 3.85, 2.75, 1.90, 1.70, 6.65, 3.20, 3.30,
+                    5.00, 4.85, 3.95, 3.60, 2.70, 1.95, 2.05, 4.60],
+                   [6.75, 4.25, 4.15, 3.35, 1.00, 1.80, 6.55, 3.85, 4.05,
+                    5.20, 5.30, 4.65, 4.15, 3.60, 1.00, 2.90, 4.95],
+                   [7.70, 1.00, 5.90, 5.65, 1.00, 6.90, 7.65, 1.00, 3.65,
+                    5.05, 4.95, 6.15, 5.05, 5.50, 1.00, 7.40, 5.15],
+                   [7.00, 6.00, 1.70, 1.00, 1.00, 1.00, 6.65, 5.80, 4.20,
+                    5.45, 4.45, 1.60, 3.50, 1.00, 1.00, 1.00, 5.15],
+                   [5.80, 5.35, 1.00, 1.00, 1.00, 1.00, 6.15, 5.95, 4.10,
+                    6.05, 4.95, 1.00, 3.35, 1.00, 1.00, 1.00, 4.75]])
+
+Cheese[2] = array([[6.75, 1.00, 4.65, 3.10, 2.60, 6.80, 7.70, 1.00, 2.60,
+                    5.30, 5.50, 4.50, 2.60, 2.75, 2.40, 6.65, 2.40],
+                   [7.15, 1.00, 4.75, 2.75, 1.65, 5.25, 6.70, 1.00, 2.00,
+                    4.90, 5.50, 4.55, 1.95, 2.60, 1.65, 3.65, 2.80],
+                   [6.05, 1.00, 4.45, 3.90, 2.45, 7.65, 7.15, 1.00, 2.25,
+                    5.90, 5.90, 4.55, 3.50, 3.45, 2.90, 8.20, 3.25],
+                   [5.30, 1.75, 4.35, 3.10, 1.00, 1.00, 6.15, 1.60, 2.05,
+                    5.85, 5.80, 3.95, 1.90, 3.35, 1.00, 1.00, 4.85],
+                   [5.60, 1.00, 5.00, 2.95, 1.15, 2.80, 6.55, 1.00, 2.25,
+                    6.40, 5.95, 5.65, 2.30, 3.00, 1.50, 3.30, 3.05],
+                   [5.95, 1.00, 4.90, 2.75, 1.70, 3.70, 6.95, 1.00, 2.15,
+                    4.60, 5.85, 5.10, 2.45, 2.35, 1.55, 3.75, 4.15],
+                   [8.10, 1.00, 4.65, 2.95, 2.70, 9.00, 7.95, 1.00, 2.25,
+                    5.50, 6.20, 4.40, 3.40, 4.10, 2.45, 9.00, 1.85],
+                   [7.60, 1.00, 3.85, 3.80, 2.45, 8.45, 7.45, 1.00, 2.30,
+                    5.05, 6.45, 4.35, 2.60, 3.90, 3.00, 8.40, 2.95],
+                   [6.95, 1.00, 5.40, 3.30, 2.00, 5.50, 7.40, 1.00, 2.05,
+                    4.80, 5.85, 5.15, 2.95, 2.95, 2.35, 6.65, 2.40],
+                   [5.50, 1.00, 5.20, 3.10, 1.45, 1.00, 5.90, 1.00, 2.00,
+                    4.85, 5.30, 4.90, 2.10, 3.00, 1.00, 1.00, 3.35],
+                   [6.40, 1.00, 4.90, 2.90, 1.70, 3.40, 6.55, 1.00, 2.10,
+                    4.90, 5.60, 4.90, 2.80, 3.95, 1.65, 3.85, 3.40],
+                   [7.35, 1.00, 3.85, 3.15, 2.60, 9.00, 8.40, 1.00, 1.95,
+                    4.50, 6.15, 3.90, 3.50, 3.65, 3.40, 9.00, 2.20],
+                   [5.45, 5.15, 1.55, 1.00, 1.00, 1.00, 6.35, 5.00, 2.35,
+                    5.90, 5.90, 1.95, 1.90, 1.00, 1.00, 1.00, 2.90],
+                   [5.60, 4.80, 1.50, 1.00, 1.00, 1.00, 6.15, 4.95, 1.95,
+                    6.45, 5.40, 2.20, 1.40, 1.00, 1.00, 1.00, 3.35]])
+
+Cheese[3] = array([[6.35, 4.55, 2.65, 2.00, 6.80, 3.50, 2.60, 5.50, 6.25,
+                    3.40, 3.20, 4.15, 5.00],
+                   [6.50, 4.45, 2.60, 3.50, 6.65, 3.95, 2.35, 4.85, 6.50,
+                    2.40, 2.95, 3.85, 4.70],
+                   [6.60, 4.20, 3.80, 1.00, 7.00, 2.60, 2.65, 5.65, 6.35,
+                    4.25, 3.05, 4.05, 4.70],
+                   [5.30, 5.30, 2.90, 2.10, 6.70, 4.50, 2.40, 4.95, 6.35,
+                    3.35, 2.65, 2.50, 4.85],
+                   [7.40, 1.80, 4.50, 5.80, 7.95, 1.70, 1.80, 5.60, 6.50,
+                    3.80, 3.10, 5.65, 4.55],
+                   [5.80, 6.10, 1.45, 1.00, 6.35, 5.45, 2.85, 4.60, 5.10,
+                    1.55, 2.10, 1.00, 4.90],
+                   [6.75, 4.60, 4.05, 2.55, 7.15, 2.85, 2.50, 4.60, 6.30,
+                    4.50, 3.15, 5.20, 4.85],
+                   [5.70, 4.55, 3.55, 1.00, 6.40, 4.05, 2.30, 4.60, 6.35,
+                    3.75, 2.95, 2.05, 5.10],
+                   [6.10, 4.75, 2.30, 1.00, 6.75, 4.05, 2.80, 5.10, 6.10,
+                    3.00, 2.75, 2.50, 4.90],
+                   [6.30, 3.65, 3.80, 1.00, 6.90, 3.20, 2.40, 5.00, 6.70,
+                    4.15, 3.15, 3.80, 4.95],
+                   [6.45, 4.20, 2.90, 3.00, 6.85, 3.65, 2.10, 4.90, 6.20,
+                    2.75, 1.95, 3.90, 4.80],
+                   [6.75, 3.80, 3.25, 1.85, 7.30, 1.80, 2.15, 5.00, 6.90,
+                    3.25, 3.10, 4.90, 4.85],
+                   [5.75, 5.75, 1.00, 1.00, 6.80, 4.75, 2.45, 5.60, 6.60,
+                    3.95, 3.00, 1.00, 4.95],
+                   [5.65, 5.65, 1.50, 1.00, 6.75, 4.00, 1.95, 5.65, 6.80,
+                    3.20, 2.80, 1.00, 5.30]])
+
+Cheese[4] = array([[6.50, 3.85, 5.00, 2.70, 1.30, 2.55, 6.60, 4.70, 3.90,
+                    6.55, 6.00, 3.15, 3.40, 1.55, 1.00, 1.60, 4.80],
+                   [6.30, 3.80, 5.50, 2.35, 1.40, 1.70, 7.05, 4.05, 4.00,
+                    6.80, 5.60, 5.55, 4.30, 1.90, 1.00, 3.45, 4.75],
+                   [6.25, 3.85, 2.95, 1.75, 2.05, 1.00, 6.55, 4.55, 3.50,
+                    6.10, 5.50, 3.20, 3.75, 1.45, 1.00, 1.25, 4.80],
+                   [6.65, 3.25, 5.45, 2.70, 1.00, 2.50, 6.80, 3.80, 4.30,
+                    5.80, 6.25, 5.10, 4.15, 2.65, 1.00, 2.65, 4.85],
+                   [6.65, 3.60, 5.80, 2.50, 1.00, 3.95, 7.05, 3.50, 4.05,
+                    7.20, 6.10, 4.75, 4.15, 1.90, 1.00, 2.60, 4.50],
+                   [6.50, 5.75, 3.10, 2.25, 1.00, 2.15, 6.45, 6.45, 3.95,
+                    5.50, 5.25, 3.05, 3.65, 2.20, 1.00, 2.15, 4.55],
+                   [6.25, 6.30, 2.05, 1.00, 1.00, 1.00, 6.50, 5.50, 3.85,
+                    5.75, 5.65, 3.15, 3.20, 2.05, 1.00, 1.00, 4.65],
+                   [7.40, 1.95, 7.95, 2.25, 1.00, 5.20, 7.60, 2.50, 3.80,
+                    5.55, 5.95, 6.40, 4.40, 2.55, 1.00, 4.15, 4.60],
+                   [6.45, 3.85, 5.05, 2.65, 1.50, 2.00, 6.80, 3.65, 3.75,
+                    5.95, 5.35, 5.30, 3.80, 1.95, 1.00, 3.05, 4.45],
+                   [6.05, 4.55, 3.35, 2.00, 1.00, 1.35, 6.95, 4.80, 4.20,
+                    5.75, 6.10, 4.10, 3.90, 2.00, 1.40, 2.00, 4.45],
+                   [6.10, 3.85, 5.25, 1.00, 1.00, 2.35, 7.10, 3.00, 4.10,
+                    5.90, 6.05, 6.00, 4.45, 2.05, 1.00, 4.60, 4.30],
+                   [6.50, 3.40, 5.55, 2.75, 1.20, 3.30, 7.20, 2.25, 3.60,
+                    5.45, 5.50, 6.70, 4.25, 2.95, 1.00, 4.60, 4.80],
+                   [6.50, 7.25, 1.00, 1.00, 1.00, 1.00, 7.05, 7.90, 4.40,
+                    6.20, 5.10, 1.00, 2.90, 1.00, 1.00, 1.00, 4.80],
+                   [6.50, 5.10, 4.10, 1.00, 1.00, 1.25, 6.90, 4.10, 4.10,
+                    7.50, 5.65, 3.90, 4.10, 1.00, 1.00, 1.30, 4.80]])
+
+Cheese[5] = array([[6.85, 3.90, 3.75, 2.05, 1.70, 3.45, 7.20, 3.30, 2.25,
+                    5.15, 5.10, 4.00, 4.00, 2.15, 1.65, 3.50, 3.25],
+                   [6.90, 2.75, 4.15, 1.60, 1.00, 3.75, 7.05, 2.70, 2.65,
+                    4.80, 4.60, 4.00, 3.45, 1.80, 1.45, 3.85, 3.10],
+                   [6.40, 2.35, 4.90, 2.40, 1.00, 5.05, 7.30, 1.75, 2.20,
+                    4.90, 5.60, 5.15, 4.70, 2.65, 1.90, 5.90, 3.55],
+                   [7.15, 2.35, 4.65, 2.20, 1.75, 4.85, 7.60, 1.85, 2.15,
+                    4.60, 5.45, 5.25, 4.10, 2.20, 2.25, 5.85, 3.25],
+                   [6.35, 3.50, 3.60, 1.40, 2.05, 3.40, 6.85, 3.25, 2.30,
+                    4.70, 4.40, 3.75, 3.55, 1.65, 2.15, 3.30, 3.15],
+                   [7.05, 2.60, 4.50, 1.85, 4.25, 4.00, 7.20, 2.55, 2.75,
+                    5.05, 4.80, 4.45, 3.70, 1.60, 2.60, 4.05, 3.25],
+                   [7.20, 2.65, 4.75, 2.25, 4.20, 4.15, 7.45, 2.60, 2.55,
+                    5.10, 5.60, 5.15, 5.05, 1.80, 3.30, 4.55, 3.70],
+                   [7.00, 2.45, 4.55, 2.25, 1.50, 4.70, 7.10, 2.55, 2.65,
+                    4.55, 4.45, 4.45, 3.35, 1.50, 1.45, 4.75, 3.10],
+                   [6.65, 3.50, 3.70, 1.85, 1.00, 2.15, 6.35, 3.70, 3.05,
+                    4.65, 4.15, 3.50, 3.55, 1.00, 1.00, 2.10, 3.10],
+                   [6.55, 3.80, 3.10, 1.00, 1.00, 2.10, 6.50, 3.55, 3.05,
+                    4.50, 3.70, 3.05, 3.15, 1.00, 1.00, 2.25, 3.15],
+                   [6.70, 3.50, 3.65, 1.65, 1.40, 3.20, 6.95, 2.95, 2.45,
+                    4.95, 4.85, 4.25, 4.05, 1.75, 1.50, 4.25, 3.15],
+                   [7.00, 2.85, 3.15, 2.05, 2.00, 3.35, 7.45, 2.30, 3.25,
+                    5.10, 5.35, 4.80, 4.15, 1.75, 2.65, 5.20, 3.10],
+                   [6.50, 4.20, 3.15, 1.00, 1.00, 1.55, 6.75, 3.25, 2.50,
+                    4.70, 4.25, 3.40, 3.85, 1.75, 1.00, 2.80, 3.05],
+                   [6.30, 5.00, 2.20, 1.00, 1.00, 1.00, 6.15, 5.45, 2.25,
+                    4.60, 2.75, 1.45, 3.35, 1.00, 1.00, 1.00, 3.10]])
+
+Cheese[6] = array([[5.50, 2.85, 3.20, 1.45, 1.00, 4.15, 6.65, 2.60, 1.00,
+                    5.75, 4.20, 2.40, 2.50, 1.00, 3.45, 4.75],
+                   [6.30, 1.00, 3.90, 1.00, 1.55, 7.30, 5.70, 1.00, 1.00,
+                    4.75, 3.40, 3.65, 2.60, 1.00, 5.90, 4.65],
+                   [6.00, 4.50, 3.80, 1.00, 1.00, 4.30, 6.40, 3.95, 1.00,
+                    5.70, 4.30, 2.20, 2.80, 1.00, 2.15, 4.90],
+                   [5.65, 1.35, 3.95, 1.00, 1.00, 7.10, 5.50, 2.00, 1.00,
+                    4.25, 3.00, 2.95, 2.60, 1.00, 5.50, 4.85],
+                   [6.35, 1.00, 4.00, 1.00, 1.00, 7.45, 5.90, 2.05, 1.00,
+                    5.30, 3.95, 3.35, 2.65, 1.00, 7.10, 5.05],
+                   [5.85, 1.90, 3.25, 2.15, 1.00, 4.80, 6.15, 3.50, 1.40,
+                    4.65, 3.75, 1.65, 2.30, 1.00, 2.15, 4.50],
+                   [5.80, 2.90, 3.15, 1.00, 1.00, 4.55, 5.80, 2.20, 1.00,
+                    4.70, 3.65, 3.45, 2.35, 1.00, 4.00, 5.00],
+                   [5.90, 2.60, 3.85, 1.00, 1.00, 5.05, 5.95, 1.60, 1.00,
+                    5.10, 4.05, 3.50, 2.90, 1.60, 5.70, 4.55],
+                   [6.15, 4.35, 3.25, 1.00, 1.00, 3.95, 5.90, 2.70, 1.00,
+                    5.15, 4.00, 3.40, 2.40, 1.00, 4.50, 4.90],
+                   [5.80, 4.80, 2.85, 1.00, 1.00, 2.20, 5.90, 2.60, 1.00,
+                    5.00, 3.60, 3.20, 2.35, 1.00, 3.20, 4.60],
+                   [6.10, 1.00, 4.25, 1.00, 1.00, 6.70, 6.15, 1.50, 1.00,
+                    4.50, 3.65, 3.65, 2.65, 1.00, 6.65, 5.05],
+                   [5.90, 1.00, 4.10, 1.65, 1.00, 7.75, 6.00, 1.00, 1.00,
+                    5.50, 4.35, 3.70, 2.30, 1.60, 7.75, 5.05],
+                   [6.15, 5.70, 1.00, 1.00, 1.00, 1.00, 6.35, 5.30, 1.40,
+                    5.10, 3.65, 1.00, 2.35, 1.00, 1.00, 4.85],
+                   [5.60, 5.60, 1.75, 1.00, 1.00, 1.00, 6.00, 5.35, 1.00,
+                    5.35, 3.90, 1.00, 2.80, 1.00, 1.00, 5.15]])
+
+Cheese[7] = array([[4.55, 2.15, 1.70, 1.00, 1.00, 1.00, 5.55, 2.80, 2.15,
+                    3.55, 2.40, 2.55, 2.05, 1.00, 1.00, 1.00, 4.05],
+                   [5.10, 1.70, 2.80, 1.95, 1.60, 1.70, 5.80, 1.75, 1.90,
+                    4.10, 2.70, 3.60, 2.25, 1.00, 1.45, 3.35, 4.20],
+                   [5.50, 2.20, 2.80, 1.80, 1.00, 1.45, 5.70, 2.80, 1.95,
+                    3.75, 3.50, 3.35, 2.15, 1.00, 1.00, 1.30, 4.50],
+                   [4.95, 2.10, 2.50, 1.00, 1.00, 1.75, 5.65, 2.25, 1.90,
+                    3.65, 3.20, 2.45, 2.50, 1.00, 1.05, 2.15, 4.15],
+                   [6.50, 1.00, 3.65, 1.40, 1.00, 4.70, 6.05, 1.00, 1.90,
+                    3.90, 3.70, 3.60, 2.75, 1.75, 1.00, 5.10, 4.15],
+                   [5.40, 1.75, 2.95, 1.50, 1.30, 2.00, 5.85, 2.25, 2.25,
+                    4.35, 3.15, 3.55, 2.25, 1.60, 1.35, 2.60, 4.35],
+                   [5.40, 1.50, 3.25, 1.60, 1.40, 2.70, 6.05, 1.40, 2.10,
+                    2.75, 3.60, 3.10, 2.25, 1.05, 1.75, 3.20, 4.00],
+                   [5.30, 1.80, 3.25, 1.40, 1.00, 1.45, 6.00, 1.40, 1.90,
+                    3.45, 3.45, 3.70, 3.45, 2.00, 1.70, 3.25, 3.85],
+                   [4.85, 2.15, 2.00, 1.40, 1.00, 1.00, 5.60, 2.10, 2.20,
+                    3.70, 2.85, 3.40, 2.55, 1.35, 1.00, 1.60, 4.00],
+                   [4.75, 1.40, 2.50, 1.90, 1.00, 1.00, 5.70, 1.50, 2.10,
+                    3.65, 2.85, 3.15, 1.90, 1.00, 1.35, 3.20, 4.00],
+                   [5.40, 2.60, 3.15, 1.55, 1.45, 1.00, 5.70, 2.60, 2.15,
+                    4.25, 3.05, 2.90, 2.75, 1.00, 1.25, 2.40, 3.95],
+                   [5.55, 1.00, 3.75, 2.10, 1.00, 4.20, 6.05, 1.40, 2.20,
+                    3.55, 3.40, 3.85, 2.65, 1.75, 1.35, 4.45, 4.10],
+                   [5.50, 3.15, 2.15, 1.00, 1.00, 1.00, 5.70, 3.80, 2.20,
+                    3.60, 3.35, 2.20, 1.60, 1.00, 1.00, 1.00, 3.70],
+                   [5.15, 2.50, 1.40, 1.00, 1.00, 1.00, 5.70, 3.20, 2.10,
+                    4.15, 2.85, 1.45, 2.10, 1.00, 1.00, 1.00, 4.20]])
+
+Cheese[8] = array([[5.75, 3.50, 3.60, 1.60, 2.50, 6.55, 3.20, 2.95, 5.75,
+                    3.95, 3.25, 3.00, 1.65, 1.00, 2.35, 4.55],
+                   [5.75, 4.30, 3.50, 1.75, 1.40, 5.95, 4.90, 3.05, 5.50,
+                    4.10, 3.55, 2.75, 1.55, 1.60, 1.50, 4.75],
+                   [5.85, 4.10, 2.80, 1.85, 1.85, 6.15, 4.75, 2.70, 4.90,
+                    3.40, 3.25, 2.70, 1.00, 1.00, 2.05, 4.65],
+                   [6.30, 2.75, 4.50, 2.40, 2.85, 6.45, 3.55, 2.80, 4.70,
+                    4.05, 4.70, 3.10, 1.20, 1.00, 3.00, 4.65],
+                   [6.85, 1.00, 5.50, 4.15, 4.95, 7.80, 1.00, 2.00, 4.95,
+                    5.35, 5.75, 2.70, 3.90, 1.00, 5.35, 4.30],
+                   [6.10, 3.70, 3.75, 2.25, 2.20, 6.10, 4.20, 3.10, 4.70,
+                    3.30, 3.80, 2.50, 1.25, 1.00, 1.80, 5.05],
+                   [6.85, 1.65, 5.45, 3.60, 3.95, 7.60, 1.00, 2.40, 4.70,
+                    4.55, 5.30, 3.80, 3.60, 1.00, 4.60, 4.30],
+                   [6.25, 3.35, 4.90, 1.55, 1.90, 6.15, 3.90, 2.50, 4.85,
+                    4.05, 4.50, 3.30, 1.55, 1.00, 1.95, 4.45],
+                   [5.95, 3.85, 3.55, 2.25, 2.15, 6.30, 3.35, 2.95, 4.85,
+                    3.95, 3.70, 3.30, 1.85, 1.00, 2.35, 4.30],
+                   [5.40, 4.05, 3.55, 1.30, 1.55, 5.60, 3.90, 2.70, 4.60,
+                    3.35, 4.25, 2.75, 1.30, 1.00, 1.55, 4.35],
+                   [6.00, 3.45, 4.45, 2.85, 3.25, 7.30, 1.00, 2.30, 4.75,
+                    4.55, 5.00, 3.00, 3.80, 1.00, 4.95, 4.35],
+                   [6.15, 2.10, 4.90, 3.25, 3.20, 6.50, 2.05, 2.50, 4.70,
+                    4.00, 4.85, 3.20, 2.60, 1.00, 3.75, 4.40],
+                   [5.75, 5.75, 1.50, 1.00, 1.00, 5.60, 6.00, 3.45, 5.40,
+                    3.50, 1.50, 2.75, 1.00, 1.00, 1.00, 5.00],
+                   [5.95, 4.45, 3.10, 1.00, 1.45, 6.10, 4.85, 2.45, 6.20,
+                    4.30, 2.30, 2.25, 1.00, 1.00, 1.00, 5.10]])
+
+Cheese[9] = array([[6.40, 5.45, 1.40, 1.00, 1.00, 1.00, 6.50, 4.65, 2.55,
+                    3.15, 3.15, 1.65, 1.00, 1.00, 1.00, 1.00, 2.90],
+                   [8.00, 1.55, 5.90, 4.65, 1.00, 4.90, 8.05, 1.45, 1.40,
+                    3.10, 5.25, 3.95, 2.35, 4.65, 3.45, 4.10, 2.70],
+                   [6.90, 4.70, 1.85, 1.90, 1.00, 1.70, 6.90, 5.15, 3.05,
+                    3.10, 3.05, 1.65, 1.00, 1.55, 1.55, 1.60, 2.50],
+                   [7.00, 4.85, 1.95, 1.00, 1.00, 1.00, 6.65, 4.75, 2.50,
+                    2.85, 2.80, 1.90, 1.00, 1.00, 1.40, 1.00, 2.05],
+                   [7.30, 3.05, 4.40, 2.10, 1.00, 2.15, 7.75, 3.45, 2.10,
+                    3.80, 5.05, 3.90, 2.15, 3.05, 2.45, 3.00, 2.40],
+                   [6.50, 4.20, 1.90, 1.65, 1.00, 1.60, 6.30, 5.05, 2.40,
+                    2.70, 2.70, 1.65, 1.00, 1.70, 1.45, 2.00, 2.95],
+                   [7.95, 1.00, 5.10, 4.15, 2.00, 3.50, 7.70, 1.00, 1.85,
+                    2.95, 5.15, 4.90, 1.00, 3.75, 3.05, 4.50, 2.55],
+                   [7.35, 4.10, 3.00, 2.10, 1.00, 2.15, 7.55, 3.80, 1.75,
+                    2.20, 4.20, 3.95, 2.30, 3.55, 3.00, 3.00, 2.65],
+                   [7.50, 1.00, 3.90, 3.55, 1.00, 3.25, 6.95, 1.00, 2.60,
+                    3.75, 4.80, 4.40, 2.35, 4.45, 3.80, 4.25, 2.75],
+                   [6.65, 2.80, 2.95, 1.00, 1.00, 1.00, 6.70, 4.60, 2.30,
+                    2.75, 2.75, 2.10, 1.00, 1.00, 1.00, 1.00, 2.60],
+                   [6.75, 3.05, 3.60, 3.20, 1.00, 2.80, 7.70, 1.80, 1.75,
+                    2.85, 5.50, 4.45, 2.60, 4.90, 4.35, 4.60, 2.30],
+                   [7.85, 1.00, 4.75, 4.95, 2.10, 3.95, 7.70, 1.00, 1.95,
+                    3.65, 4.90, 3.70, 2.70, 5.00, 3.85, 3.80, 2.15],
+                   [7.10, 4.60, 1.25, 1.65, 1.00, 1.60, 6.55, 4.80, 2.40,
+                    3.25, 3.65, 1.85, 1.00, 1.85, 2.65, 1.80, 2.55],
+                   [6.65, 5.50, 1.85, 1.00, 1.00, 1.00, 7.15, 5.25, 2.05,
+                    3.35, 4.25, 1.35, 1.00, 1.00, 1.30, 1.00, 1.65]])
+
+Cheese[10] = array([[4.20, 4.15, 1.45, 2.30, 1.55, 1.45, 5.05, 3.50, 1.80,
+                     2.50, 2.55, 2.35, 2.50, 2.90, 1.35, 3.50, 4.25],
+                    [4.80, 3.00, 1.65, 2.05, 1.50, 2.70, 5.45, 2.90, 1.60,
+                     1.90, 2.65, 1.30, 1.90, 1.95, 1.00, 3.25, 5.05],
+                    [5.90, 4.20, 3.45, 1.40, 1.00, 2.70, 5.70, 3.15, 1.50,
+                     2.90, 3.90, 2.65, 2.70, 2.10, 1.90, 4.35, 4.85],
+                    [5.40, 4.10, 1.40, 1.25, 1.00, 1.60, 6.50, 3.05, 1.40,
+                     2.70, 3.75, 1.40, 1.55, 1.70, 1.00, 2.95, 4.80],
+                    [6.50, 3.55, 2.60, 1.65, 1.30, 3.50, 5.80, 2.65, 1.40,
+                     2.70, 3.75, 2.25, 1.90, 1.80, 1.00, 4.35, 4.85],
+                    [4.95, 4.35, 1.50, 1.00, 1.00, 1.00, 4.75, 3.95, 1.75,
+                     2.80, 3.65, 2.00, 1.95, 2.50, 1.75, 2.70, 5.55],
+                    [5.20, 4.20, 1.55, 1.00, 1.00, 1.00, 5.60, 4.00, 1.45,
+                     3.00, 3.90, 2.25, 2.85, 1.90, 1.00, 2.00, 4.75],
+                    [7.00, 3.95, 2.10, 1.85, 1.00, 2.30, 6.35, 3.70, 1.65,
+                     2.40, 3.65, 1.55, 1.25, 2.20, 1.40, 4.90, 4.15],
+                    [7.00, 4.85, 1.90, 2.05, 1.00, 1.90, 6.70, 3.80, 1.60,
+                     3.85, 4.55, 2.65, 2.90, 2.10, 1.70, 3.75, 4.95],
+                    [6.20, 2.90, 2.95, 1.00, 1.00, 1.00, 5.75, 3.20, 1.20,
+                     2.60, 4.40, 3.15, 1.65, 2.10, 1.60, 4.90, 5.00],
+                    [5.70, 3.40, 2.05, 1.70, 1.00, 2.35, 5.05, 2.10, 1.55,
+                     1.95, 2.40, 1.35, 1.80, 2.60, 2.30, 3.15, 5.10],
+                    [5.50, 4.25, 1.90, 1.35, 1.00, 3.20, 5.30, 3.20, 1.30,
+                     2.20, 4.30, 1.35, 2.00, 3.30, 1.40, 4.35, 5.00],
+                    [6.40, 4.65, 1.25, 1.00, 1.00, 1.00, 5.45, 3.65, 1.70,
+                     2.70, 2.35, 1.00, 1.65, 1.80, 1.00, 1.35, 5.05],
+                    [6.10, 4.55, 2.05, 1.00, 1.00, 1.00, 4.85, 3.20, 1.50,
+                     2.55, 2.65, 1.25, 2.10, 1.00, 1.00, 1.00, 4.45]])
+
+Cheese[11] = array([[4.05, 2.40, 2.25, 1.30, 1.25, 1.00, 4.30, 3.15, 1.80,
+                     3.00, 1.70, 1.00, 1.00, 1.20, 1.25, 1.20, 3.80],
+                    [4.50, 2.25, 1.65, 1.00, 1.00, 1.00, 3.45, 2.10, 1.30,
+                     1.95, 1.15, 1.00, 1.00, 1.00, 1.00, 1.00, 3.05],
+                    [4.90, 2.05, 5.10, 1.75, 1.00, 1.55, 4.15, 3.50, 1.55,
+                     3.20, 1.60, 2.00, 1.45, 1.30, 1.00, 1.45, 3.90],
+                    [6.00, 2.15, 5.10, 1.70, 1.35, 4.75, 4.40, 2.40, 1.55,
+                     2.35, 1.90, 1.80, 1.50, 1.00, 1.00, 1.80, 3.20],
+                    [6.10, 2.20, 4.65, 1.70, 1.00, 5.60, 5.15, 2.55, 2.05,
+                     3.10, 2.90, 3.45, 2.05, 1.55, 1.00, 4.00, 3.85],
+                    [4.55, 3.55, 3.45, 1.25, 1.80, 2.50, 4.10, 2.50, 1.90,
+                     2.40, 1.80, 1.90, 1.00, 1.00, 1.60, 2.05, 3.60],
+                    [4.25, 1.60, 4.00, 1.50, 1.50, 1.85, 5.10, 1.90, 1.80,
+                     3.45, 3.25, 4.55, 2.75, 1.45, 1.90, 1.95, 3.50],
+                    [5.90, 2.05, 4.75, 1.60, 1.40, 4.20, 5.20, 2.20, 1.90,
+                     2.05, 3.70, 3.50, 1.45, 1.40, 1.40, 3.45, 3.80],
+                    [4.45, 2.50, 3.25, 2.40, 1.00, 1.40, 4.20, 2.70, 2.00,
+                     3.20, 2.45, 2.60, 1.00, 1.55, 1.00, 1.90, 3.75],
+                    [4.80, 2.65, 2.90, 1.25, 1.20, 1.90, 4.75, 2.85, 1.85,
+                     3.10, 2.60, 2.65, 1.95, 2.10, 1.55, 2.35, 3.80],
+                    [5.60, 2.60, 4.55, 2.30, 1.25, 4.05, 6.00, 2.55, 1.85,
+                     2.65, 3.65, 4.80, 2.40, 1.45, 1.25, 5.20, 3.90],
+                    [5.10, 2.55, 4.80, 1.45, 2.50, 2.85, 5.20, 2.05, 2.20,
+                     3.50, 2.05, 4.90, 1.65, 2.00, 2.25, 3.15, 4.80],
+                    [4.35, 2.80, 1.20, 1.20, 1.00, 1.00, 4.45, 3.00, 1.45,
+                     2.40, 1.15, 1.00, 1.15, 1.00, 1.00, 1.00, 3.65],
+                    [4.15, 3.05, 1.00, 1.30, 1.00, 1.00, 4.90, 3.40, 1.65,
+                     3.25, 1.35, 1.00, 1.00, 1.00, 1.00, 1.00, 4.10]])
+
+Cheese[12] = array([[4.75, 4.50, 3.50, 2.05, 1.00, 1.00, 5.00, 7.05, 1.25,
+                     4.75, 6.55, 2.00, 1.70, 2.80, 1.35, 1.40, 4.75],
+                    [4.65, 5.15, 1.40, 1.00, 1.00, 1.75, 5.05, 5.15, 1.00,
+                     3.50, 2.85, 1.00, 1.35, 1.00, 1.00, 1.20, 4.30],
+                    [6.50, 4.75, 2.95, 1.30, 1.00, 1.90, 4.65, 4.30, 1.00,
+                     4.00, 4.10, 2.15, 1.30, 1.25, 1.00, 1.85, 4.05],
+                    [6.40, 5.60, 4.05, 1.00, 1.00, 1.90, 4.90, 4.45, 1.00,
+                     4.55, 5.80, 2.55, 1.50, 1.10, 1.50, 1.05, 5.95],
+                    [6.80, 5.70, 3.05, 1.00, 1.00, 2.75, 4.55, 5.70, 1.00,
+                     5.45, 3.45, 1.00, 1.25, 1.00, 1.40, 2.10, 2.95],
+                    [6.45, 6.20, 4.25, 2.25, 1.00, 1.75, 5.75, 5.65, 1.35,
+                     2.85, 4.80, 2.50, 1.00, 2.00, 1.45, 2.20, 5.75],
+                    [5.70, 5.05, 3.60, 1.00, 1.10, 1.30, 6.00, 5.80, 1.00,
+                     4.40, 5.30, 1.85, 2.20, 1.40, 1.95, 2.45, 2.60],
+                    [6.30, 5.50, 3.35, 1.00, 1.00, 1.50, 5.00, 4.70, 1.40,
+                     2.80, 5.95, 2.25, 1.20, 1.30, 1.00, 1.55, 4.20],
+                    [3.35, 3.65, 1.20, 1.25, 1.00, 1.55, 5.40, 5.00, 1.00,
+                     3.30, 7.20, 1.00, 1.25, 1.35, 1.55, 1.70, 2.55],
+                    [5.20, 4.60, 1.60, 1.00, 1.00, 1.90, 6.00, 5.90, 1.00,
+                     4.35, 3.70, 1.40, 1.40, 1.00, 1.25, 1.00, 3.75],
+                    [4.75, 3.55, 2.70, 1.20, 1.00, 1.50, 4.30, 3.75, 1.25,
+                     4.10, 3.90, 2.05, 1.00, 1.00, 1.20, 1.15, 4.30],
+                    [4.65, 3.85, 3.60, 1.00, 1.00, 2.70, 6.25, 4.10, 1.00,
+                     3.75, 5.15, 2.70, 1.00, 1.20, 1.45, 2.45, 3.40],
+                    [3.45, 2.95, 1.20, 1.00, 1.00, 1.00, 5.50, 4.65, 1.00,
+                     5.50, 3.95, 1.00, 1.00, 1.25, 1.00, 1.00, 3.45],
+                    [4.35, 4.40, 1.70, 1.00, 1.00, 1.20, 5.50, 5.60, 1.00,
+                     4.55, 4.60, 1.45, 1.25, 1.00, 1.00, 1.00, 4.65]])
+
+
+def cheese():
+    """
+    @return: The 12 Cheese matrices, in order.
+    """
+    return [Cheese[i] for i in sorted(Cheese)]
+
+
+def random_data(rows, cols, seed=0):
+    """
+    Matrix of uniform random values in [0, 1), the same for the same seed.
+    
+    @param rows: Number of objects (rows).
+    @type rows: int
+    
+    @param cols: Number of variables (columns).
+    @type cols: int
+    
+    @param seed: Seed of the random values.
+    @type seed: int
+    
+    @return: rows x cols matrix
+    """
+    return RandomState(seed).rand(rows, cols)
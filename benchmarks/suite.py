@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+Benchmark cases of the PCA functions, their timing and the comparison with a baseline.
+
+A case is one PCA function (a key of pca_module.engines) on one data set, with a
+number of PCs and a dtype. Each case is run once to warm up, then timed repeat
+times with the wall clock. The PCA functions are called with their default
+preprocessing (standardize=True), so the time includes centering and scaling X.
+"""
+import json
+import platform
+import time
+
+from numpy import __version__ as numpy_version
+from numpy import median
+
+import pca_module
+from benchmarks.data import cheese, random_data
+
+
+# data sets, all matrices of a data set are used in one timed run
+datasets = {
+    'cheese': cheese,
+    '2000x100': lambda: [random_data(2000, 100)],
+    '200x2000': lambda: [random_data(200, 2000)],
+    '1000x1000': lambda: [random_data(1000, 1000)],
+    }
+
+# (data sets, PCs, dtypes) of each grid
+grids = {
+    'quick': (('cheese', '2000x100'), (4,), ('float64',)),
+    'full': (('cheese', '2000x100', '200x2000', '1000x1000'), (4, 10), ('float64', 'float32')),
+    }
+
+# arguments of the PCA functions other than X, PCs and dtype (standardize is left at its default)
+engine_options = {'randomized': {'seed': 0}}
+
+
+def cases(grid='full', engines=None):
+    """
+    Get the cases of a grid.
+
+    @param grid: Name of the grid, a key of grids.
+    @type grid: str
+
+    @param engines: Names of the PCA functions, all of pca_module.engines if None. nipals_c
+    is left out if the c_nipals python extension could not be imported.
+    @type engines: sequence
+
+    @return: list of cases, dicts of engine, data, PCs and dtype
+    """
+    data_names, PCs, dtypes = grids[grid]
+    if engines is None:
+        engines = sorted(pca_module.engines)
+    for engine in engines:
+        if engine not in pca_module.engines:
+            raise ValueError('unknown engine %r' % (engine,))
+    return [{'engine': engine, 'data': data, 'PCs': pcs, 'dtype': dtype}
+            for data in data_names for pcs in PCs for dtype in dtypes for engine in engines
+            if engine != 'nipals_c' or pca_module.import_ok]
+
+
+def case_name(case):
+    """
+    @return: name of the case, engine/data/PCs/dtype
+    """
+    return '%(engine)s/%(data)s/%(PCs)i/%(dtype)s' % case
+
+
+def run_case(case, matrices, repeat=5):
+    """
+    Time a case.
+
+    @param case: The case, from cases.
+    @type case: dict
+
+    @param matrices: The matrices of the data set of the case.
+    @type matrices: list
+
+    @param repeat: Number of timed runs.
+    @type repeat: int
+
+    @return: result, the case with its name, shape, median and min time (s) and
+    throughput (elements of the matrices per second, from the median)
+    """
+    engine = pca_module.engines[case['engine']]
+    options = engine_options.get(case['engine'], {})
+
+    def run():
+        for X in matrices:
+            engine(X, PCs=case['PCs'], dtype=case['dtype'], **options)
+
+    run() # warm up
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    elements = sum(X.shape[0] * X.shape[1] for X in matrices)
+    result = dict(case)
+    result.update({'name': case_name(case), 'shape': list(matrices[0].shape), 'matrices': len(matrices),
+                   'repeat': repeat, 'median': float(median(times)), 'min': min(times)})
+    result['throughput'] = elements / result['median']
+    return result
+
+
+def run(grid='full', engines=None, repeat=5, report=print):
+    """
+    Run the benchmarks of a grid.
+
+    @param grid: Name of the grid, a key of grids.
+    @type grid: str
+
+    @param engines: Names of the PCA functions, see cases.
+    @type engines: sequence
+
+    @param repeat: Number of timed runs of each case.
+    @type repeat: int
+
+    @param report: Called with a line of text for each case, None for no output.
+    @type report: function
+
+    @return: results, {'host': ..., 'results': [result of run_case, ...]}
+    """
+    matrices = {}
+    results = []
+    for case in cases(grid, engines):
+        if case['data'] not in matrices:
+            matrices[case['data']] = datasets[case['data']]()
+        result = run_case(case, matrices[case['data']], repeat)
+        results.append(result)
+        if report:
+            report('%-32s median %10.3f ms  min %10.3f ms  %10.3g elements/s'
+                   % (result['name'], result['median'] * 1000, result['min'] * 1000, result['throughput']))
+
+    host = {'python': platform.python_version(), 'numpy': numpy_version, 'platform': platform.platform(),
+            'processor': platform.processor(), 'c_nipals': pca_module.import_ok,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'grid': grid}
+    return {'host': host, 'results': results}
+
+
+def write_results(results, path):
+    """
+    Write results (from run) to a JSON file.
+    """
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+
+
+def read_results(path):
+    """
+    Read results written by write_results.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=10.0):
+    """
+    Compare results with a baseline, the median times of the cases in both.
+
+    @param results: Results, from run.
+    @type results: dict
+
+    @param baseline: Earlier results, e.g. from read_results.
+    @type baseline: dict
+
+    @param threshold: A case is a regression if its median time is more than threshold percent above the baseline.
+    @type threshold: float
+
+    @return: list of (name, baseline median, median, change in percent) of all cases in both, and
+    list of the regressions, in the same form
+    """
+    base = dict((result['name'], result) for result in baseline['results'])
+    changes = []
+    for result in results['results']:
+        if result['name'] in base:
+            old = base[result['name']]['median']
+            changes.append((result['name'], old, result['median'], (result['median'] - old) / old * 100))
+    regressions = [change for change in changes if change[3] > threshold]
+    return changes, regressions
@@ -18,6 +18,13 @@ Which only uses Numeric. In that case, set this variable (old_numeric) to True.
 old_numeric = False
 
 
+"""
+The C python extension is built with OpenMP, so c_nipals can use all cores.
+Set this variable (use_openmp) to False if your compiler does not support OpenMP.
+"""
+use_openmp = True
+
+
 
 if old_numeric:
   src_path = os.path.join('src', 'numeric_version')
@@ -30,7 +37,20 @@ else:
 if get_platform ().startswith ('java') or not add_ext:
     ext = None
 else:
-    ext = [Extension ('c_nipals', [os.path.join(src_path, 'nipals.c')])]
+    if use_openmp:
+        openmp_args = ['-fopenmp']
+    else:
+        openmp_args = []
+    if old_numeric:
+        include_dirs = []
+    else:
+        import numpy
+        include_dirs = [numpy.get_include()] # for numpy/arrayobject.h
+    ext = [Extension ('c_nipals', [os.path.join(src_path, 'nipals.c')],
+                      depends = [os.path.join(src_path, 'nipals_kernels.h')],
+                      include_dirs = include_dirs,
+                      extra_compile_args = openmp_args,
+                      extra_link_args = openmp_args)]
 
 # Copy correct module to cwd
 shutil.copy(os.path.join(src_path, 'pca_module.py'), 'pca_module.py')   
@@ -7,36 +7,34 @@ The c_nipals python extension for pca_module
 
 #include "Python.h"
 
-// the arrayobject.h, change to correct path depending on your numpy/Numeric installation
-#include "/usr/lib/python3.3/site-packages/numpy/core/include/numpy/arrayobject.h"
+// the include directory of numpy (numpy.get_include()) is given by setup.py
+#include "numpy/arrayobject.h"
 #include "math.h"
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
-#define IND1(a, i) *((double *)(a->data + i*a->strides[0]))
-#define IND2(a, i, j) *((double *)(a->data + i*a->strides[0] + j*a->strides[1]))
-#define IND3(a, i, j, k) *((double *)(a->data + i*a->strides[0] + j*a->strides[1] + k*a->strides[2]))
-#define TYPECHECK(a, type) \
-if (a->descr->type_num != type) { \
-PyErr_Format(PyExc_TypeError, "array is not of correct type (%d)", type); \
-return NULL; \
-}
+
+#define IND1(type, a, i) *((type *)(a->data + i*a->strides[0]))
+#define IND2(type, a, i, j) *((type *)(a->data + i*a->strides[0] + j*a->strides[1]))
+#define IND3(type, a, i, j, k) *((type *)(a->data + i*a->strides[0] + j*a->strides[1] + k*a->strides[2]))
+#define ROW_BLOCK 32   // rows per tile in residual_prod
+#define COL_BLOCK 512  // columns per tile in residual_prod, part of b kept in cache
 
 
 /* .... Custom C functions ..................*/
 
-static void transpose(double **m, double **m_transposed, int cols, int rows)
-/*
-Transpose array m onto array m_transposed
-*/
+static int get_threads(int threads)
+/* number of OpenMP threads to use, threads < 1 means all available */
 {
-	int i, j;
-	for (i = 0; i < cols; i++)
-	{
-		for (j = 0; j < rows; j++)
-		{
-			m_transposed[i][j] = m[j][i];
-		}
-    }
+#ifdef _OPENMP
+    if (threads < 1)
+    { threads = omp_get_max_threads(); }
+    return threads;
+#else
+    return 1;
+#endif
 }
 
 static double vector_inner(double *v, int length)
@@ -66,102 +64,108 @@ static void vector_mul(double *v, int length, double value)
     { v[i] = v[i] * value; }
 }
 
-static void matrix_vector_prod(double **A, int cols, int rows, double *x, double *b)
-/*
-returns vector b of Ax = b
 
-x must have length: cols
-b must have length: rows
-*/
-{
-	int i, j;
-	double sum;
-	for (i = 0; i < rows; i++)
-	{
-		sum = 0;
-		for (j = 0; j < cols; j++)
-		{
-			sum += A[i][j] * x[j];
-		}
-		b[i] = sum;
-    }
-}
+/* .... NIPALS kernels for float64 and float32 ..................*/
 
-static void get_column(double *t, double **E, int cols, int rows)
-/* sets acceptable t  */
-{
-    int i, j;
-    for (i = 0; i < cols; i++)
-    {
-	    for (j = 0; j < rows; j++)
-	    {
-		  t[j] = E[j][i];
-	    }
-	    if (vector_inner(t, rows) > 0)
-        { return; }
-    }
-    return;
-}
+#define REAL double
+#define KERNEL(name) name##_double
+#include "nipals_kernels.h"
+#undef REAL
+#undef KERNEL
+
+#define REAL float
+#define KERNEL(name) name##_float
+#include "nipals_kernels.h"
+#undef REAL
+#undef KERNEL
 
-static void remove_tp(double **E, int cols, int rows, double *t, double *p)
-/*
-Essentially: E = E - (tp')
 
-Here it is done element-wise.
+static int check_array(PyArrayObject *a, const char *name, int nd, int type_num)
+/*
+checks that a is a writeable, aligned array of type_num with nd dimensions
+(and strides in whole elements), else sets an exception and returns -1
 */
 {
-  int i, j;
-  for (i = 0; i < rows; i++)
-  {
-    for (j = 0; j < cols; j++)
-    {
-        E[i][j] = E[i][j] - (t[i]*p[j]);
-    }
-  }
+	int i;
+	if (a->nd != nd)
+	{  PyErr_Format(PyExc_ValueError,
+	   "%s array has wrong dimension (%d)",
+	   name, a->nd); return -1;
+	}
+	if (a->descr->type_num != type_num)
+	{  PyErr_Format(PyExc_TypeError,
+	   "%s array is not of correct type (%d), all arrays must be float32 or all float64",
+	   name, a->descr->type_num); return -1;
+	}
+	if (!PyArray_ISWRITEABLE(a) || !PyArray_ISALIGNED(a))
+	{  PyErr_Format(PyExc_ValueError,
+	   "%s array must be writeable and aligned", name); return -1;
+	}
+	for (i = 0; i < nd; i++)
+	{
+		if (a->strides[i] % a->descr->elsize != 0)
+		{  PyErr_Format(PyExc_ValueError,
+		   "%s array has strides that are not a multiple of the item size", name); return -1;
+		}
+	}
+	return 0;
 }
 
-static double total_residual_obj_var(double **e, int cols, int rows, double e_tot0)
-/* get total residual variance of E-matrix */
+static int check_shapes(PyArrayObject *Scores, PyArrayObject *Loadings, PyArrayObject *E,
+                        PyArrayObject *Error_matrices, PyArrayObject *object_var,
+                        PyArrayObject *variable_var, int PCs)
+/* checks that the arrays fit E and PCs, else sets an exception and returns -1 (NULL arrays are not checked) */
 {
-  int i, j;
-  double sum, e_tot;
-  e_tot = 0;
-  for (i = 0; i < rows; i++)
-  {
-	sum = 0;
-    for (j = 0; j < cols; j++)
-    {
-        sum += pow(e[i][j], 2);
-    }
-    e_tot += sum / e_tot0; // scaling to correct size
-  }
-  return e_tot;
-}
+	int type_num = E->descr->type_num;
+	npy_intp rows, cols;
 
-static double total_residual_obj_var_e0(double **e, int cols, int rows)
-/* get total residual variance of E[0] */
-{
-  int i, j;
-  double sum, e_tot0;
-
-  e_tot0 = 0;
-  for (i = 0; i < rows; i++)
-  {
-	sum = 0;
-    for (j = 0; j < cols; j++)
-    {
-        sum += pow(e[i][j], 2);
-    }
-    e_tot0 += sum;
-  }
-  return e_tot0;
+	if (type_num != NPY_DOUBLE && type_num != NPY_FLOAT)
+	{  PyErr_Format(PyExc_TypeError,
+	   "E array is not of correct type (%d), must be float32 or float64",
+	   type_num); return -1;
+	}
+	if (check_array(E, "E", 2, type_num) < 0) return -1;
+	if (check_array(Scores, "Scores", 2, type_num) < 0) return -1;
+	if (check_array(Loadings, "Loadings", 2, type_num) < 0) return -1;
+	if (Error_matrices != NULL && check_array(Error_matrices, "Error_matrices", 3, type_num) < 0) return -1;
+	if (object_var != NULL && check_array(object_var, "object_var", 2, type_num) < 0) return -1;
+	if (variable_var != NULL && check_array(variable_var, "variable_var", 2, type_num) < 0) return -1;
+
+	rows = E->dimensions[0];
+	cols = E->dimensions[1];
+	if (PCs < 0 || PCs > rows || PCs > cols)
+	{  PyErr_Format(PyExc_ValueError,
+	   "PCs (%d) must be between 0 and min(rows, cols) of E", PCs); return -1;
+	}
+	if (Scores->dimensions[0] != rows || Scores->dimensions[1] < PCs ||
+	    Loadings->dimensions[0] < PCs || Loadings->dimensions[1] != cols)
+	{  PyErr_Format(PyExc_ValueError,
+	   "Scores or Loadings array has wrong shape for E and PCs"); return -1;
+	}
+	if (Error_matrices != NULL &&
+	    (Error_matrices->dimensions[0] < PCs || Error_matrices->dimensions[1] != rows ||
+	     Error_matrices->dimensions[2] != cols))
+	{  PyErr_Format(PyExc_ValueError,
+	   "Error_matrices array has wrong shape for E and PCs"); return -1;
+	}
+	if ((object_var == NULL) != (variable_var == NULL))
+	{  PyErr_Format(PyExc_TypeError,
+	   "object_var and variable_var must both be given"); return -1;
+	}
+	if (object_var != NULL &&
+	    (object_var->dimensions[0] < PCs || object_var->dimensions[1] != rows ||
+	     variable_var->dimensions[0] < PCs || variable_var->dimensions[1] != cols))
+	{  PyErr_Format(PyExc_ValueError,
+	   "object_var or variable_var array has wrong shape for E and PCs"); return -1;
+	}
+	return 0;
 }
 
 
 /* .... Python callable functions ..................*/
 
 static PyObject *nipals(PyObject *self, PyObject *args)
-/* fills the Scores and Loadings matrices and returns explained_var array */
+/* fills the Scores and Loadings matrices (and object_var and variable_var, if given) and returns explained_var array */
 {
   /*
   Estimation of PC components with the iterative NIPALS method:
@@ -185,151 +189,55 @@ static PyObject *nipals(PyObject *self, PyObject *args)
 
     */
     PyArrayObject *Scores, *Loadings, *E, *explained_var;
-	double threshold, eigenval_t, eigenval_p, eigenval_new;
-	double eigenval_old = 0.0;
-	double e_tot0, e_tot, tot_explained_var, temp;
-	int i, j, PCs, cols, rows, cols_t, rows_t;
-	int convergence, ready_for_compare;
-	int dims[2]; // for explained_var creation
+	PyArrayObject *object_var = NULL, *variable_var = NULL; // residual variance after each PC, optional
+	double threshold;
+	int PCs, status;
+	int threads = 0; // number of OpenMP threads, all if < 1
+	npy_intp dims[1]; // for explained_var creation
 
 
 	/* Get arguments:  */
-	if (!PyArg_ParseTuple(args, "O!O!O!id:nipals", &PyArray_Type,
+	if (!PyArg_ParseTuple(args, "O!O!O!id|iO!O!:nipals", &PyArray_Type,
 	                                               &Scores,
 		                                           &PyArray_Type,
 		                                           &Loadings,
 												   &PyArray_Type,
 												   &E,
 												   &PCs,
-												   &threshold))
+												   &threshold,
+												   &threads,
+												   &PyArray_Type,
+												   &object_var,
+												   &PyArray_Type,
+												   &variable_var))
 	{
 		return NULL;
 	}
+	threads = get_threads(threads);
 
 
     /* safety checks */
-	if (NULL == Scores)  return NULL;
-	if (NULL == Loadings)  return NULL;
-	if (NULL == E)  return NULL;
-
-    if (Scores->nd != 2)
-    {  PyErr_Format(PyExc_ValueError,
-       "Scores array has wrong dimension (%d)",
-       Scores->nd); return NULL;
-    }
-    if (Loadings->nd != 2)
-    {  PyErr_Format(PyExc_ValueError,
-       "Loadings array has wrong dimension (%d)",
-       Loadings->nd); return NULL;
-    }
-    if (E->nd != 2)
-    {  PyErr_Format(PyExc_ValueError,
-       "E array has wrong dimension (%d)",
-       E->nd); return NULL;
-    }
-
-    //TYPECHECK(Scores, PyArray_DOUBLE);
-    //TYPECHECK(Loadings, PyArray_DOUBLE);
-    //TYPECHECK(E, PyArray_DOUBLE);
-
-	rows = E->dimensions[0];
-	cols = E->dimensions[1];
-	/* Set 2d array pointer e */
-	double *data_ptr;
-    data_ptr = (double *) E->data; /* a is a PyArrayObject* pointer */
-    double **e;
-    e = (double **) malloc((rows)*sizeof(double*));
-    for (i = 0; i < rows; i++)
-    { e[i] = &(data_ptr[i*cols]); /* point row no. i in E->data */ }
-
-	/* Set t vector */
-	double t[rows];
-	double p[cols];
-
-	//for(i = 0; i < rows; i++)
-	//{ t[i] = e[i][0]; }
-    get_column(t, e, cols, rows);
+	if (check_shapes(Scores, Loadings, E, NULL, object_var, variable_var, PCs) < 0)  return NULL;
 
-
-	/* Create explained variance array */
+	/* Create explained variance array (same type as E), must be done holding the GIL */
 	dims[0] = PCs;
-	explained_var = (PyArrayObject *) PyArray_FromDims(1, dims, PyArray_DOUBLE);
-	e_tot0 = total_residual_obj_var_e0(e, cols, rows);
-	tot_explained_var = 0;
-
-
-	/* Transposed E[0] */
-	cols_t = rows; rows_t = cols;
-    double **e_transposed;
-    e_transposed = (double **) malloc((rows_t)*sizeof(double*));
-    for (i = 0; i < rows_t; i++)
-    { e_transposed[i] = (double *) malloc((cols_t)*sizeof(double)); }
-
-
-	/* Do iterations (0, PCs) */
-	for(i = 0; i < PCs; i++)
-    {
-	  convergence = 0;
-	  ready_for_compare = 0;
-	  transpose(e, e_transposed, cols, rows);
-
-	  while(convergence == 0)
-	  {
-	    // 1  p=(E[i-1]'t) / (t't)  Project X onto t to find the corresponding loading p
-	    matrix_vector_prod(e_transposed, cols_t, rows_t, t, p);
-	    eigenval_t = vector_inner(t, rows);
-	    vector_div(p, cols, eigenval_t);
-
-
-	    // 2  p = p * (p'p)^-0.5  Normalise loading vector p to length 1
-	    eigenval_p = vector_inner(p, cols);
-	    temp = pow(eigenval_p, (-0.5));
-	    vector_mul(p, cols, temp);
-
-
-	    // 3  t = (E[i-1]p) / (p'p)  Project X onto p to find corresponding score vector t
-	    matrix_vector_prod(e, cols, rows, p, t);
-	    eigenval_p = vector_inner(p, cols);
-	    vector_div(t, rows, eigenval_p);
-
-
-	    // 4  Check for convergence
-	    eigenval_new = vector_inner(t, rows);
-
-
-	    if(ready_for_compare == 0)
-	    {
-			ready_for_compare = 1;
-		}
-	    else
-	    {
-			if((eigenval_new - eigenval_old) < threshold*eigenval_new)
-			{ convergence = 1; }
-
-
-		}
-		eigenval_old = eigenval_new;
-      }
-
-	  // 5  E[i] = E[i-1] - tp'  Remove the estimated PC component from E[i-1] and sets result to E[i]
-	  remove_tp(e, cols, rows, t, p);
-
-
-	  /* Add current Scores and Loadings to collection */
-	  for(j = 0; j < rows; j++){ IND2(Scores, j, i) = t[j]; }
-	  for(j = 0; j < cols; j++){ IND2(Loadings, i, j) = p[j]; }
-
-	  /* Update explained variance array */
-	  e_tot = total_residual_obj_var(e, cols, rows, e_tot0); // for E[i]
-	  IND1(explained_var, i) = 1 - e_tot - tot_explained_var; // explained var for PC[i]
-	  tot_explained_var += IND1(explained_var, i);
-    }
-
-    free(e);
-    for (i = 0; i < rows_t; i++)
-    { free(e_transposed[i]); }
-    free(e_transposed);
-
+	explained_var = (PyArrayObject *) PyArray_SimpleNew(1, dims, E->descr->type_num);
+	if (NULL == explained_var)  return NULL;
+
+	/* The iterations only touch raw array data, release the GIL so that
+	   other Python threads can run while this fit is computed */
+	Py_BEGIN_ALLOW_THREADS
+	if (E->descr->type_num == NPY_FLOAT)
+	{ status = nipals_core_float(Scores, Loadings, E, NULL, explained_var, object_var, variable_var, PCs, threshold, threads); }
+	else
+	{ status = nipals_core_double(Scores, Loadings, E, NULL, explained_var, object_var, variable_var, PCs, threshold, threads); }
+	Py_END_ALLOW_THREADS
+
+	if (status < 0)
+	{
+		Py_DECREF(explained_var);
+		return PyErr_NoMemory();
+	}
 	return PyArray_Return(explained_var);
 }
 
@@ -359,15 +267,13 @@ static PyObject *nipals2(PyObject *self, PyObject *args)
 
     */
     PyArrayObject *Scores, *Loadings, *E, *Error_matrices;
-	double threshold, eigenval_t, eigenval_p, eigenval_new;
-	double eigenval_old = 0.0;
-	double temp;
-	int i, j, k, PCs, cols, rows, cols_t, rows_t;
-	int convergence, ready_for_compare;
+	double threshold;
+	int PCs, status;
+	int threads = 0; // number of OpenMP threads, all if < 1
 
 
 	/* Get arguments:  */
-	if (!PyArg_ParseTuple(args, "O!O!O!O!id:nipals2", &PyArray_Type,
+	if (!PyArg_ParseTuple(args, "O!O!O!O!id|i:nipals2", &PyArray_Type,
 	                                               &Scores,
 		                                           &PyArray_Type,
 		                                           &Loadings,
@@ -376,151 +282,29 @@ static PyObject *nipals2(PyObject *self, PyObject *args)
 												   &PyArray_Type,
 												   &Error_matrices,
 												   &PCs,
-												   &threshold))
+												   &threshold,
+												   &threads))
 	{
 		return NULL;
 	}
+	threads = get_threads(threads);
 
 
     /* safety checks */
-	if (NULL == Scores)  return NULL;
-	if (NULL == Loadings)  return NULL;
-	if (NULL == E)  return NULL;
-
-    if (Scores->nd != 2)
-    {  PyErr_Format(PyExc_ValueError,
-       "Scores array has wrong dimension (%d)",
-       Scores->nd); return NULL;
-    }
-    if (Loadings->nd != 2)
-    {  PyErr_Format(PyExc_ValueError,
-       "Loadings array has wrong dimension (%d)",
-       Loadings->nd); return NULL;
-    }
-    if (E->nd != 2)
-    {  PyErr_Format(PyExc_ValueError,
-       "E array has wrong dimension (%d)",
-       E->nd); return NULL;
-    }
-    if (Error_matrices->nd != 3)
-    {  PyErr_Format(PyExc_ValueError,
-       "Error_matrices array has wrong dimension (%d)",
-       Error_matrices->nd); return NULL;
-    }
-
-
-    //TYPECHECK(Scores, PyArray_DOUBLE);
-    //TYPECHECK(Loadings, PyArray_DOUBLE);
-    //TYPECHECK(E, PyArray_DOUBLE);
-
-	rows = E->dimensions[0];
-	cols = E->dimensions[1];
-	/* Set 2d array pointer e */
-	double *data_ptr;
-    data_ptr = (double *) E->data; /* is a PyArrayObject* pointer */
-    double **e;
-    e = (double **) malloc((rows)*sizeof(double*));
-    for (i = 0; i < rows; i++)
-    { e[i] = &(data_ptr[i*cols]); /* point row no. i in E->data */ }
-
-
-	/* Set 3d array pointer e_matrices
-	double *data_ptr2;
-    data_ptr2 = (double *) Error_matrices->data; // is a PyArrayObject* pointer
-    double ***e_matrices;
-    e_matrices = (double ***) malloc((rows)*sizeof(double*));
-    for (i = 0; i < PCs; i++)
-    {
-        for (j = 0; j < rows; j ++)
-        { e_matrices[i][j] = &(data_ptr2[i*cols*rows]);  } // point array (i,j) in Error_matrices->data
-    }*/
-
-
-	/* Set t vector */
-	double t[rows];
-	double p[cols];
-	//for(i = 0; i < rows; i++)
-	//{ t[i] = e[i][0]; }
-    get_column(t, e, cols, rows);
-
-	/* Transposed E[0] */
-	cols_t = rows; rows_t = cols;
-    double **e_transposed;
-    e_transposed = (double **) malloc((rows_t)*sizeof(double*));
-    for (i = 0; i < rows_t; i++)
-    { e_transposed[i] = (double *) malloc((cols_t)*sizeof(double)); }
-
-
-	/* Do iterations (0, PCs) */
-	for(i = 0; i < PCs; i++)
-    {
-	  convergence = 0;
-	  ready_for_compare = 0;
-	  transpose(e, e_transposed, cols, rows);
-
-	  while(convergence == 0)
-	  {
-	    // 1  p=(E[i-1]'t) / (t't)  Project X onto t to find the corresponding loading p
-	    matrix_vector_prod(e_transposed, cols_t, rows_t, t, p);
-	    eigenval_t = vector_inner(t, rows);
-	    vector_div(p, cols, eigenval_t);
-
-
-	    // 2  p = p * (p'p)^-0.5  Normalise loading vector p to length 1
-	    eigenval_p = vector_inner(p, cols);
-	    temp = pow(eigenval_p, (-0.5));
-	    vector_mul(p, cols, temp);
-
-
-	    // 3  t = (E[i-1]p) / (p'p)  Project X onto p to find corresponding score vector t
-	    matrix_vector_prod(e, cols, rows, p, t);
-	    eigenval_p = vector_inner(p, cols);
-	    vector_div(t, rows, eigenval_p);
-
-
-	    // 4  Check for convergence
-	    eigenval_new = vector_inner(t, rows);
-
-
-	    if(ready_for_compare == 0)
-	    {
-			ready_for_compare = 1;
-		}
-	    else
-	    {
-			if((eigenval_new - eigenval_old) < threshold*eigenval_new)
-			{ convergence = 1; }
-
+	if (check_shapes(Scores, Loadings, E, Error_matrices, NULL, NULL, PCs) < 0)  return NULL;
 
-		}
-		eigenval_old = eigenval_new;
-      }
-
-	  // 5  E[i] = E[i-1] - tp'  Remove the estimated PC component from E[i-1] and sets result to E[i]
-	  remove_tp(e, cols, rows, t, p);
-
-
-	  /* Add current Scores and Loadings to collection */
-	  for(j = 0; j < rows; j++){ IND2(Scores, j, i) = t[j]; }
-	  for(j = 0; j < cols; j++){ IND2(Loadings, i, j) = p[j]; }
-
-	  /* Add current E to Error_matrices */
-	  for(j = 0; j < rows; j++)
-	  {
-		  for(k = 0; k < cols; k++)
-		  {
-			  IND3(Error_matrices, i, j, k) = e[j][k];
-		  }
-	  }
+	/* The iterations only touch raw array data, release the GIL so that
+	   other Python threads can run while this fit is computed */
+	Py_BEGIN_ALLOW_THREADS
+	if (E->descr->type_num == NPY_FLOAT)
+	{ status = nipals_core_float(Scores, Loadings, E, Error_matrices, NULL, NULL, NULL, PCs, threshold, threads); }
+	else
+	{ status = nipals_core_double(Scores, Loadings, E, Error_matrices, NULL, NULL, NULL, PCs, threshold, threads); }
+	Py_END_ALLOW_THREADS
 
-    }
-
-    free(e);
-    for (i = 0; i < rows_t; i++)
-    { free(e_transposed[i]); }
-    free(e_transposed);
-
-    return PyInt_FromLong(1);
+	if (status < 0)
+	{ return PyErr_NoMemory(); }
+    return PyLong_FromLong(1);
 
 }
 
@@ -534,14 +318,23 @@ static PyMethodDef c_nipals_methods[] = {
 	};
 
 
+/* ==== Module definition ====================== */
+static struct PyModuleDef c_nipals_module = {
+	PyModuleDef_HEAD_INIT,
+	"c_nipals",   /* name */
+	NULL,         /* docstring */
+	-1,           /* no per-module state */
+	c_nipals_methods
+	};
+
+
 /* ==== Initialize ====================== */
-PyMODINIT_FUNC initc_nipals()  {
-	Py_InitModule("c_nipals", c_nipals_methods);
-	import_array();  // for NumPy
+PyMODINIT_FUNC PyInit_c_nipals(void)  {
+	import_array();  // for NumPy, returns NULL on failure
+	return PyModule_Create(&c_nipals_module);
 }
 
 
 /*
-$ gcc -c nipals.c -I/cygdrive/c/cygwin/usr/include/python2.5
-$ gcc -shared -o c_nipals.dll nipals.o -L/cygdrive/c/cygwin/lib/python2.5/config -lpython2.5
+$ python setup.py build_ext --inplace
 */
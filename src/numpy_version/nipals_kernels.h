@@ -0,0 +1,333 @@
+/*
+nipals_kernels.h
+
+NIPALS kernels of the c_nipals python extension, for one element type.
+Included by nipals.c once for each type, with REAL set to the element
+type (float or double) and KERNEL(name) giving the function name for it.
+
+Arrays are accessed with their own strides (in elements of REAL), rows of
+E through the row pointers e[i] and columns with the column stride cs.
+Sums and the t and p vectors are kept in double for both types.
+*/
+
+
+static void KERNEL(get_column)(double *t, REAL **E, npy_intp cs, int cols, int rows)
+/* sets acceptable t  */
+{
+	int i, j;
+	for (i = 0; i < cols; i++)
+	{
+		for (j = 0; j < rows; j++)
+		{ t[j] = E[j][i*cs]; }
+		if (vector_inner(t, rows) > 0)
+		{ return; }
+	}
+}
+
+static void KERNEL(matrix_vector_prod)(REAL **A, npy_intp cs, int cols, int rows, double *x, double *b, int threads)
+/*
+returns vector b of Ax = b
+
+x must have length: cols
+b must have length: rows
+*/
+{
+	int i, j;
+	double s0, s1, s2, s3;
+	#pragma omp parallel for private(j, s0, s1, s2, s3) num_threads(threads) schedule(static)
+	for (i = 0; i < rows; i++)
+	{
+		/* four partial sums, so the additions do not wait on each other */
+		REAL *a = A[i];
+		s0 = s1 = s2 = s3 = 0;
+		for (j = 0; j + 4 <= cols; j += 4)
+		{
+			s0 += a[j*cs] * x[j];
+			s1 += a[(j+1)*cs] * x[j+1];
+			s2 += a[(j+2)*cs] * x[j+2];
+			s3 += a[(j+3)*cs] * x[j+3];
+		}
+		for (; j < cols; j++)
+		{ s0 += a[j*cs] * x[j]; }
+		b[i] = (s0 + s1) + (s2 + s3);
+	}
+}
+
+static void KERNEL(tile_prod)(REAL **E, npy_intp cs, int i, int n, int jb, int j_end, double *t, double *p,
+                              double * restrict acc, double * restrict sq, double * restrict rsq)
+/*
+acc[jb:j_end] += E[i:i+n, jb:j_end]'t[i:i+n] for n = 1 or 4 rows, the rows are
+deflated first (p not NULL) and their squares added to sq (sq not NULL), and
+to the row sums rsq[i:i+n] (rsq not NULL)
+
+Four rows share one pass over acc, which keeps the loop bound by reading E.
+*/
+{
+	int j;
+	REAL * restrict r0 = E[i];
+	double t0 = t[i];
+
+	if (n == 4)
+	{
+		REAL * restrict r1 = E[i+1];
+		REAL * restrict r2 = E[i+2];
+		REAL * restrict r3 = E[i+3];
+		double t1 = t[i+1], t2 = t[i+2], t3 = t[i+3];
+		if (p != NULL)
+		{
+			for (j = jb; j < j_end; j++)
+			{
+				r0[j*cs] = (REAL) (r0[j*cs] - t0*p[j]);
+				r1[j*cs] = (REAL) (r1[j*cs] - t1*p[j]);
+				r2[j*cs] = (REAL) (r2[j*cs] - t2*p[j]);
+				r3[j*cs] = (REAL) (r3[j*cs] - t3*p[j]);
+			}
+		}
+		for (j = jb; j < j_end; j++)
+		{ acc[j] += (double) r0[j*cs]*t0 + (double) r1[j*cs]*t1 + (double) r2[j*cs]*t2 + (double) r3[j*cs]*t3; }
+		if (sq != NULL)
+		{
+			double q0, q1, q2, q3, s0 = 0, s1 = 0, s2 = 0, s3 = 0;
+			for (j = jb; j < j_end; j++)
+			{
+				q0 = (double) r0[j*cs]*r0[j*cs];
+				q1 = (double) r1[j*cs]*r1[j*cs];
+				q2 = (double) r2[j*cs]*r2[j*cs];
+				q3 = (double) r3[j*cs]*r3[j*cs];
+				sq[j] += (q0 + q1) + (q2 + q3);
+				s0 += q0; s1 += q1; s2 += q2; s3 += q3;
+			}
+			if (rsq != NULL)
+			{ rsq[i] += s0; rsq[i+1] += s1; rsq[i+2] += s2; rsq[i+3] += s3; }
+		}
+	}
+	else
+	{
+		if (p != NULL)
+		{
+			for (j = jb; j < j_end; j++)
+			{ r0[j*cs] = (REAL) (r0[j*cs] - t0*p[j]); }
+		}
+		for (j = jb; j < j_end; j++)
+		{ acc[j] += (double) r0[j*cs]*t0; }
+		if (sq != NULL)
+		{
+			double q0, s0 = 0;
+			for (j = jb; j < j_end; j++)
+			{
+				q0 = (double) r0[j*cs]*r0[j*cs];
+				sq[j] += q0;
+				s0 += q0;
+			}
+			if (rsq != NULL)
+			{ rsq[i] += s0; }
+		}
+	}
+}
+
+static double KERNEL(residual_prod)(REAL **E, npy_intp cs, int cols, int rows, double *t, double *p,
+                                    double *b, int residual, double *row_ss, double *col_ss,
+                                    double *work, int threads)
+/*
+b = E't computed directly on E (in the order of its rows), returns the sum of
+squares of E (only computed if residual is true, else 0). If residual is true
+and row_ss or col_ss is not NULL, the sums of squares of each row or column of
+E are also set in them.
+
+With p given (not NULL) E is first deflated, E = E - tp', in the same pass
+over E, so the deflation of one PC also gives the first E't of the next PC
+(b may be p). The accumulation is blocked in ROW_BLOCK x COL_BLOCK tiles, a
+tile of E is deflated, multiplied and squared while it is in cache.
+
+work must have room for threads*2*cols values, each thread sums its rows
+into its own part which are added in thread order afterwards.
+*/
+{
+	int j, k, used = 1;
+	double ss = 0;
+
+	#pragma omp parallel num_threads(threads)
+	{
+		int i, j, ib, jb, i_start, i_stop, i_end, j_end, id = 0, n = 1;
+		double *acc, *sq;
+#ifdef _OPENMP
+		id = omp_get_thread_num();
+		n = omp_get_num_threads();
+#endif
+		if (id == 0)
+		{ used = n; }
+		acc = &(work[id*2*cols]); // part of E't
+		sq = &(work[id*2*cols + cols]); // column sums of squares
+		for (j = 0; j < 2*cols; j++)
+		{ acc[j] = 0; }
+
+		/* rows of this thread */
+		i_start = (int) ((long) rows*id/n);
+		i_stop = (int) ((long) rows*(id+1)/n);
+		if (residual && row_ss != NULL)
+		{
+			for (i = i_start; i < i_stop; i++)
+			{ row_ss[i] = 0; }
+		}
+
+		for (ib = i_start; ib < i_stop; ib += ROW_BLOCK)
+		{
+			i_end = (ib + ROW_BLOCK < i_stop) ? ib + ROW_BLOCK : i_stop;
+			for (jb = 0; jb < cols; jb += COL_BLOCK)
+			{
+				j_end = (jb + COL_BLOCK < cols) ? jb + COL_BLOCK : cols;
+				for (i = ib; i + 4 <= i_end; i += 4)
+				{ KERNEL(tile_prod)(E, cs, i, 4, jb, j_end, t, p, acc, residual ? sq : NULL, residual ? row_ss : NULL); }
+				for (; i < i_end; i++)
+				{ KERNEL(tile_prod)(E, cs, i, 1, jb, j_end, t, p, acc, residual ? sq : NULL, residual ? row_ss : NULL); }
+			}
+		}
+	}
+
+	for (j = 0; j < cols; j++)
+	{ b[j] = 0; }
+	if (residual && col_ss != NULL)
+	{
+		for (j = 0; j < cols; j++)
+		{ col_ss[j] = 0; }
+	}
+	for (k = 0; k < used; k++)
+	{
+		for (j = 0; j < cols; j++)
+		{
+			b[j] += work[k*2*cols + j];
+			ss += work[k*2*cols + cols + j];
+			if (residual && col_ss != NULL)
+			{ col_ss[j] += work[k*2*cols + cols + j]; }
+		}
+	}
+	return ss;
+}
+
+static int KERNEL(nipals_core)(PyArrayObject *Scores, PyArrayObject *Loadings, PyArrayObject *E,
+                               PyArrayObject *Error_matrices, PyArrayObject *explained_var,
+                               PyArrayObject *object_var, PyArrayObject *variable_var,
+                               int PCs, double threshold, int threads)
+/*
+The NIPALS iterations of nipals and nipals2, fills Scores and Loadings and
+either Error_matrices or explained_var (the other one is NULL). If object_var
+and variable_var are not NULL, they are set to the mean squares of the rows
+and columns of E[i], summed while E[i-1] is deflated (step 5).
+
+Only touches the array data, so it is called without holding the GIL.
+Returns 0, or -1 if there was not enough memory.
+*/
+{
+	double eigenval_t, eigenval_p, eigenval_new;
+	double eigenval_old = 0.0;
+	double e_tot0 = 0, temp;
+	int i, j, k, convergence, ready_for_compare;
+	int rows = (int) E->dimensions[0];
+	int cols = (int) E->dimensions[1];
+	npy_intp cs = E->strides[1] / (npy_intp) sizeof(REAL); // column stride of E
+
+	/* Set 2d array pointer e, row no. i of E starts at e[i] */
+	REAL **e = (REAL **) malloc(rows*sizeof(REAL *));
+	double *t = (double *) malloc(rows*sizeof(double));
+	double *p = (double *) malloc(cols*sizeof(double));
+	double *work = (double *) malloc(threads*2*cols*sizeof(double)); // partial sums of residual_prod
+	double *row_ss = NULL, *col_ss = NULL; // sums of squares of the rows and columns of E[i]
+	int residual = object_var != NULL;
+	if (residual)
+	{
+		row_ss = (double *) malloc(rows*sizeof(double));
+		col_ss = (double *) malloc(cols*sizeof(double));
+	}
+	if (e == NULL || t == NULL || p == NULL || work == NULL || (residual && (row_ss == NULL || col_ss == NULL)))
+	{
+		free(e); free(t); free(p); free(work); free(row_ss); free(col_ss);
+		return -1;
+	}
+	for (i = 0; i < rows; i++)
+	{ e[i] = (REAL *) (E->data + i*E->strides[0]); }
+
+	KERNEL(get_column)(t, e, cs, cols, rows);
+
+
+	/* E[0]'t for the first iteration (with the total variance of E[0], if explained_var is wanted) */
+	e_tot0 = KERNEL(residual_prod)(e, cs, cols, rows, t, NULL, p, explained_var != NULL, NULL, NULL, work, threads);
+
+
+	/* Do iterations (0, PCs) */
+	for(i = 0; i < PCs; i++)
+	{
+		convergence = 0;
+		ready_for_compare = 0;
+
+		while(convergence == 0)
+		{
+			// 1  p=(E[i-1]'t) / (t't)  Project X onto t to find the corresponding loading p
+			//    (E[i-1]'t is already in p, from the previous iteration or deflation)
+			eigenval_t = vector_inner(t, rows);
+			vector_div(p, cols, eigenval_t);
+
+
+			// 2  p = p * (p'p)^-0.5  Normalise loading vector p to length 1
+			eigenval_p = vector_inner(p, cols);
+			temp = pow(eigenval_p, (-0.5));
+			vector_mul(p, cols, temp);
+
+
+			// 3  t = (E[i-1]p) / (p'p)  Project X onto p to find corresponding score vector t
+			KERNEL(matrix_vector_prod)(e, cs, cols, rows, p, t, threads);
+			eigenval_p = vector_inner(p, cols);
+			vector_div(t, rows, eigenval_p);
+
+
+			// 4  Check for convergence
+			eigenval_new = vector_inner(t, rows);
+
+			if(ready_for_compare == 0)
+			{ ready_for_compare = 1; }
+			else if((eigenval_new - eigenval_old) < threshold*eigenval_new)
+			{ convergence = 1; }
+			eigenval_old = eigenval_new;
+
+			if(convergence == 0)
+			{ KERNEL(residual_prod)(e, cs, cols, rows, t, NULL, p, 0, NULL, NULL, work, threads); } // E[i-1]'t for step 1
+		}
+
+		/* Add current Scores and Loadings to collection */
+		for(j = 0; j < rows; j++){ IND2(REAL, Scores, j, i) = (REAL) t[j]; }
+		for(j = 0; j < cols; j++){ IND2(REAL, Loadings, i, j) = (REAL) p[j]; }
+
+
+		// 5  E[i] = E[i-1] - tp'  Remove the estimated PC component from E[i-1] and sets result to E[i],
+		//    in the same pass p is set to E[i]'t (step 1 of the next PC), and the sums of squares
+		//    of the rows and columns of E[i] are summed if the residual variance is wanted
+		KERNEL(residual_prod)(e, cs, cols, rows, t, p, p, residual, row_ss, col_ss, work, threads);
+		if (residual)
+		{
+			for(j = 0; j < rows; j++){ IND2(REAL, object_var, i, j) = (REAL) (row_ss[j] / cols); }
+			for(j = 0; j < cols; j++){ IND2(REAL, variable_var, i, j) = (REAL) (col_ss[j] / rows); }
+		}
+
+		if (explained_var != NULL)
+		{
+			/* Update explained variance array, |E[i]|^2 = |E[i-1]|^2 - t't since p'p = 1 */
+			IND1(REAL, explained_var, i) = (REAL) (vector_inner(t, rows) / e_tot0); // explained var for PC[i]
+		}
+		else
+		{
+			/* Add current E to Error_matrices */
+			for(j = 0; j < rows; j++)
+			{
+				for(k = 0; k < cols; k++)
+				{ IND3(REAL, Error_matrices, i, j, k) = e[j][k*cs]; }
+			}
+		}
+	}
+
+	free(e);
+	free(t);
+	free(p);
+	free(work);
+	free(row_ss);
+	free(col_ss);
+	return 0;
+}
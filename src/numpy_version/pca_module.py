@@ -1,6 +1,12 @@
 #!/usr/bin/env python
-from numpy import abs, array, average, corrcoef, mat, shape, std, sum, transpose, zeros
-from numpy.linalg import svd
+from numpy import abs, arange, array, asarray, average, divide, dot, einsum, empty, finfo, float32, load, memmap, multiply, ndarray, newaxis, outer, save, shape, sqrt, subtract, sum, vdot, zeros
+from numpy.linalg import eigh, lstsq, qr, svd
+from numpy.random import RandomState
+import inspect
+import json
+import os
+import tempfile
+import time
 
 try:
     import c_nipals
@@ -11,86 +17,233 @@ except:
 __author__ = "Henning Risvik"
 __date__ = "February 2008"
 __version__ = "1.1.02"
+
+# PCA_svd uses the Gram matrix (svd_gram) when X has gram_ratio times more variables than objects
+gram_ratio = 10
+
+# PCA(method='auto') uses the cost model in this file if it exists (made by calibrate), else default_costs
+cost_model_path = os.path.join(os.path.expanduser('~'), '.pca_module_costs.json')
     
 ################### Preprocessing Methods ###################
-def mean_center(X):
+def load_array(X):
+    """
+    Get X as an array. A path to a .npy file is memory-mapped (read only), not read into memory.
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it
+    @type X: numpy array, numpy memmap or str
+    
+    
+    @return: X (numpy array or memmap)
+    
+    """
+    if isinstance(X, str):
+        return load(X, mmap_mode='r')
+    return asarray(X)
+
+
+def column_stats(X, standardize=True, block_rows=4096):
     """
+    Column averages and STDs of X, found in one pass over block_rows rows at a time.
+    
+    The averages and sums of squares of each block are merged with the running values by
+    the pairwise update of Chan et al., so a memory-mapped X is never read in all at once.
     
     @param X: 2-dimensional matrix of number data 
     @type X: numpy array
     
+    @param standardize: If the STDs are wanted or not.
+    @type standardize: bool
+    
+    @param block_rows: Number of rows of X used at a time.
+    @type block_rows: int
+    
+    
+    @return: (averages, STDs), STDs is None if not standardize
+    
+    """
+    (rows, cols) = shape(X)
+    _averages = zeros((cols), float)
+    _squares = zeros((cols), float) # sums of squares about the averages
+    
+    for i in range(0, rows, block_rows):
+        block = asarray(X[i:i+block_rows], float)
+        rows_a = i; rows_b = shape(block)[0]
+        averages_b = average(block, 0)
+        delta = averages_b - _averages
+        if standardize:
+            block_c = block - averages_b
+            _squares += einsum('ij,ij->j', block_c, block_c)
+            _squares += delta**2 * (rows_a * rows_b / float(rows_a + rows_b))
+        _averages += delta * (rows_b / float(rows_a + rows_b))
+    
+    if not standardize:
+        return _averages, None
+    
+    _STDs = sqrt(_squares / rows)
+    if (_STDs == 0).any(): raise ZeroDivisionError('division by zero, cannot proceed')
+    return _averages, _STDs
+
+
+def preprocess(X, standardize=True, out=None, block_rows=4096, dtype=float):
+    """
+    Mean center and (optionally) standardize X in one fused step.
+    
+    The column averages and STDs are found by column_stats, then each block of rows
+    is centered and scaled by broadcasting straight into out.
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param out: Array to put the result in, may be X itself for in-place preprocessing. A new float array is made if None.
+    @type out: numpy array
+    
+    @param block_rows: Number of rows of X used at a time.
+    @type block_rows: int
+    
+    @param dtype: Type of the new array if out is None, float (float64) or float32.
+    @type dtype: numpy dtype
+    
+    
+    @return: (preprocessed X, averages, STDs), STDs is None if not standardize
+    
+    """
+    X = load_array(X)
+    (rows, cols) = shape(X)
+    _averages, _STDs = column_stats(X, standardize, block_rows)
+    
+    if out is None:
+        out = empty((rows, cols), dtype)
+    for i in range(0, rows, block_rows):
+        block = out[i:i+block_rows]
+        subtract(X[i:i+block_rows], _averages, out=block)
+        if standardize:
+            divide(block, _STDs, out=block)
+    return out, _averages, _STDs
+
+
+def mean_center(X, out=None, block_rows=4096, dtype=float):
+    """
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it
+    @type X: numpy array
+    
+    @param out: Array to put the result in, may be X itself. A new float array is made if None.
+    @type out: numpy array
+    
+    @param block_rows: Number of rows of X used at a time.
+    @type block_rows: int
+    
+    @param dtype: Type of the new array if out is None, float (float64) or float32.
+    @type dtype: numpy dtype
+    
     
     @return: Mean centered X (always has same dimensions as X)
     
     """
+    X = load_array(X)
     (rows, cols) = shape(X)
-    new_X = zeros((rows, cols), float)
-    _averages = average(X, 0)
-        
-    for row in range(rows):
-        new_X[row, 0:cols] = X[row, 0:cols] - _averages[0:cols]
-    return new_X
+    _averages = column_stats(X, False, block_rows)[0]
+    
+    if out is None:
+        out = empty((rows, cols), dtype)
+    for i in range(0, rows, block_rows):
+        subtract(X[i:i+block_rows], _averages, out=out[i:i+block_rows])
+    return out
         
         
-def standardization(X):        
+def standardization(X, out=None, block_rows=4096, dtype=float):        
     """
     
-    @param X: 2-dimensional matrix of number data 
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it
     @type X: numpy array
     
+    @param out: Array to put the result in, may be X itself. A new float array is made if None.
+    @type out: numpy array
+    
+    @param block_rows: Number of rows of X used at a time.
+    @type block_rows: int
+    
+    @param dtype: Type of the new array if out is None, float (float64) or float32.
+    @type dtype: numpy dtype
+    
     
     @return: Standardized X (always has same dimensions as X)
     
     """
+    X = load_array(X)
     (rows, cols) = shape(X)
-    new_X = zeros((rows, cols))
-    _STDs = std(X, 0)
-        
-    for value in _STDs:
-        if value == 0: raise ZeroDivisionError('division by zero, cannot proceed')
-        
-    for row in range(rows):
-        new_X[row, 0:cols] = X[row, 0:cols] / _STDs[0:cols]
-    return new_X        
+    _STDs = column_stats(X, True, block_rows)[1]
+    
+    if out is None:
+        out = empty((rows, cols), dtype)
+    for i in range(0, rows, block_rows):
+        divide(X[i:i+block_rows], _STDs, out=out[i:i+block_rows])
+    return out        
 
 
-       
-################### NIPALS array help functions ###################
-def get_column(E):
+def working_array(X, overwrite_x=False, dtype=float):
     """
-    Get an acceptable column-vector of E.
+    Get the out argument for preprocess: X itself when it may be overwritten, else None.
     
-    @param E: 2-dimensional matrix of number data 
-    @type E: numpy array    
+    X can only be used if it is a writeable, C-contiguous array of dtype, otherwise
+    a working copy is made even if overwrite_x is True.
+    
+    @param X: 2-dimensional matrix of number data 
+    @type X: numpy array
+    
+    @param overwrite_x: If X may be overwritten (preprocessed in place) or not.
+    @type overwrite_x: bool
+    
+    @param dtype: Type the PCA is computed in, float (float64) or float32.
+    @type dtype: numpy dtype
+    
+    
+    @return: X or None
     
-    @return: a non-zero vector
     """
-    (rows, cols) = shape(E)
-    for col_ind in range(cols):
-        t = E[:,col_ind] # extract a column
-        if (vec_inner(t) > 0):
-            return t
-    raise ValueError('all column vectors in E are zero vectors') # error: sum of matrix is 0
+    if (overwrite_x and isinstance(X, ndarray) and X.dtype == dtype and
+        X.flags.c_contiguous and X.flags.writeable):
+        return X
+    return None
+
 
+def float_type(X):
+    """
+    Get the type to compute a PCA of X in: float32 for float32 data, else float (float64).
+    
+    @param X: 2-dimensional matrix of number data 
+    @type X: numpy array
+    
+    
+    @return: float32 or float
+    
+    """
+    if getattr(X, 'dtype', None) == float32:
+        return float32
+    return float
 
-def get_column_mat(E):
+       
+################### NIPALS array help functions ###################
+def get_column(E):
     """
-    NIPALS matrix help function.
     Get an acceptable column-vector of E.
     
     @param E: 2-dimensional matrix of number data 
-    @type E: numpy matrix    
+    @type E: numpy array    
     
     @return: a non-zero vector
     """
     (rows, cols) = shape(E)
     for col_ind in range(cols):
         t = E[:,col_ind] # extract a column
-        eig = transpose(t)*t
-        if (eig > 0):
+        if (vec_inner(t) > 0):
             return t
     raise ValueError('all column vectors in E are zero vectors') # error: sum of matrix is 0
 
+
 def vec_inner(v):
     """
     @param v: Vector of number data.
@@ -98,7 +251,7 @@ def vec_inner(v):
     
     @return: transpose(v) * v (float or int)
     """
-    return sum(v * v);
+    return vdot(v, v)
 
 def mat_prod(A, x):
     """    
@@ -110,16 +263,9 @@ def mat_prod(A, x):
 
     @return: b of (Ax = b). Product of:  matrix A (m,n) * vector x (n) = vector b (m)
     """
-    #m = A.shape[0]
-    #b = zeros((m), float)
-    
-    # calc: Ax = b
-    #for i in range(m):
-    #    b[i] = sum(A[i,:]*x)
-
-    return array([sum(a[:]*x) for a in A])
+    return dot(A, x)
 
-def remove_tp_prod(E, t, p):
+def remove_tp_prod(E, t, p, block_rows=256, object_ss=None, variable_ss=None):
     """
     
     sets: E = E - (t*transpose(p))   
@@ -135,6 +281,15 @@ def remove_tp_prod(E, t, p):
     @param p: Vector of number data. Current Loading (of PC_i).
     @type p: numpy array   
 
+    @param block_rows: Number of rows of tp' made at a time, E is updated in place block by block.
+    @type block_rows: int
+
+    @param object_ss: If given, set to the sums of squares of the rows of the new E (m).
+    @type object_ss: numpy array
+
+    @param variable_ss: If given, the sums of squares of the columns of the new E are added to it (n).
+    @type variable_ss: numpy array
+
 
     @return: None   
 
@@ -142,9 +297,157 @@ def remove_tp_prod(E, t, p):
     """
     
     m = E.shape[0]
-    for i in range(m):
-        E[i, :] = E[i, :] - (t[i] * p)
-       
+    tp = empty((min(block_rows, m), E.shape[1]), E.dtype) # reused for every block
+    for i in range(0, m, block_rows):
+        j = min(i + block_rows, m)
+        multiply.outer(t[i:j], p, out=tp[:j-i])
+        subtract(E[i:j], tp[:j-i], out=E[i:j])
+        # the squares of the block of E, while it is in cache
+        if object_ss is not None:
+            object_ss[i:j] = einsum('ij,ij->i', E[i:j], E[i:j])
+        if variable_ss is not None:
+            variable_ss += einsum('ij,ij->j', E[i:j], E[i:j])
+
+def add_tp_prod(E, T, P, block_rows=256):
+    """
+
+    sets: E = E + (T*P), undoes step 5 for all PCs, so E[PCs] is E[0] again
+
+
+    @param E: 2-dimensional matrix of number data.
+    @type E: numpy array
+
+    @param T: Scores of the PCs.
+    @type T: numpy array
+
+    @param P: Loadings of the PCs.
+    @type P: numpy array
+
+    @param block_rows: Number of rows of TP made at a time, E is updated in place block by block.
+    @type block_rows: int
+
+
+    @return: None
+
+
+    """
+
+    for i in range(0, E.shape[0], block_rows):
+        E[i:i+block_rows] += dot(T[i:i+block_rows], P)
+
+
+################### Lazy residual matrices ###################
+class ResidualMatrices(object):
+    """
+    The E-matrices of NIPALS, E[i] = X - T[:, :i+1] P[:i+1] is made when it is indexed.
+
+    Only X (E[0]), Scores and Loadings are kept, not a (PCs, rows, cols) array, so the
+    E-matrices take no more memory than X. Indexing works as for the (PCs, rows, cols)
+    array, except that objects and variables are picked separately: E[i, rows, cols]
+    is E[i][rows][:, cols], also when both are lists of indices.
+
+    Example usage:
+    >>> T, P, E = PCA_nipals(X, E_matrices=True)
+    >>> E[2]            # E-matrix after PC[2], (rows, cols)
+    >>> E[-1, 10:20]    # objects 10-19 of the last E-matrix
+    >>> E[:, :, 0]      # variable 0 after each PC, (PCs, rows)
+    >>> asarray(E)      # all E-matrices, (PCs, rows, cols)
+
+    """
+    ndim = 3
+
+    def __init__(self, X, Scores, Loadings):
+        """
+        @param X: E[0] (preprocessed X), a reference is kept, not a copy.
+        @type X: numpy array
+
+        @param Scores: Scores of PCA (T).
+        @type Scores: numpy array
+
+        @param Loadings: Loadings of PCA (P).
+        @type Loadings: numpy array
+
+        """
+        self.X = X
+        self.Scores = Scores
+        self.Loadings = Loadings
+
+    @property
+    def shape(self):
+        """(PCs, rows, cols)"""
+        return (shape(self.Scores)[1],) + shape(self.X)
+
+    @property
+    def dtype(self):
+        return self.X.dtype
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > 3:
+            raise IndexError('too many indices for the E-matrices')
+        (pcs, rows, cols) = key + (slice(None),) * (3 - len(key))
+
+        X = self.X[rows][..., cols]
+        T = self.Scores[rows]
+        P = self.Loadings[:, cols]
+
+        index = arange(len(self))[pcs]
+        if index.ndim == 0:
+            return X - dot(T[..., :index+1], P[:index+1])
+
+        E = empty((len(index),) + shape(X), X.dtype)
+        for (k, i) in enumerate(index):
+            subtract(X, dot(T[..., :i+1], P[:i+1]), out=E[k, ...])
+        return E
+
+    def __array__(self, dtype=None, copy=None):
+        return asarray(self[:], dtype)
+
+
+################### Residual variance ###################
+def residual_variance(X, Scores, Loadings, block_rows=256):
+    """
+    Residual variance of each object and each variable after each PC, without the E-matrices.
+    
+    Used by the methods that do not deflate X. X is not changed, a copy of one block of rows
+    of X at a time is deflated by each PC with remove_tp_prod, which sums the squares of
+    the rows and columns of E[i] while the block is in cache. So X is read once and the
+    sums are of the residuals themselves, not differences of large sums.
+    
+    @param X: E[0], the preprocessed X the PCs were computed from.
+    @type X: numpy array
+    
+    @param Scores: Scores (T), rows x PCs.
+    @type Scores: numpy array
+    
+    @param Loadings: Loadings (P), PCs x cols.
+    @type Loadings: numpy array
+    
+    @param block_rows: Number of rows of X used at a time.
+    @type block_rows: int
+    
+    @return: (object_var, variable_var), PCs x rows and PCs x cols, the mean square of each row and column of E[i]
+    
+    """
+    (rows, cols) = shape(X)
+    PCs = len(Loadings)
+    
+    object_var = empty((PCs, rows), Scores.dtype)
+    variable_var = zeros((PCs, cols), Scores.dtype)
+    for a in range(0, rows, block_rows):
+        b = min(a + block_rows, rows)
+        E_b = array(X[a:b], Scores.dtype)
+        for i in range(PCs):
+            remove_tp_prod(E_b, Scores[a:b, i], Loadings[i], block_rows, object_var[i, a:b], variable_var[i])
+    object_var /= cols
+    variable_var /= rows
+    return object_var, variable_var
+
+
 
 ################### NIPALS Algorithm ###################
 """
@@ -168,12 +471,14 @@ def remove_tp_prod(E, t, p):
     5  E[i] = E[i-1] - tp'  Remove the estimated PC component from E[i-1] 
     
 """    
-def nipals_mat(X, PCs, threshold, E_matrices):
+def nipals_mat(X, PCs, threshold, E_matrices, overwrite_x=False, deflation='explicit', residual_var=False):
     """
     
     
     PCA by NIPALS using numpy matrix
     
+    numpy matrix is deprecated, this is kept for old code and does the same as nipals_arr.
+    
     
     @param X: 2-dimensional matrix of number data. 
     @type X: numpy array
@@ -184,106 +489,29 @@ def nipals_mat(X, PCs, threshold, E_matrices):
     @param threshold: Convergence check value. For checking on convergence to zero difference (e.g. 0.000001). 
     @type threshold: float
     
-    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC) or explained_var (explained variance for each PC).
+    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC, a ResidualMatrices) or explained_var (explained variance for each PC).
     @type E_matrices: bool
     
-    @return: (Scores, Loadings, E)
-
-    """
-    (rows, cols) = shape(X)
-
-    maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
-    if maxPCs < PCs: PCs = maxPCs # change to maxPCs if PCs > maxPCs
-    
-    Scores = zeros((rows, PCs), float) # all Scores (T)
-    Loadings = zeros((PCs, cols), float) # all Loadings (P)
-    
-    E = mat(X.copy()) #E[0]  (should already be mean centered)
-
-
-    if E_matrices:
-        Error_matrices = zeros((PCs, rows, cols), float) # all Error matrices (E)
-    else:
-        explained_var = zeros((PCs))
-        tot_explained_var = 0
-    
-        # total object residual variance for PC[0] (calculating from E[0])
-        e_tot0 = 0 # for E[0] the total object residual variance is 100%
-        for k in range(rows):
-            e_k = array(E[k, :])**2
-            e_tot0 += sum(e_k)
-            
+    @param overwrite_x: If X may be used as E (and so be overwritten) instead of a copy of X.
+    @type overwrite_x: bool
     
-
-    t = get_column_mat(E) # extract a column
+    @param deflation: 'explicit' (E[i] = E[i-1] - tp') or 'implicit' (X is left untouched). See nipals_arr.
+    @type deflation: str
     
-   
+    @param residual_var: If the residual variance should also be returned. See nipals_arr.
+    @type residual_var: bool
     
-    # do iterations (0, PCs)
-    for i in range(PCs):
-        convergence = False
-        ready_for_compare = False
-        E_t = transpose(E)
-        
-        while not convergence:
-            eigenval = float(transpose(t)*t)
-            p = (E_t*t) / eigenval # ........................................... step 1
-            
-            _p = float(transpose(p)*p)        
-            p = p * _p**(-0.5) # ............................................... step 2
-            t = (E*p) / (transpose(p)*p) # ..................................... step 3
-            
-            
-            eigenval_new = float(transpose(t)*t)
-            if not ready_for_compare:
-                ready_for_compare = True
-            else: # ready for convergence check
-                if (eigenval_new - eigenval_old) < threshold*eigenval_new: # ... step 4
-                    convergence = True           
-            eigenval_old = eigenval_new;
-            
-            
-        p = transpose(p)
-        E = E - (t*p) # ........................................................ step 5
-        
-        # add Scores and Loadings for PC[i] to the collection of all PCs
-        _t = array(t) # NOT optimal
-        Scores[:, i] = _t[:,0]; Loadings[i, :] = p[0,:] # co
-
-        if E_matrices:
-            # complete error matrix
-            # can calculate object residual variance (row-wise) or variable resiudal variance (column-wise)
-            # total residual variance can also be calculated
-            Error_matrices[i] = E.copy()
-        
-        else:
-            # total object residual variance for E[i]
-            e_tot = 0
-
-            for k in range(rows):
-                e_ = zeros((cols), float)
-                for k_col in range(cols):
-                    e_[k_col] = E[k, k_col]*E[k, k_col]
-                
-                e_tot += sum(e_)
-            tot_obj_residual_var =  (e_tot / e_tot0)
-            explained_var[i] = 1 - tot_obj_residual_var - tot_explained_var
-
-            tot_explained_var += explained_var[i]
-	    
-	    
-		
+    @return: (Scores, Loadings, E)
 
-    if E_matrices:
-        return Scores, Loadings, Error_matrices
-    return Scores, Loadings, explained_var    
+    """
+    return nipals_arr(asarray(X), PCs, threshold, E_matrices, overwrite_x, deflation, residual_var)
 
 
 
-def nipals_arr(X, PCs, threshold, E_matrices):
+def nipals_arr(X, PCs, threshold, E_matrices, overwrite_x=False, deflation='explicit', residual_var=False):
     """
     
-    PCA by NIPALS using numpy array
+    PCA by NIPALS using numpy array (BLAS matrix-vector products, in-place deflation)
     
     
     @param X: 2-dimensional matrix of number data. 
@@ -295,55 +523,76 @@ def nipals_arr(X, PCs, threshold, E_matrices):
     @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
     @type threshold: float
     
-    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC) or explained_var (explained variance for each PC).
+    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC, a ResidualMatrices) or explained_var (explained variance for each PC).
     @type E_matrices: bool
     
-    @return: (Scores, Loadings, E)
+    @param overwrite_x: If X may be used as E (and so be overwritten) instead of a copy of X.
+    @type overwrite_x: bool
+    
+    @param deflation: 'explicit' removes tp' from E after each PC (step 5). 'implicit' never writes to X,
+    the PCs found so far are removed inside the products instead (E't = X't - P(T't) and Ep = Xp - T(Pp)).
+    Implicit deflation is cheaper when a few PCs are wanted from a large X.
+    @type deflation: str
+    
+    @param residual_var: If the residual variance of each object and variable after each PC should
+    also be returned, summed while E is deflated (residual_variance with implicit deflation).
+    @type residual_var: bool
+    
+    @return: (Scores, Loadings, E), followed by (object_var, variable_var) if residual_var
 
 
     """
     
+    if deflation not in ('explicit', 'implicit'):
+        raise ValueError("deflation must be 'explicit' or 'implicit', not %r" % (deflation,))
+    implicit = deflation == 'implicit'
+    
     (rows, cols) = shape(X)
     maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
     if maxPCs < PCs: PCs = maxPCs # change to maxPCs if PCs > maxPCs
 
-    Scores = zeros((rows, PCs), float) # all Scores (T)
-    Loadings = zeros((PCs, cols), float) # all Loadings (P)
-    
-    E = X.copy() #E[0]  (should already be mean centered)
+    dtype = float_type(X) # float32 data is computed in float32
+    Scores = zeros((rows, PCs), dtype) # all Scores (T)
+    Loadings = zeros((PCs, cols), dtype) # all Loadings (P)
     
-    if E_matrices:
-        Error_matrices = zeros((PCs, rows, cols), float) # all Error matrices (E)
+    if overwrite_x or implicit: # with implicit deflation E stays E[0]
+        E = asarray(X, dtype) #E[0]  (should already be mean centered)
     else:
-        explained_var = zeros((PCs))
-        tot_explained_var = 0
+        E = array(X, dtype)
+    
+    if not E_matrices:
+        explained_var = zeros((PCs), dtype)
     
         # total object residual variance for PC[0] (calculating from E[0])
-        e_tot0 = 0 # for E[0] the total object residual variance is 100%
-        for k in range(rows):
-            e_k = E[k, :]**2
-            e_tot0 += sum(e_k)      
-            
+        e_tot0 = vec_inner(E) # for E[0] the total object residual variance is 100%
+    
+    if residual_var and not implicit:
+        # sums of squares of the rows and columns of E[i], made mean squares at the end
+        object_var = empty((PCs, rows), dtype)
+        variable_var = zeros((PCs, cols), dtype)
     
 
-    t = get_column(E) # extract a column
-    p = zeros((cols), float)
+    # t and p are preallocated, the products are written straight into them
+    t = get_column(E).copy() # extract a column
+    p = zeros((cols), dtype)
     
     # do iterations (0, PCs)
     for i in range(PCs):
         convergence = False
         ready_for_compare = False
-        E_t = transpose(E)
         
         while not convergence:
-            _temp = vec_inner(t)
-            p = mat_prod(E_t, t) / _temp # ..................................... step 1
+            dot(t, E, out=p) # E't, without transposing E
+            if implicit and i > 0:
+                p -= dot(dot(t, Scores[:, :i]), Loadings[:i])
+            p /= vec_inner(t) # ................................................ step 1
             
-            _temp = vec_inner(p)**(-0.5)
-            p = p * _temp # .................................................... step 2
+            p *= vec_inner(p)**(-0.5) # ........................................ step 2
             
-            _temp = vec_inner(p)
-            t = mat_prod(E, p) / _temp # ....................................... step 3
+            dot(E, p, out=t)
+            if implicit and i > 0:
+                t -= dot(Scores[:, :i], dot(Loadings[:i], p))
+            t /= vec_inner(p) # ................................................ step 3
             
             
             eigenval_new = vec_inner(t)
@@ -354,42 +603,45 @@ def nipals_arr(X, PCs, threshold, E_matrices):
                     convergence = True           
             eigenval_old = eigenval_new;
 
-        remove_tp_prod(E, t, p) # .............................................. step 5
+        if residual_var and not implicit:
+            remove_tp_prod(E, t, p, object_ss=object_var[i], variable_ss=variable_var[i]) # step 5
+        elif not implicit:
+            remove_tp_prod(E, t, p) # .......................................... step 5
         
         # add Scores and Loadings for PC[i] to the collection of all PCs
         Scores[:, i] = t; Loadings[i, :] = p
         
         
-        if E_matrices:
-            # complete error matrix
-            # can calculate object residual variance (row-wise) or variable resiudal variance (column-wise)
-            # total residual variance can also be calculated
-		
-            Error_matrices[i] = E.copy()
-        
+        if not E_matrices:
+            # explained variance for PC[i], |E[i]|^2 = |E[i-1]|^2 - t't since p'p = 1
+            explained_var[i] = vec_inner(t) / e_tot0
+
+    if residual_var:
+        if implicit: # E is still E[0]
+            object_var, variable_var = residual_variance(E, Scores, Loadings)
         else:
-            # total object residual variance for E[i]
-            e_tot = 0
-            for k in range(rows):
-                e_k = E[k, :]**2
-                e_tot += sum(e_k)
-            tot_obj_residual_var =  (e_tot / e_tot0)
-            explained_var[i] = 1 - tot_obj_residual_var - tot_explained_var
-            tot_explained_var += explained_var[i]
+            object_var /= cols
+            variable_var /= rows
 
     if E_matrices:
-        return Scores, Loadings, Error_matrices
+        # the E-matrices are made from E[0] when indexed
+        if not implicit:
+            add_tp_prod(E, Scores, Loadings) # E[PCs] back to E[0]
+        result = Scores, Loadings, ResidualMatrices(E, Scores, Loadings)
     else:
-        return Scores, Loadings, explained_var 
+        result = Scores, Loadings, explained_var
+    if residual_var:
+        result += (object_var, variable_var)
+    return result
     
     
 
-def nipals_c(X, PCs, threshold, E_matrices):
+def nipals_c(X, PCs, threshold, E_matrices, overwrite_x=False, threads=0, residual_var=False):
     """  
     
     PCA by NIPALS using python c extension
     
-    @param X: 2-dimensional matrix of number data. 
+    @param X: 2-dimensional matrix of number data. float32 data is kept in float32 (any other type is used as float64).
     @type X: numpy array
     
     @param PCs: Number of Principal Components.
@@ -398,10 +650,20 @@ def nipals_c(X, PCs, threshold, E_matrices):
     @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
     @type threshold: float
     
-    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC) or explained_var (explained variance for each PC).
+    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC, a ResidualMatrices) or explained_var (explained variance for each PC).
     @type E_matrices: bool
     
-    @return: (Scores, Loadings, E)
+    @param overwrite_x: If X may be used as E (and so be overwritten) instead of a copy of X, X can be in any memory order.
+    @type overwrite_x: bool
+    
+    @param threads: Number of OpenMP threads used by the C extension, all cores if < 1.
+    @type threads: int
+    
+    @param residual_var: If the residual variance of each object and variable after each PC should
+    also be returned, summed by the C extension while E is deflated.
+    @type residual_var: bool
+    
+    @return: (Scores, Loadings, E), followed by (object_var, variable_var) if residual_var
     
 
     """
@@ -415,64 +677,66 @@ def nipals_c(X, PCs, threshold, E_matrices):
     maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
     if maxPCs < PCs: PCs = maxPCs # change to maxPCs if PCs > maxPCs
 
-    Scores = zeros((rows, PCs), float) # all Scores (T)
-    Loadings = zeros((PCs, cols), float) # all Loadings (P)
+    # the C extension works on float32 or float64 arrays, with any strides
+    dtype = float_type(X)
+
+    if overwrite_x and isinstance(X, ndarray) and X.dtype == dtype and X.flags.writeable and X.flags.aligned:
+        E = X #E[0]  (should already be mean centered)
+    else:
+        E = array(X, dtype)
 
-    E = X.copy() #E[0]  (should already be mean centered)
+    Scores = zeros((rows, PCs), dtype) # all Scores (T)
+    Loadings = zeros((PCs, cols), dtype) # all Loadings (P)
 
+    if residual_var:
+        object_var = empty((PCs, rows), dtype) # mean squares of the rows of E[i]
+        variable_var = empty((PCs, cols), dtype) # mean squares of the columns of E[i]
+        explained_var = c_nipals.nipals(Scores, Loadings, E, PCs, threshold, threads, object_var, variable_var)
+    else:
+        explained_var = c_nipals.nipals(Scores, Loadings, E, PCs, threshold, threads)
     if E_matrices:
-        Error_matrices = zeros((PCs, rows, cols), float) # all Error matrices (E)
-        c_nipals.nipals2(Scores, Loadings, E, Error_matrices, PCs, threshold)
-        return Scores, Loadings, Error_matrices
+        # the E-matrices are made from E[0] when indexed
+        add_tp_prod(E, Scores, Loadings) # E[PCs] back to E[0]
+        result = Scores, Loadings, ResidualMatrices(E, Scores, Loadings)
     else:
-        explained_var = c_nipals.nipals(Scores, Loadings, E, PCs, threshold)
-        return Scores, Loadings, explained_var
+        result = Scores, Loadings, explained_var
+    if residual_var:
+        result += (object_var, variable_var)
+    return result
 
 
 
-################### Principal Component Analysis (using NIPALS) ###################
-def PCA_nipals(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False):
+################### Out-of-core NIPALS Algorithm ###################
+def scratch_array(shape_, scratch_dir=None, dtype=float):
     """
+    Get a disk-backed float array, in an anonymous temporary file that is removed with the array.
     
-    PCA by NIPALS and get Scores, Loadings, E
-    
-    @param X: 2-dimensional matrix of number data. 
-    @type X: numpy array
-    
-    @param standardize: Wheter X should be standardized or not.
-    @type standardize: bool
-    
-    @param PCs: Number of Principal Components.
-    @type PCs: int
+    @param shape_: Shape of the array.
+    @type shape_: tuple
     
-    @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
-    @type threshold: float
+    @param scratch_dir: Directory for the file, the default temporary directory if None.
+    @type scratch_dir: str
     
-    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC) or explained_var (explained variance for each PC).
-    @type E_matrices: bool
+    @param dtype: Type of the array, float (float64) or float32.
+    @type dtype: numpy dtype
     
-    @return: nipals_mat(X, PCs, threshold, E_matrices)
-
+    @return: numpy memmap
     """
+    return memmap(tempfile.TemporaryFile(dir=scratch_dir), dtype, 'w+', shape=shape_)
 
-    X = mean_center(X)
-        
-    if standardize:
-        X = standardization(X)
-    
-    return nipals_mat(X, PCs, threshold, E_matrices) 
-    
 
-def PCA_nipals2(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False):
+def nipals_blocks(E, PCs, threshold, block_rows, residual_var=False):
     """
     
-    PCA by NIPALS and get Scores, Loadings, E
+    PCA by NIPALS, working on block_rows rows of E at a time
     
-    @param X: 2-dimensional matrix of number data. 
-    @type X: numpy array
+    E is deflated in place and may be a (disk-backed) numpy memmap, only a block of rows
+    is in memory at a time. Step 3 of each iteration and step 1 of the next are done in
+    the same pass over E, and so are step 5 and step 1 of the next PC, so E is read
+    once per iteration.
     
-    @param standardize: Wheter X should be standardized or not.
-    @type standardize: bool
+    @param E: 2-dimensional matrix of number data, E[0] (mean centered X). Overwritten.
+    @type E: numpy array or memmap
     
     @param PCs: Number of Principal Components.
     @type PCs: int
@@ -480,31 +744,177 @@ def PCA_nipals2(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False)
     @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
     @type threshold: float
     
-    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC) or explained_var (explained variance for each PC).
-    @type E_matrices: bool
+    @param block_rows: Number of rows of E used at a time.
+    @type block_rows: int
     
-    @return: nipals_arr(X, PCs, threshold, E_matrices)
-
-    """
-
-    X = mean_center(X)
-        
-    if standardize:
-        X = standardization(X)
+    @param residual_var: If the residual variance of each object and variable after each PC should
+    also be returned, summed while E is deflated.
+    @type residual_var: bool
     
-    return nipals_arr(X, PCs, threshold, E_matrices)     
+    @return: (Scores, Loadings, explained_var), followed by (object_var, variable_var) if residual_var
 
-
-def PCA_nipals_c(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False):
     """
+    (rows, cols) = shape(E)
+    maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
+    if maxPCs < PCs: PCs = maxPCs # change to maxPCs if PCs > maxPCs
+
+    dtype = float_type(E) # float32 data is computed in float32
+    Scores = zeros((rows, PCs), dtype) # all Scores (T)
+    Loadings = zeros((PCs, cols), dtype) # all Loadings (P)
+    explained_var = zeros((PCs), dtype)
+    blocks = [(i, min(i + block_rows, rows)) for i in range(0, rows, block_rows)]
+    if residual_var:
+        # sums of squares of the rows and columns of E[i], made mean squares at the end
+        object_var = empty((PCs, rows), dtype)
+        variable_var = zeros((PCs, cols), dtype)
+    
+    t = get_column(E).copy() # extract a column
+    
+    # E't for the first iteration, and total object residual variance for PC[0]
+    Et_t = zeros((cols), dtype)
+    e_tot0 = 0
+    for (a, b) in blocks:
+        Et_t += dot(t[a:b], E[a:b])
+        e_tot0 += vec_inner(E[a:b])
     
-    PCA by NIPALS and get Scores, Loadings, E
-    
-    @param X: 2-dimensional matrix of number data. 
-    @type X: numpy array
-    
-    @param standardize: Wheter X should be standardized or not.
-    @type standardize: bool
+    # do iterations (0, PCs)
+    for i in range(PCs):
+        convergence = False
+        ready_for_compare = False
+        
+        while not convergence:
+            p = Et_t / vec_inner(t) # .......................................... step 1
+            p *= vec_inner(p)**(-0.5) # ........................................ step 2
+            
+            _temp = vec_inner(p)
+            Et_t[:] = 0
+            for (a, b) in blocks:
+                E_b = E[a:b]
+                dot(E_b, p, out=t[a:b])
+                t[a:b] /= _temp # .............................................. step 3
+                Et_t += dot(t[a:b], E_b) # step 1 of the next iteration
+            
+            eigenval_new = vec_inner(t)
+            if not ready_for_compare:
+                ready_for_compare = True
+            else: # ready for convergence check
+                if (eigenval_new - eigenval_old) < threshold*eigenval_new: # ... step 4
+                    convergence = True           
+            eigenval_old = eigenval_new;
+        
+        Et_t[:] = 0
+        for (a, b) in blocks:
+            E_b = E[a:b]
+            if residual_var:
+                remove_tp_prod(E_b, t[a:b], p, object_ss=object_var[i, a:b], variable_ss=variable_var[i]) # step 5
+            else:
+                remove_tp_prod(E_b, t[a:b], p) # ............................... step 5
+            Et_t += dot(t[a:b], E_b) # step 1 of the next PC
+        
+        # add Scores and Loadings for PC[i] to the collection of all PCs
+        Scores[:, i] = t; Loadings[i, :] = p
+        
+        # explained variance for PC[i], |E[i]|^2 = |E[i-1]|^2 - t't since p'p = 1
+        explained_var[i] = vec_inner(t) / e_tot0
+    
+    if residual_var:
+        object_var /= cols
+        variable_var /= rows
+        return Scores, Loadings, explained_var, object_var, variable_var
+    return Scores, Loadings, explained_var
+
+
+
+################### Block NIPALS Algorithm ###################
+"""
+  Estimation of all PCs at once with block NIPALS (subspace iteration):
+
+
+  T = E(:, 0:PCs+oversample)  (the first columns of X (mean centered) are the starting T block)
+
+  P = orth(E'T)
+
+  repeat:
+
+    1  T = EP  Project X onto the loadings block P (matrix-matrix product)
+
+    2  Rotate T and P to the eigenvectors of T'T (Rayleigh-Ritz), eigenvals = diag(T'T)
+
+    3  Check for convergence, if any of the first PCs eigenvals changed more than threshold*eigenval go on to step 4
+
+    4  P = orth(E'T)  Project X onto T and orthonormalise the loadings block (QR), return to step 1
+
+"""
+def nipals_block(X, PCs, threshold, oversample=5, max_iter=1000):
+    """
+
+    PCA by block NIPALS, all PCs are found together with matrix-matrix products
+    and QR re-orthonormalisation. X is not changed.
+
+    @param X: 2-dimensional matrix of number data.
+    @type X: numpy array
+
+    @param PCs: Number of Principal Components.
+    @type PCs: int
+
+    @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001).
+    @type threshold: float
+
+    @param oversample: Extra columns in the block. They are not returned, but make the PCs converge in far fewer iterations.
+    @type oversample: int
+
+    @param max_iter: Maximum number of iterations, the PCs found so far are returned if reached.
+    @type max_iter: int
+
+    @return: (Scores, Loadings, explained_var), equal to nipals_arr up to the sign of each PC
+
+    """
+    X = asarray(X, float_type(X))
+    (rows, cols) = shape(X)
+    maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
+    if maxPCs < PCs: PCs = maxPCs # change to maxPCs if PCs > maxPCs
+
+    e_tot0 = vec_inner(X) # total variance of E[0]
+    if e_tot0 == 0:
+        raise ValueError('all column vectors in E are zero vectors')
+
+    block = min(PCs + oversample, maxPCs)
+    P = qr(dot(X[:, :block].T, X).T)[0] # starting loadings block (cols, block)
+    eigenvals_old = None
+
+    for iteration in range(max_iter):
+        T = dot(X, P) # ........................................................ step 1
+
+        eigenvals, V = eigh(dot(T.T, T)) # ..................................... step 2
+        eigenvals = eigenvals[::-1]; V = V[:, ::-1] # largest PC first
+        T = dot(T, V); P = dot(P, V)
+
+        if eigenvals_old is not None: # ........................................ step 3
+            # relative to the first PC, PCs beyond the rank of X are rounding error and never settle
+            if (abs(eigenvals[:PCs] - eigenvals_old[:PCs]) <= threshold*eigenvals[0]).all():
+                break
+        eigenvals_old = eigenvals
+
+        if iteration + 1 < max_iter: # T and P of the last iteration are returned
+            P = qr(dot(T.T, X).T)[0] # ......................................... step 4
+
+    explained_var = eigenvals[:PCs] / e_tot0
+    return T[:, :PCs].copy(), P[:, :PCs].T.copy(), explained_var
+
+
+
+################### Principal Component Analysis (using NIPALS) ###################
+def PCA_nipals(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False, overwrite_x=False, deflation='explicit',
+               max_memory=None, scratch_dir=None, dtype=float, residual_var=False):
+    """
+    
+    PCA by NIPALS and get Scores, Loadings, E
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
     
     @param PCs: Number of Principal Components.
     @type PCs: int
@@ -512,96 +922,1144 @@ def PCA_nipals_c(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False
     @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
     @type threshold: float
     
-    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC) or explained_var (explained variance for each PC).
+    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC, a ResidualMatrices) or explained_var (explained variance for each PC).
     @type E_matrices: bool
     
-    @return: nipals_c(X, PCs, threshold, E_matrices)
+    @param overwrite_x: If X may be overwritten by the preprocessing and NIPALS. Otherwise only one working copy of X is made.
+    @type overwrite_x: bool
+    
+    @param deflation: 'explicit' or 'implicit' (X is not deflated, cheaper for a few PCs of a large X). See nipals_arr.
+    @type deflation: str
+    
+    @param max_memory: Memory budget in bytes. If set, X is preprocessed into a disk-backed scratch
+    file (or into X itself with overwrite_x) and NIPALS works on it a block of rows at a time,
+    so X can be larger than the memory. E_matrices can not be used then.
+    @type max_memory: int
+    
+    @param scratch_dir: Directory for the scratch file, the default temporary directory if None.
+    @type scratch_dir: str
+    
+    @param dtype: float (float64) or float32. With float32 X is preprocessed into and the PCA computed in float32,
+    with half the memory (see testing.py for the accuracy).
+    @type dtype: numpy dtype
+    
+    @param residual_var: If the residual variance of each object and variable after each PC
+    should also be returned (see nipals_arr), without the E-matrices.
+    @type residual_var: bool
+    
+    @return: nipals_mat(X, PCs, threshold, E_matrices, overwrite_x, deflation, residual_var) or
+    nipals_blocks(E, PCs, threshold, block_rows, residual_var) if max_memory is set
 
     """
 
-    """ USING C PYTHON EXTENSION """
-    X = mean_center(X)
+    if max_memory is not None:
+        if E_matrices:
+            raise ValueError('E_matrices can not be used with max_memory')
+        X = load_array(X)
+        # a block of E and a block of tp' (remove_tp_prod) are in memory at a time
+        block_rows = max(1, int(max_memory // (2 * shape(X)[1] * (finfo(dtype).bits // 8))))
         
-    if standardize:
-        X = standardization(X)
+        E = working_array(X, overwrite_x, dtype)
+        if E is None:
+            E = scratch_array(shape(X), scratch_dir, dtype)
+        preprocess(X, standardize, E, block_rows)
+        return nipals_blocks(E, PCs, threshold, block_rows, residual_var)
+
+    X = preprocess(X, standardize, working_array(X, overwrite_x, dtype), dtype=dtype)[0]
+    
+    return nipals_mat(X, PCs, threshold, E_matrices, True, deflation, residual_var)
+    
+
+def PCA_nipals2(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False, overwrite_x=False, deflation='explicit',
+                dtype=float, residual_var=False):
+    """
+    
+    PCA by NIPALS and get Scores, Loadings, E
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param PCs: Number of Principal Components.
+    @type PCs: int
+    
+    @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
+    @type threshold: float
+    
+    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC, a ResidualMatrices) or explained_var (explained variance for each PC).
+    @type E_matrices: bool
+    
+    @param overwrite_x: If X may be overwritten by the preprocessing and NIPALS. Otherwise only one working copy of X is made.
+    @type overwrite_x: bool
+    
+    @param deflation: 'explicit' or 'implicit' (X is not deflated, cheaper for a few PCs of a large X). See nipals_arr.
+    @type deflation: str
+    
+    @param dtype: float (float64) or float32. With float32 X is preprocessed into and the PCA computed in float32,
+    with half the memory (see testing.py for the accuracy).
+    @type dtype: numpy dtype
+    
+    @param residual_var: If the residual variance of each object and variable after each PC
+    should also be returned (see nipals_arr), without the E-matrices.
+    @type residual_var: bool
+    
+    @return: nipals_arr(X, PCs, threshold, E_matrices, overwrite_x, deflation, residual_var)
+
+    """
+
+    X = preprocess(X, standardize, working_array(X, overwrite_x, dtype), dtype=dtype)[0]
+    
+    return nipals_arr(X, PCs, threshold, E_matrices, True, deflation, residual_var)
+
+
+def PCA_nipals_c(X, standardize=True, PCs=10, threshold=0.0001, E_matrices=False, overwrite_x=False, threads=0, dtype=float,
+                 residual_var=False):
+    """
+    
+    PCA by NIPALS and get Scores, Loadings, E
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param PCs: Number of Principal Components.
+    @type PCs: int
+    
+    @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
+    @type threshold: float
+    
+    @param E_matrices: If E-matrices should be retrieved or not. E-matrices (for each PC, a ResidualMatrices) or explained_var (explained variance for each PC).
+    @type E_matrices: bool
+    
+    @param overwrite_x: If X may be overwritten by the preprocessing and NIPALS. Otherwise only one working copy of X is made.
+    @type overwrite_x: bool
+    
+    @param threads: Number of OpenMP threads used by the C extension, all cores if < 1.
+    @type threads: int
+    
+    @param dtype: float (float64) or float32. With float32 X is preprocessed into and the PCA computed in float32,
+    with half the memory (see testing.py for the accuracy).
+    @type dtype: numpy dtype
+    
+    @param residual_var: If the residual variance of each object and variable after each PC
+    should also be returned (see nipals_c), without the E-matrices.
+    @type residual_var: bool
+    
+    @return: nipals_c(X, PCs, threshold, E_matrices, overwrite_x, threads, residual_var)
+
+    """
+
+    """ USING C PYTHON EXTENSION """
+    X = preprocess(X, standardize, working_array(X, overwrite_x, dtype), dtype=dtype)[0]
+    
+    return nipals_c(X, PCs, threshold, E_matrices, True, threads, residual_var)
+
+
+def PCA_block(X, standardize=True, PCs=10, threshold=0.0001, oversample=5, overwrite_x=False, dtype=float, residual_var=False,
+              max_iter=1000):
+    """
+    
+    PCA by block NIPALS and get Scores, Loadings, explained_var
+    
+    Faster than the other NIPALS methods when many PCs are wanted from a large X.
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param PCs: Number of Principal Components.
+    @type PCs: int
+    
+    @param threshold: Convergence check value. For checking on convergence to zero (e.g. 0.000001). 
+    @type threshold: float
+    
+    @param oversample: Extra columns in the block, for faster convergence.
+    @type oversample: int
     
-    return nipals_c(X, PCs, threshold, E_matrices)      
+    @param overwrite_x: If X may be overwritten by the preprocessing. Otherwise one working copy of X is made.
+    @type overwrite_x: bool
+    
+    @param dtype: float (float64) or float32. With float32 X is preprocessed into and the PCA computed in float32,
+    with half the memory (see testing.py for the accuracy).
+    @type dtype: numpy dtype
+    
+    @param residual_var: If the residual variance of each object and variable after each PC
+    should also be returned (see residual_variance), without the E-matrices.
+    @type residual_var: bool
+    
+    @param max_iter: Maximum number of block iterations.
+    @type max_iter: int
+    
+    @return: nipals_block(X, PCs, threshold, oversample, max_iter),
+    followed by residual_variance(...) if residual_var
+
+    """
+
+    X = preprocess(X, standardize, working_array(X, overwrite_x, dtype), dtype=dtype)[0]
+    
+    result = nipals_block(X, PCs, threshold, oversample, max_iter)
+    if residual_var:
+        result += residual_variance(X, result[0], result[1])
+    return result
     
     
     
 ################### Principal Component Analysis (using SVD) ###################
-def PCA_svd(X, standardize=True):
+def svd_arr(X, PCs=None):
+    """
+    PCA by economy SVD (U is (rows, min(rows, cols)), not (rows, rows)). X is not changed.
+    
+    @param X: 2-dimensional matrix of number data. 
+    @type X: numpy array
+    
+    @param PCs: Number of Principal Components, all if None.
+    @type PCs: int
+    
+    @return: (Scores, Loadings, explained_var)
+
+    """
+    (rows, cols) = shape(X)
+    
+    # Singular Value Decomposition
+    [U, S, V] = svd(X, full_matrices=False)
+    
+    variances = S**2 / cols
+    variances_sum = sum(variances) # all PCs, also when only some are returned
+    
+    if PCs is not None:
+        U = U[:, 0:PCs]; S = S[0:PCs]; V = V[0:PCs]
+    
+    Scores = U * S # Scores (T)
+    Loadings = V # Loadings (P)
+    
+    explained_var = variances[0:shape(S)[0]] / variances_sum
+    
+    return Scores, Loadings, explained_var
+
+
+def svd_gram(X, PCs=None):
+    """
+    PCA by eigendecomposition of the (rows, rows) Gram matrix XX'. X is not changed.
+    
+    For wide X (few objects, many variables) this is much cheaper than the SVD of X,
+    and gives the same PCs up to sign. The small PCs are less accurate, since XX'
+    squares the condition number of X.
+    
+    @param X: 2-dimensional matrix of number data. 
+    @type X: numpy array
+    
+    @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+    @type PCs: int
+    
+    @return: (Scores, Loadings, explained_var). Loadings of PCs with no variance are zero.
+
+    """
+    (rows, cols) = shape(X)
+    
+    G = dot(X, X.T) # Gram matrix
+    variances_sum = G.trace() # = vec_inner(X), all PCs
+    
+    eigenvals, U = eigh(G)
+    eigenvals = eigenvals[::-1]; U = U[:, ::-1] # largest PC first
+    
+    maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
+    if PCs is None or maxPCs < PCs: PCs = maxPCs
+    eigenvals = eigenvals[0:PCs].copy(); U = U[:, 0:PCs]
+    
+    # the eigenvalues of XX' have an error of about eps times the largest, PCs below it have no variance
+    keep = eigenvals > eigenvals.max() * finfo(float_type(X)).eps
+    eigenvals[~keep] = 0
+    
+    S = sqrt(eigenvals) # singular values of X
+    Scores = U * S # Scores (T)
+    
+    # X = USV'  =>  V' = U'X / S, for the PCs with variance
+    Loadings = dot(U.T, X) # Loadings (P)
+    Loadings[keep] /= S[keep, newaxis]
+    Loadings[~keep] = 0
+    
+    explained_var = eigenvals / variances_sum
+    
+    return Scores, Loadings, explained_var
+
+
+def PCA_svd(X, standardize=True, PCs=None, overwrite_x=False, gram=None, dtype=float, residual_var=False):
     """   
     PCA by SVD and get Scores, Loadings, E
     Remake of method made by Oliver Tomic Ph.D.
     
-    @param X: 2-dimensional matrix of number data. 
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
     @type X: numpy array
     
     @param standardize: Wheter X should be standardized or not.
     @type standardize: bool
     
+    @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+    @type PCs: int
+    
+    @param overwrite_x: If X may be overwritten by the preprocessing (numpy.linalg.svd still works on its own copy).
+    @type overwrite_x: bool
+    
+    @param gram: Use svd_gram instead of svd_arr. If None, svd_gram is used for wide X (cols >= gram_ratio*rows).
+    @type gram: bool
+    
+    @param dtype: float (float64) or float32. With float32 X is preprocessed into and the PCA computed in float32,
+    with half the memory (see testing.py for the accuracy).
+    @type dtype: numpy dtype
+    
+    @param residual_var: If the residual variance of each object and variable after each PC
+    should also be returned (see residual_variance), without the E-matrices.
+    @type residual_var: bool
+    
+    @return: svd_arr(X, PCs) or svd_gram(X, PCs),
+    followed by residual_variance(...) if residual_var
+
+    """
+
+    X = preprocess(X, standardize, working_array(X, overwrite_x, dtype), dtype=dtype)[0]
+    
+    (rows, cols) = shape(X)
+    if gram is None:
+        gram = cols >= gram_ratio * rows
+    
+    if gram:
+        result = svd_gram(X, PCs)
+    else:
+        result = svd_arr(X, PCs)
+    if residual_var:
+        result += residual_variance(X, result[0], result[1])
+    return result
+
+
+
+################### Randomized SVD Algorithm ###################
+"""
+  Estimation of the first PCs with a randomized range finder (Halko, Martinsson and Tropp):
+
+
+  Y = E Omega  (Omega is a random (cols, PCs+oversample) matrix)
+
+  Q = orth(Y)  Orthonormal basis for the range of E (QR)
+
+  repeat power_iters times:
+
+    Q = orth(E orth(E'Q))  Power iteration, sharpens the basis when the singular values decay slowly
+
+  B = Q'E  Small (PCs+oversample, cols) matrix
+
+  B = U_b S V'  SVD of the small matrix, E ~ (Q U_b) S V'
+
+"""
+def svd_randomized(X, PCs, oversample=10, power_iters=2, seed=None):
+    """
+
+    PCA by randomized SVD, only the first PCs are found. X is not changed.
+
+    @param X: 2-dimensional matrix of number data.
+    @type X: numpy array
+
+    @param PCs: Number of Principal Components.
+    @type PCs: int
+
+    @param oversample: Extra random vectors used for the range of X, more give better accuracy.
+    @type oversample: int
+
+    @param power_iters: Number of power iterations.
+    @type power_iters: int
+
+    @param seed: Seed for the random matrix, the same seed gives the same result.
+    @type seed: int
+
     @return: (Scores, Loadings, explained_var)
 
     """
+    X = asarray(X, float_type(X))
+    (rows, cols) = shape(X)
+    maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
+    if maxPCs < PCs: PCs = maxPCs # change to maxPCs if PCs > maxPCs
 
-    X = mean_center(X)
-    #print X
-        
-    if standardize:
-        X = standardization(X)    
-        
+    block = min(PCs + oversample, maxPCs)
+    Omega = asarray(RandomState(seed).standard_normal((cols, block)), X.dtype)
+
+    Q = qr(dot(X, Omega))[0]
+    for i in range(power_iters):
+        Q = qr(dot(Q.T, X).T)[0]
+        Q = qr(dot(X, Q))[0]
+
+    [U, S, V] = svd(dot(Q.T, X), full_matrices=False)
+
+    Scores = dot(Q, U[:, :PCs]) * S[:PCs] # Scores (T)
+    Loadings = V[:PCs] # Loadings (P)
+    explained_var = S[:PCs]**2 / vec_inner(X)
+
+    return Scores, Loadings, explained_var
+
+
+def PCA_randomized(X, standardize=True, PCs=10, oversample=10, power_iters=2, seed=None, overwrite_x=False, dtype=float,
+                   residual_var=False):
+    """
+    PCA by randomized SVD and get Scores, Loadings, explained_var
+    
+    Much faster than PCA_svd when only a few PCs are wanted from a large X.
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param PCs: Number of Principal Components.
+    @type PCs: int
+    
+    @param oversample: Extra random vectors used for the range of X.
+    @type oversample: int
+    
+    @param power_iters: Number of power iterations.
+    @type power_iters: int
+    
+    @param seed: Seed for the random matrix.
+    @type seed: int
+    
+    @param overwrite_x: If X may be overwritten by the preprocessing. Otherwise one working copy of X is made.
+    @type overwrite_x: bool
+    
+    @param dtype: float (float64) or float32. With float32 X is preprocessed into and the PCA computed in float32,
+    with half the memory (see testing.py for the accuracy).
+    @type dtype: numpy dtype
+    
+    @param residual_var: If the residual variance of each object and variable after each PC
+    should also be returned (see residual_variance), without the E-matrices.
+    @type residual_var: bool
+    
+    @return: svd_randomized(X, PCs, oversample, power_iters, seed),
+    followed by residual_variance(...) if residual_var
+
+    """
+
+    X = preprocess(X, standardize, working_array(X, overwrite_x, dtype), dtype=dtype)[0]
+    
+    result = svd_randomized(X, PCs, oversample, power_iters, seed)
+    if residual_var:
+        result += residual_variance(X, result[0], result[1])
+    return result
+
+
+
+################### Principal Component Analysis (using the cross-product matrix) ###################
+def update_cross_products(rows, averages, C, chunk):
+    """
+    Add a chunk of rows to running column averages and centered cross-products.
+    
+    The chunk is centered on its own averages and merged with the running values
+    by the pairwise update of Chan et al., which stays accurate for any number of chunks.
+    
+    @param rows: Number of rows seen so far (0 for the first chunk).
+    @type rows: int
+    
+    @param averages: Column averages of the rows seen so far (None for the first chunk).
+    @type averages: numpy array
+    
+    @param C: Centered cross-product matrix (X - averages)'(X - averages) of the rows seen so far, updated in place (None for the first chunk).
+    @type C: numpy array
+    
+    @param chunk: 2-dimensional matrix of number data, the new rows. A float32 chunk is multiplied in float32.
+    @type chunk: numpy array
+    
+    
+    @return: (rows, averages, C) for all rows seen, averages and C are float (float64)
+    
+    """
+    chunk = asarray(chunk, float_type(chunk))
+    rows_b = shape(chunk)[0]
+    averages_b = chunk.mean(0, dtype=float) # summed in float64, float32 sums lose the digits of large averages
+    chunk_c = asarray(chunk - averages_b, chunk.dtype)
+    C_b = asarray(dot(chunk_c.T, chunk_c), float)
+    if rows == 0:
+        return rows_b, averages_b, C_b
+    
+    rows_ab = rows + rows_b
+    delta = averages_b - averages
+    C += C_b
+    C += outer(delta, delta) * (rows * rows_b / float(rows_ab))
+    return rows_ab, averages + delta * (rows_b / float(rows_ab)), C
+
+
+def cross_products(X, chunk_size=10000, dtype=float):
+    """
+    Column averages and centered cross-product matrix of X, read chunk_size rows at a time.
+    
+    @param X: 2-dimensional matrix of number data. 
+    @type X: numpy array
+    
+    @param chunk_size: Number of rows of X used at a time.
+    @type chunk_size: int
+    
+    @param dtype: Type the chunks are multiplied in, float (float64) or float32.
+    @type dtype: numpy dtype
+    
+    
+    @return: (rows, averages, C), see update_cross_products
+    
+    """
     (rows, cols) = shape(X)
+    seen, averages, C = 0, None, None
+    for i in range(0, rows, chunk_size):
+        seen, averages, C = update_cross_products(seen, averages, C, asarray(X[i:i+chunk_size], dtype))
+    return seen, averages, C
+
+
+def eig_cross_products(rows, C, standardize=True, PCs=None):
+    """
+    PCs of the centered cross-product matrix C (cols, cols).
     
-    # Singular Value Decomposition
-    [U, S, V] = svd(X)
+    @param rows: Number of rows in X.
+    @type rows: int
     
-    # adjust if matrix shape does not match:
-    if shape(S)[0] < shape(U)[0]: U = U[:, 0:shape(S)[0]]
+    @param C: Centered cross-product matrix, see update_cross_products.
+    @type C: numpy array
     
-    Scores = U * S # all Scores (T)
-    Loadings = V # all Loadings (P)
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+    @type PCs: int
+    
+    
+    @return: (Loadings, explained_var, STDs), STDs is None if not standardize
+    
+    """
+    cols = shape(C)[0]
+    if standardize:
+        _STDs = sqrt(C.diagonal() / rows)
+        if (_STDs == 0).any(): raise ZeroDivisionError('division by zero, cannot proceed')
+        C = C / outer(_STDs, _STDs)
+    else:
+        _STDs = None
+    
+    eigenvals, V = eigh(C)
+    eigenvals = eigenvals[::-1].clip(0); V = V[:, ::-1] # largest PC first
+    
+    maxPCs = min(rows, cols) # max number of PCs is min(objects, variables)
+    if PCs is None or maxPCs < PCs: PCs = maxPCs
+    
+    explained_var = eigenvals[0:PCs] / C.trace()
+    return V[:, 0:PCs].T.copy(), explained_var, _STDs
+
+
+def projection(Loadings, STDs=None):
+    """
+    Fold the scaling into the Loadings, so Scores of new centered rows x - averages are found by one product.
+    
+    ((x - averages) / STDs) P'  =  (x - averages) W,  with W = P' / STDs
+    
+    The averages are subtracted from x before the product, not as averages W after it,
+    since x W - averages W loses the precision of x W when the averages are large to the STDs.
+    
+    @param Loadings: Loadings of PCA (P).
+    @type Loadings: numpy array
+    
+    @param STDs: Column STDs used for standardization, None if X was not standardized.
+    @type STDs: numpy array
     
-    variances = S**2 / cols
-    variances_sum = sum(variances)
-    explained_var = variances / variances_sum
+    
+    @return: W
+    
+    """
+    W = Loadings.T
+    if STDs is not None:
+        W = W / STDs[:, newaxis]
+    return W
+
+
+def PCA_cov(X, standardize=True, PCs=None, chunk_size=10000, dtype=float):
+    """
+    PCA by eigendecomposition of the (cols, cols) cross-product matrix X'X and get Scores, Loadings, explained_var
+    
+    X (or the .npy file it is read from) is read chunk_size rows at a time, twice: first to sum up the cross-products and
+    then to find the Scores. X is not copied or changed, so memory use is of order
+    cols^2 + chunk_size*cols however many rows X has. Best for tall X (many objects,
+    few variables). The PCs are the same as for PCA_svd, up to sign.
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+    @type PCs: int
+    
+    @param chunk_size: Number of rows of X used at a time.
+    @type chunk_size: int
+    
+    @param dtype: float (float64) or float32. With float32 the chunks of X are multiplied and the results
+    given in float32, the cross-products are summed up in float64.
+    @type dtype: numpy dtype
+    
+    @return: (Scores, Loadings, explained_var)
+
+    """
+    X = load_array(X)
+    rows, _averages, C = cross_products(X, chunk_size, dtype)
+    Loadings, explained_var, _STDs = eig_cross_products(rows, C, standardize, PCs)
+    
+    W = asarray(projection(Loadings, _STDs), dtype)
+    Loadings, explained_var = asarray(Loadings, dtype), asarray(explained_var, dtype)
+    
+    Scores = empty((rows, shape(W)[1]), dtype)
+    chunk = empty((min(chunk_size, rows), shape(X)[1]), dtype) # centered chunk of X
+    for i in range(0, rows, chunk_size):
+        n = shape(X[i:i+chunk_size])[0]
+        subtract(X[i:i+n], _averages, out=chunk[:n])
+        dot(chunk[:n], W, out=Scores[i:i+n])
     
     return Scores, Loadings, explained_var
 
 
 
+################### Incremental PCA ###################
+class IncrementalPCA(object):
+    """
+    PCA of X given a batch of rows at a time, X never has to fit in memory.
+    
+    Running column averages and centered cross-products are kept (memory of order cols^2),
+    so the PCs are the same as PCA_cov or PCA_svd (up to sign) on all batches put together.
+    
+    Example usage:
+    >>> ipca = IncrementalPCA(standardize=True, PCs=5)
+    >>> for batch in batches:
+    ...     ipca.partial_fit(batch)
+    >>> T = ipca.transform(batch)
+    >>> P, explained_var = ipca.Loadings, ipca.explained_var
+    
+    """
+    def __init__(self, standardize=True, PCs=None):
+        """
+        @param standardize: Wheter X should be standardized or not.
+        @type standardize: bool
+        
+        @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+        @type PCs: int
+        
+        """
+        self.standardize = standardize
+        self.PCs = PCs
+        self.rows = 0 # rows seen so far
+        self.averages = None # running column averages
+        self.C = None # running centered cross-products
+        self._pcs = None # (Loadings, explained_var, STDs), found when needed
+    
+    def partial_fit(self, batch):
+        """
+        Update the model with a batch of rows.
+        
+        @param batch: 2-dimensional matrix of number data, new rows of X.
+        @type batch: numpy array
+        
+        @return: self
+        """
+        self.rows, self.averages, self.C = update_cross_products(self.rows, self.averages, self.C, batch)
+        self._pcs = None
+        return self
+    
+    def _get_pcs(self):
+        if self.rows == 0:
+            raise ValueError('no data, call partial_fit first')
+        if self._pcs is None:
+            self._pcs = eig_cross_products(self.rows, self.C, self.standardize, self.PCs)
+        return self._pcs
+    
+    @property
+    def variances(self):
+        """Running column variances."""
+        if self.rows == 0:
+            raise ValueError('no data, call partial_fit first')
+        return self.C.diagonal() / self.rows
+    
+    @property
+    def Loadings(self):
+        """Loadings (P) of the rows seen so far."""
+        return self._get_pcs()[0]
+    
+    @property
+    def explained_var(self):
+        """Explained variance for each PC of the rows seen so far."""
+        return self._get_pcs()[1]
+    
+    def transform(self, batch):
+        """
+        Get the Scores of a batch of rows.
+        
+        @param batch: 2-dimensional matrix of number data.
+        @type batch: numpy array
+        
+        @return: Scores (T) of batch
+        """
+        Loadings, explained_var, _STDs = self._get_pcs()
+        return dot(batch - self.averages, projection(Loadings, _STDs))
+
+
+
+################### PCA model ###################
+class PCAModel(object):
+    """
+    A fitted PCA: the preprocessing (means, scales) and PCs needed to find the Scores of new rows.
+    
+    The scaling is folded into the Loadings (see projection), so transform finds the
+    Scores of a batch of rows by one subtraction of the means and one matrix product.
+    
+    Example usage:
+    >>> model = PCAModel.fit(X, PCA_nipals_c, PCs=5)
+    >>> T = model.transform(X_new)
+    >>> model.save('model_dir')
+    >>> model = PCAModel.load('model_dir')
+    
+    """
+    __slots__ = ('means', 'scales', 'Loadings', 'eigenvalues', 'explained_var', 'W')
+    
+    def __init__(self, means, scales, Loadings, eigenvalues, explained_var):
+        """
+        @param means: Column averages used for mean centering.
+        @type means: numpy array
+        
+        @param scales: Column STDs used for standardization, None if X was not standardized.
+        @type scales: numpy array
+        
+        @param Loadings: Loadings (P), PCs x cols. The Scores are found in the type of the Loadings.
+        @type Loadings: numpy array
+        
+        @param eigenvalues: Variance of the Scores of each PC.
+        @type eigenvalues: numpy array
+        
+        @param explained_var: Explained variance for each PC.
+        @type explained_var: numpy array
+        
+        """
+        self.means = means
+        self.scales = scales
+        self.Loadings = Loadings
+        self.eigenvalues = eigenvalues
+        self.explained_var = explained_var
+        self.W = asarray(projection(Loadings, scales), Loadings.dtype)
+    
+    @classmethod
+    def fit(cls, X, engine=PCA_svd, standardize=True, **options):
+        """
+        Fit a model to X with one of the PCA functions.
+        
+        @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+        @type X: numpy array
+        
+        @param engine: PCA function, e.g. PCA_nipals_c, PCA_randomized or PCA_cov.
+        @type engine: function
+        
+        @param standardize: Wheter X should be standardized or not.
+        @type standardize: bool
+        
+        @param options: Other arguments of engine (PCs, threshold, dtype, ...), not E_matrices.
+        
+        @return: PCAModel
+        """
+        X = load_array(X)
+        _averages, _STDs = column_stats(X, standardize) # before engine, which may overwrite X
+        Scores, Loadings, explained_var = engine(X, standardize, **options)[:3]
+        eigenvalues = einsum('ij,ij->j', Scores, Scores) / float(shape(Scores)[0])
+        return cls(_averages, _STDs, Loadings, eigenvalues, explained_var)
+    
+    def transform(self, X, batch_rows=65536, out=None):
+        """
+        Get the Scores of new rows, (X - means) / scales P', batch_rows rows at a time.
+        
+        @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+        @type X: numpy array
+        
+        @param batch_rows: Number of rows of X used at a time.
+        @type batch_rows: int
+        
+        @param out: Array to put the Scores in (rows x PCs, of the type of the Loadings). A new array is made if None.
+        @type out: numpy array
+        
+        @return: Scores (T) of X
+        """
+        X = load_array(X)
+        (rows, cols) = shape(X)
+        if out is None:
+            out = empty((rows, shape(self.W)[1]), self.W.dtype)
+        # centered before the product, x W - means W loses the precision of x W when the means are large
+        batch = empty((min(batch_rows, rows), cols), self.W.dtype)
+        for i in range(0, rows, batch_rows):
+            n = shape(X[i:i+batch_rows])[0]
+            subtract(X[i:i+n], self.means, out=batch[:n])
+            dot(batch[:n], self.W, out=out[i:i+n])
+        return out
+    
+    def save(self, path):
+        """
+        Save the model as a directory of .npy files, one for each array (no scales.npy if not standardized).
+        
+        Each array is written to a temporary file in path that then replaces its .npy file,
+        so a model loaded (memory-mapped) from path can be saved back to it.
+        
+        @param path: Directory to save the model in, made if it does not exist.
+        @type path: str
+        """
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            filename = os.path.join(path, name + '.npy')
+            if value is not None:
+                fd, temp = tempfile.mkstemp('.npy', name + '.', path)
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        save(f, value)
+                    os.replace(temp, filename)
+                finally:
+                    if os.path.exists(temp): # save failed
+                        os.remove(temp)
+            elif os.path.exists(filename): # from a model saved here before
+                os.remove(filename)
+    
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a model saved by save.
+        
+        @param path: Directory the model was saved in.
+        @type path: str
+        
+        @param mmap: If the arrays should be memory-mapped (read only) instead of read into memory,
+        so processes loading the same model share the pages of the files.
+        @type mmap: bool
+        
+        @return: PCAModel
+        """
+        model = cls.__new__(cls) # W is loaded, not found again
+        for name in cls.__slots__:
+            filename = os.path.join(path, name + '.npy')
+            if name == 'scales' and not os.path.exists(filename):
+                model.scales = None
+            else:
+                setattr(model, name, load(filename, mmap_mode=mmap and 'r' or None))
+        return model
+
+
+
 ################### Correlation Loadings ###################
-def CorrelationLoadings(X, Scores):
+def update_score_cross_products(rows, averages, C, chunk_T, chunk_X):
+    """
+    Add a chunk of rows to running averages and centered cross-products of Scores and X.
+    
+    Like update_cross_products, but only the Scores x variables block T'X of the
+    cross-product matrix of [T X] and the sums of squares of each column are kept.
+    
+    @param rows: Number of rows seen so far (0 for the first chunk).
+    @type rows: int
+    
+    @param averages: (averages of T, averages of X) of the rows seen so far (None for the first chunk).
+    @type averages: tuple
+    
+    @param C: (T'X, sums of squares of T, sums of squares of X), centered, of the rows seen so far,
+    updated in place (None for the first chunk).
+    @type C: tuple
+    
+    @param chunk_T: The Scores (T) of the new rows.
+    @type chunk_T: numpy array
+    
+    @param chunk_X: 2-dimensional matrix of number data, the new rows.
+    @type chunk_X: numpy array
+    
+    
+    @return: (rows, averages, C) for all rows seen, in float (float64)
+    
+    """
+    chunk_T = asarray(chunk_T, float)
+    chunk_X = asarray(chunk_X, float)
+    rows_b = shape(chunk_X)[0]
+    averages_b = (average(chunk_T, 0), average(chunk_X, 0))
+    T_c = chunk_T - averages_b[0]
+    X_c = chunk_X - averages_b[1]
+    C_b = (dot(T_c.T, X_c), einsum('ij,ij->j', T_c, T_c), einsum('ij,ij->j', X_c, X_c))
+    if rows == 0:
+        return rows_b, averages_b, C_b
+    
+    rows_ab = rows + rows_b
+    f = rows * rows_b / float(rows_ab)
+    delta_T = averages_b[0] - averages[0]
+    delta_X = averages_b[1] - averages[1]
+    TX, TT, XX = C
+    TX += C_b[0]; TX += outer(delta_T, delta_X) * f
+    TT += C_b[1]; TT += delta_T * delta_T * f
+    XX += C_b[2]; XX += delta_X * delta_X * f
+    averages = (averages[0] + delta_T * (rows_b / float(rows_ab)), averages[1] + delta_X * (rows_b / float(rows_ab)))
+    return rows_ab, averages, C
+
+
+def CorrelationLoadings(X, Scores, chunk_size=10000):
     """
     Get correlation loadings matrix based on Scores (T of PCA) and X (original variables, not mean centered).
     Remake of method made by Oliver Tomic Ph.D.
+    
+    The correlations are found from the centered cross-product T'X and the sums of squares
+    of T and X, read chunk_size rows at a time (see update_score_cross_products),
+    so only a chunk of X is in memory at a time.
        
-    @param X: 2-dimensional matrix of number data. 
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
     @type X: numpy array
     
     @param Scores: Scores of PCA (T).
     @type Scores: numpy array
+    
+    @param chunk_size: Number of rows of X and Scores used at a time.
+    @type chunk_size: int
 
-    @return: Returns the correlation loadings matrix
+    @return: Returns the correlation loadings matrix (PCs x variables)
 
     """
-        
-    # Creates empty matrix for correlation loadings
-    PCs = shape(Scores)[1] # number of PCs
-    rows = shape(X)[1] # number of objects (rows) in X
-    CorrLoadings = zeros((PCs, rows), float)
-        
-    # Calculates correlation loadings with formula:
+    X = load_array(X)
+    rows = shape(X)[0]
+    if shape(Scores)[0] != rows:
+        raise ValueError('Scores has %i rows, X has %i' % (shape(Scores)[0], rows))
+    
+    seen, averages, C = 0, None, None
+    for i in range(0, rows, chunk_size):
+        seen, averages, C = update_score_cross_products(seen, averages, C, Scores[i:i+chunk_size], X[i:i+chunk_size])
+    TX, TT, XX = C
+    
     # correlation = cov(x,y)/(std(x)*std(y))
-        
-    # For each PC in score matrix
-    for i in range(PCs):
-        Scores_PC_i = Scores[:, i] # Scores for PC[i]
-            
-        # For each variable/attribute in X 
-        for row in range(rows):
-            orig_vars = X[:, row] # column of variables in X
-            corrs = corrcoef(Scores_PC_i, orig_vars)
-            CorrLoadings[i, row] = corrs[0,1]
-                
-    return CorrLoadings        
+    return TX / sqrt(outer(TT, XX))
+
+
+
+################### Engine selection ###################
+"""
+  Cost model of the PCA functions, used by PCA(method='auto'):
+
+  time = a + b * work(method, rows, cols, PCs)
+
+  work is the number of multiply-adds of the method up to a constant (per PC NIPALS
+  iteration, SVD, cross-product matrix...), a and b are found for each method and
+  dtype by calibrate, which times the methods on this host.
+"""
+engines = {'svd': PCA_svd, 'nipals': PCA_nipals, 'nipals2': PCA_nipals2, 'nipals_c': PCA_nipals_c,
+           'block': PCA_block, 'randomized': PCA_randomized, 'cov': PCA_cov}
+
+# methods PCA(method='auto') chooses from (randomized only estimates the PCs, nipals2 is nipals)
+auto_methods = ('svd', 'nipals', 'nipals_c', 'block', 'cov')
+
+# (a, b) of each method for each dtype, from calibrate() on a single core,
+# 'svd_gram' is svd of wide X (see cost_name)
+default_costs = {
+    'float64': {'svd': [4.4e-04, 2.2e-10], 'svd_gram': [3.2e-04, 4.7e-11], 'nipals': [1.2e-04, 2.0e-09],
+                'nipals_c': [2.6e-05, 2.0e-09], 'block': [7.1e-05, 9.1e-11], 'cov': [1.5e-04, 5.3e-11]},
+    'float32': {'svd': [2.7e-04, 2.1e-10], 'svd_gram': [2.2e-04, 3.3e-11], 'nipals': [1.0e-04, 1.6e-09],
+                'nipals_c': [2.8e-05, 2.4e-09], 'block': [1.2e-04, 7.1e-11], 'cov': [1.9e-04, 5.1e-11]},
+    }
+
+cost_model = None # the costs in use, loaded by get_cost_model
+
+
+def work(method, rows, cols, PCs):
+    """
+    Work of a PCA method, the number of multiply-adds up to a constant.
+    
+    @param method: Name of the method, a key of engines.
+    @type method: str
+    
+    @param rows: Number of objects (rows) of X.
+    @type rows: int
+    
+    @param cols: Number of variables (columns) of X.
+    @type cols: int
+    
+    @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+    @type PCs: int
+    
+    @return: work
+    """
+    small = min(rows, cols)
+    if PCs is None or PCs > small: PCs = small
+    if method == 'svd':
+        if cols >= gram_ratio * rows: # PCA_svd uses svd_gram, XX', its eigenvectors and U'X
+            return float(rows) * rows * cols + float(rows)**3 + float(rows) * cols * PCs
+        return float(rows) * cols * small
+    if method in ('nipals', 'nipals2', 'nipals_c'):
+        return float(rows) * cols * PCs # for each iteration
+    if method == 'block':
+        return float(rows) * cols * (PCs + 5)**2 # the iterations grow with the block size
+    if method == 'randomized':
+        return float(rows) * cols * (PCs + 10) * 6 # 2 power iterations
+    if method == 'cov':
+        return float(rows) * cols * cols + float(cols)**3
+    raise ValueError('unknown method %r' % (method,))
+
+
+def cost_name(method, rows, cols):
+    """
+    Name of the (a, b) of a method in the cost model. svd of wide X has its own, 'svd_gram',
+    since the matrix products of svd_gram take far less time per multiply-add than an SVD.
+    
+    @return: name, a key of the costs of a dtype
+    """
+    if method == 'svd' and cols >= gram_ratio * rows:
+        return 'svd_gram'
+    return method
+
+
+def get_cost_model():
+    """
+    Get the cost model, from cost_model_path if calibrate has saved one there, else default_costs.
+    
+    @return: {dtype name: {method: (a, b)}}
+    """
+    global cost_model
+    if cost_model is None:
+        cost_model = default_costs
+        if os.path.exists(cost_model_path):
+            with open(cost_model_path) as f:
+                cost_model = json.load(f)
+    return cost_model
+
+
+def select_method(rows, cols, PCs, dtype=float, methods=auto_methods):
+    """
+    Choose the PCA method with the lowest estimated time (see the cost model).
+    
+    @param rows: Number of objects (rows) of X.
+    @type rows: int
+    
+    @param cols: Number of variables (columns) of X.
+    @type cols: int
+    
+    @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+    @type PCs: int
+    
+    @param dtype: Type the PCA is computed in, float (float64) or float32.
+    @type dtype: numpy dtype
+    
+    @param methods: Names of the methods to choose from, nipals_c is left out if c_nipals could not be imported.
+    @type methods: sequence
+    
+    @return: name of the method
+    """
+    costs = get_cost_model()[finfo(dtype).dtype.name]
+    best = None
+    for method in methods:
+        name = cost_name(method, rows, cols)
+        if name not in costs: # a cost model from before svd_gram was timed
+            name = method
+        if name not in costs or (method == 'nipals_c' and not import_ok):
+            continue
+        a, b = costs[name]
+        time_ = a + b * work(method, rows, cols, PCs)
+        if best is None or time_ < best[0]:
+            best = (time_, method)
+    if best is None:
+        raise ValueError('no cost model for any of %r' % (methods,))
+    return best[1]
+
+
+def PCA(X, standardize=True, PCs=10, method='auto', dtype=float, **options):
+    """
+    PCA by any of the PCA functions and get Scores, Loadings, explained_var
+    
+    @param X: 2-dimensional matrix of number data, or path to a .npy file holding it (memory-mapped). 
+    @type X: numpy array
+    
+    @param standardize: Wheter X should be standardized or not.
+    @type standardize: bool
+    
+    @param PCs: Number of Principal Components, all (min(rows, cols)) if None.
+    @type PCs: int
+    
+    @param method: 'auto' (select_method chooses from the methods taking all of options),
+    or a key of engines ('svd', 'nipals', 'nipals2', 'nipals_c', 'block', 'randomized' or 'cov').
+    @type method: str
+    
+    @param dtype: float (float64) or float32.
+    @type dtype: numpy dtype
+    
+    @param options: Other arguments of the PCA function (threshold, overwrite_x, ...).
+    
+    @return: The result of the PCA function, (Scores, Loadings, explained_var)
+    """
+    X = load_array(X)
+    if method == 'auto':
+        (rows, cols) = shape(X)
+        # only the methods whose PCA function takes all the options
+        methods = [m for m in auto_methods if all(name in inspect.signature(engines[m]).parameters for name in options)]
+        method = select_method(rows, cols, PCs, dtype, methods)
+    elif method not in engines:
+        raise ValueError('unknown method %r' % (method,))
+    if PCs is None and method in ('nipals', 'nipals2', 'nipals_c', 'block', 'randomized'):
+        PCs = min(shape(X))
+    return engines[method](X, standardize, PCs=PCs, dtype=dtype, **options)
+
+
+def calibrate(shapes=((200, 50), (2000, 100), (50, 1000), (200, 2000), (1000, 1000)), PCs=(2, 10), dtypes=(float, float32),
+              methods=auto_methods, repeat=3, path=None):
+    """
+    Fit the cost model to the times of the PCA methods on this host, and save it (JSON).
+    
+    Each method is timed (best of repeat) on low-rank plus noise data of each shape and
+    number of PCs, a and b are then found by least squares of the relative error. The times
+    of svd on wide shapes give the (a, b) of svd_gram (see cost_name).
+    
+    @param shapes: (rows, cols) of the data timed.
+    @type shapes: sequence
+    
+    @param PCs: Numbers of PCs timed.
+    @type PCs: sequence
+    
+    @param dtypes: Types timed.
+    @type dtypes: sequence
+    
+    @param methods: Names of the methods timed, nipals_c is left out if c_nipals could not be imported.
+    @type methods: sequence
+    
+    @param repeat: Number of times each is timed.
+    @type repeat: int
+    
+    @param path: File to save the cost model in, cost_model_path if None.
+    @type path: str
+    
+    @return: the cost model, {dtype name: {method: (a, b)}}, which is used from now on
+    """
+    global cost_model
+    random = RandomState(0)
+    model = {}
+    for dtype in dtypes:
+        timed = {} # {cost name: (works, times)}
+        for method in methods:
+            if method == 'nipals_c' and not import_ok:
+                continue
+            for rows, cols in shapes:
+                k = min(rows, cols, 20)
+                X = dot(random.randn(rows, k) * (2.0 ** -arange(k)), random.randn(k, cols)) + 0.1 * random.randn(rows, cols)
+                works, times = timed.setdefault(cost_name(method, rows, cols), ([], []))
+                for pcs in PCs:
+                    run_times = []
+                    for i in range(repeat):
+                        start = time.time()
+                        engines[method](X, True, PCs=pcs, dtype=dtype)
+                        run_times.append(time.time() - start)
+                    works.append(work(method, rows, cols, pcs)); times.append(min(run_times))
+        costs = {}
+        for name, (works, times) in timed.items():
+            # least squares of the relative error, so the small shapes count as much as the large
+            times = array(times)
+            A = array([[1.0] * len(works), works]).T / times[:, newaxis]
+            a, b = lstsq(A, times / times, rcond=None)[0]
+            costs[name] = [max(a, 0.0), max(b, 1e-15)]
+        model[finfo(dtype).dtype.name] = costs
+    
+    with open(path or cost_model_path, 'w') as f:
+        json.dump(model, f, indent=1)
+    cost_model = model
+    return model
@@ -1,10 +1,15 @@
 #!/usr/bin/env python
 
 from numpy import array
-from numpy import zeros, random
+from numpy import arange, dot, float32, hstack, linalg, linspace, random, save, sqrt, zeros
 
 from pca_module import *
-import time
+import pca_module
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import tempfile
+import threading
 import unittest
 
 
@@ -78,6 +83,10 @@ Correlation_Loadings = array([[ 0.8398842,   0.51900196,  0.72658209, -0.5223435
 # amount of decimals to check
 accurate = 6   # used where there should be high accuracy
 not_so_accurate = 2    
+float32_accurate = 4   # float32 results (dtype='float32') agree with the float64 values to this
+
+# tests of the C python extension are skipped if it could not be imported
+needs_c_nipals = unittest.skipUnless(pca_module.import_ok, 'could not import c_nipals python extension')
 
 class TestPCA(unittest.TestCase):   
     def test_centering(self):
@@ -89,6 +98,11 @@ class TestPCA(unittest.TestCase):
         for i in range(len(X_centered)):
             for j in range(len(X_centered[0])):
                 self.failUnlessAlmostEqual(X_c[i,j], X_centered[i,j], accurate,'wrong value in X_c[%i,%i] (svd)' % (i,j))        
+        
+        X_c = mean_center(X, block_rows=4) # blocks of rows, the last one partial
+        for i in range(len(X_centered)):
+            for j in range(len(X_centered[0])):
+                self.failUnlessAlmostEqual(X_c[i,j], X_centered[i,j], accurate,'wrong value in X_c[%i,%i] (block_rows=4)' % (i,j))
      
     def test_standardization(self):
         # if standardization fails, PCA will fail
@@ -98,8 +112,30 @@ class TestPCA(unittest.TestCase):
         
         for i in range(len(X_standardized)):
             for j in range(len(X_standardized[0])):
-                self.failUnlessAlmostEqual(X_std[i,j], X_standardized[i,j], accurate, 'wrong value in X_std[%i,%i] (svd)' % (i,j))        
-         
+                self.failUnlessAlmostEqual(X_std[i,j], X_standardized[i,j], accurate, 'wrong value in X_std[%i,%i] (svd)' % (i,j))
+
+    def test_preprocess(self):
+        # fused centering and scaling, also done in place (out=X)
+        X_std = standardization(mean_center(X))
+        X_in_place = X.copy()
+        X_pre, averages, STDs = preprocess(X_in_place, out=X_in_place)
+
+        self.failUnless(X_pre is X_in_place, 'not done in place')
+        for j in range(len(X[0])):
+            self.failUnlessAlmostEqual(averages[j], X[:, j].mean(), accurate, 'wrong value in averages[%i]' % j)
+            self.failUnlessAlmostEqual(STDs[j], X[:, j].std(), accurate, 'wrong value in STDs[%i]' % j)
+            for i in range(len(X)):
+                self.failUnlessAlmostEqual(X_pre[i,j], X_std[i,j], accurate, 'wrong value in X_pre[%i,%i]' % (i,j))
+
+    def test_remove_tp_prod(self):
+        # blocks smaller than the number of rows
+        E = X_centered.copy()
+        t = X_centered[:, 0]; p = X_centered[0, :]
+        remove_tp_prod(E, t, p, block_rows=4)
+        for i in range(len(X_centered)):
+            for j in range(len(X_centered[0])):
+                self.failUnlessAlmostEqual(E[i,j], X_centered[i,j] - t[i]*p[j], accurate, 'wrong value in E[%i,%i]' % (i,j))
+
     def test_nipals1a(self):
         # using default parameters (should be: standardize=True, PCs=10, threshold=0.0001)
         T, P, e_var = PCA_nipals(X)
@@ -184,6 +220,365 @@ class TestPCA(unittest.TestCase):
             #self.failUnlessAlmostEqual(e_var[i], explained_var[i], not_so_accurate, 'wrong value in e_var['+str(i)+']')
   
   
+    def test_nipals_implicit(self):
+        # implicit deflation gives the same PCs and leaves X untouched
+        X_pre = preprocess(X)[0]
+        X_copy = X_pre.copy()
+        T, P, e_var = nipals_arr(X_copy, 10, 0.0001, False, True, 'implicit')
+        self.failUnless((X_copy == X_pre).all(), 'X was deflated')
+
+        for i in range(len(Scores_nipals)):
+            for j in range(len(Scores_nipals[0])):
+                self.failUnlessAlmostEqual(T[i,j], Scores_nipals[i,j], accurate, 'wrong value in T[%i,%i]' % (i,j))
+
+        for i in range(len(Loadings_nipals)):
+            for j in range(len(Loadings_nipals[0])):
+                self.failUnlessAlmostEqual(P[i,j], Loadings_nipals[i,j], accurate, 'wrong value in P[%i,%i]' % (i,j))
+
+        for i in range(len(explained_var)):
+            self.failUnlessAlmostEqual(e_var[i], explained_var[i], not_so_accurate, 'wrong value in e_var['+str(i)+']')
+
+        T, P, E = PCA_nipals2(X, E_matrices=True, deflation='implicit')
+        T2, P2, E2 = PCA_nipals2(X, E_matrices=True)
+        for i in range(len(E)):
+            self.failUnless(abs(E[i] - E2[i]).max() < 10**-accurate, 'wrong E[%i]' % i)
+
+    def test_residual_matrices(self):
+        # E-matrices are made from E[0], T and P when indexed
+        X_p = preprocess(X)[0]
+        T, P, E = PCA_nipals2(X, PCs=3, E_matrices=True)
+        self.failUnlessEqual(E.shape, (3, 6, 4), 'wrong shape')
+        self.failUnlessEqual(len(E), 3, 'wrong length')
+        for i in range(3):
+            E_i = X_p - dot(T[:, :i+1], P[:i+1])
+            self.failUnless(abs(E[i] - E_i).max() < 10**-accurate, 'wrong E[%i]' % i)
+            self.failUnless(abs(E[i, 1:3, 2] - E_i[1:3, 2]).max() < 10**-accurate, 'wrong E[%i, 1:3, 2]' % i)
+            self.failUnless(abs(E[i, [4, 0]][:, [3, 1]] - E[i, [4, 0], [3, 1]]).max() < 10**-accurate, 'wrong E[%i, [4, 0], [3, 1]]' % i)
+            self.failUnlessAlmostEqual(E[i, 5, 0], E_i[5, 0], accurate, 'wrong E[%i, 5, 0]' % i)
+
+        self.failUnlessEqual(E[:, :, 0].shape, (3, 6), 'wrong shape')
+        self.failUnless(abs(E[-1] - E[2]).max() == 0, 'wrong E[-1]')
+        self.failUnless(abs(asarray(E)[1:] - E[1:]).max() == 0, 'wrong asarray(E)')
+        self.failUnlessRaises(IndexError, E.__getitem__, 3)
+
+    @needs_c_nipals
+    def test_residual_matrices_c(self):
+        X_p = preprocess(X)[0]
+        T, P, E = PCA_nipals_c(X, PCs=3, E_matrices=True)
+        for i in range(3):
+            E_i = X_p - dot(T[:, :i+1], P[:i+1])
+            self.failUnless(abs(E[i] - E_i).max() < 10**-accurate, 'wrong E[%i] (c)' % i)
+
+    def test_explained_var_tt(self):
+        # explained variance t't / |E[0]|^2 is the variance removed from the E-matrices by each PC
+        for T, P, e_var in (PCA_nipals(X), PCA_nipals2(X, deflation='implicit'), PCA_nipals(X, max_memory=1000)):
+            self.check_explained_var_tt(e_var)
+
+    @needs_c_nipals
+    def test_explained_var_tt_c(self):
+        self.check_explained_var_tt(PCA_nipals_c(X)[2])
+
+    def check_explained_var_tt(self, e_var):
+        X_p = preprocess(X)[0]
+        T, P, E = PCA_nipals2(X, E_matrices=True)
+        squares = [vec_inner(X_p)] + [vec_inner(E[i]) for i in range(len(E))]
+        for i in range(len(E)):
+            self.failUnlessAlmostEqual(e_var[i], (squares[i] - squares[i+1]) / squares[0], not_so_accurate, 'wrong value in e_var[%i]' % i)
+
+    def test_residual_var(self):
+        # residual variance of each object and variable, the mean squares of the rows and columns of the E-matrices
+        X_p = preprocess(X)[0]
+        T, P, e_var, object_var, variable_var = PCA_svd(X, residual_var=True)
+        self.check_residual_var(object_var, variable_var, [X_p - dot(T[:, :i+1], P[:i+1]) for i in range(len(P))], accurate)
+
+        for f in (PCA_nipals, PCA_nipals2):
+            self.check_residual_var_nipals(f)
+        T, P, E = PCA_nipals2(X, E_matrices=True)
+        result = PCA_nipals(X, residual_var=True, max_memory=1000)
+        self.check_residual_var(result[3], result[4], E, accurate)
+
+    @needs_c_nipals
+    def test_residual_var_c(self):
+        self.check_residual_var_nipals(PCA_nipals_c)
+
+    def test_residual_var_small(self):
+        # residuals far below X (nearly rank 3), relative accuracy of the sums of squares of E[i]
+        for f in (PCA_svd, PCA_nipals, PCA_nipals2, PCA_block, PCA_randomized):
+            self.check_residual_var_small(f)
+        self.check_residual_var_small(PCA_nipals, max_memory=8000)
+        self.check_residual_var_small(PCA_nipals2, deflation='implicit')
+
+    @needs_c_nipals
+    def test_residual_var_small_c(self):
+        self.check_residual_var_small(PCA_nipals_c)
+
+    def check_residual_var_small(self, f, **options):
+        rng = random.RandomState(0)
+        X_low = dot(rng.randn(200, 3), rng.randn(3, 50)) + 10**-5 * rng.randn(200, 50)
+        T, P, e_var, object_var, variable_var = f(X_low, PCs=3, residual_var=True, **options)
+        E = preprocess(X_low)[0] - dot(T, P)
+        self.failUnless(abs(object_var[2] / (E**2).mean(1) - 1).max() < 10**-8, 'wrong object_var (%s)' % f.__name__)
+        self.failUnless(abs(variable_var[2] / (E**2).mean(0) - 1).max() < 10**-8, 'wrong variable_var (%s)' % f.__name__)
+
+    def check_residual_var_nipals(self, f):
+        T, P, E, object_var, variable_var = f(X, E_matrices=True, residual_var=True)
+        self.check_residual_var(object_var, variable_var, E, accurate)
+        # without the E-matrices (X is deflated and then restored to E[0])
+        result = f(X, residual_var=True)
+        self.check_residual_var(result[3], result[4], E, accurate)
+
+    def check_residual_var(self, object_var, variable_var, E, places):
+        self.failUnlessEqual(object_var.shape, (len(E), len(X)), 'wrong shape')
+        self.failUnlessEqual(variable_var.shape, (len(E), len(X[0])), 'wrong shape')
+        for i in range(len(E)):
+            E_i = array(E[i])
+            for j in range(len(X)):
+                self.failUnlessAlmostEqual(object_var[i,j], (E_i[j]**2).mean(), places, 'wrong value in object_var[%i,%i]' % (i,j))
+            for j in range(len(X[0])):
+                self.failUnlessAlmostEqual(variable_var[i,j], (E_i[:,j]**2).mean(), places, 'wrong value in variable_var[%i,%i]' % (i,j))
+
+    def check_svd_pcs(self, T, P, e_var, places=accurate):
+        # the PCs should be the SVD PCs, but the sign of each PC may differ
+        self.failUnlessEqual(T.shape, Scores_svd.shape, 'wrong shape')
+        self.failUnlessEqual(P.shape, Loadings_svd.shape, 'wrong shape')
+
+        for j in range(len(Scores_svd[0])):
+            sign = (T[:, j] * Scores_svd[:, j]).sum() > 0 and 1 or -1
+            for i in range(len(Scores_svd)):
+                self.failUnlessAlmostEqual(sign*T[i,j], Scores_svd[i,j], places, 'wrong value in T[%i,%i]' % (i,j))
+            for i in range(len(Loadings_svd[0])):
+                self.failUnlessAlmostEqual(sign*P[j,i], Loadings_svd[j,i], places, 'wrong value in P[%i,%i]' % (j,i))
+
+        for i in range(len(explained_var)):
+            self.failUnlessAlmostEqual(e_var[i], explained_var[i], not_so_accurate, 'wrong value in e_var['+str(i)+']')
+
+    def test_block(self):
+        T, P, e_var = PCA_block(X)
+        self.check_svd_pcs(T, P, e_var)
+
+    def test_block_rank_deficient(self):
+        # more PCs than the rank of X, the PCs beyond it are rounding error and must not stop convergence
+        B = random.RandomState(0).rand(200, 5)
+        X_low = hstack([B, 2*B + 1, B - 3, B/2])
+        T, P, e_var = PCA_block(X_low, PCs=10)
+        e_var_svd = PCA_svd(X_low, PCs=10)[2]
+        for j in range(10):
+            self.failUnlessAlmostEqual(e_var[j], e_var_svd[j], accurate, 'wrong value in e_var[%i]' % j)
+
+        T, P, e_var = PCA_block(X_low, PCs=10, max_iter=2)
+        self.failUnlessEqual(T.shape, (200, 10), 'wrong shape')
+
+    def test_randomized(self):
+        T, P, e_var = PCA_randomized(X, seed=0)
+        self.check_svd_pcs(T, P, e_var)
+
+        T2, P2, e_var2 = PCA_randomized(X, PCs=2, seed=0)
+        self.failUnlessEqual(T2.shape, (6, 2), 'wrong shape')
+        self.failUnlessEqual(P2.shape, (2, 4), 'wrong shape')
+
+    def test_cov(self):
+        # chunks smaller than X
+        T, P, e_var = PCA_cov(X, chunk_size=4)
+        self.check_svd_pcs(T, P, e_var)
+
+        # float32 with averages large to the STDs, the Scores of its Loadings found in float64
+        X_off = 1000 + 0.07 * random.RandomState(0).randn(500, 20)
+        T, P, e_var = PCA_cov(X_off, chunk_size=64, dtype=float32)
+        T_64 = dot((X_off - X_off.mean(0)) / X_off.std(0), P.T.astype(float))
+        self.failUnless(abs(T - T_64).max() < 1e-3, 'wrong T (float32, large averages)')
+
+    def test_incremental(self):
+        # X given two rows at a time
+        ipca = IncrementalPCA()
+        for i in range(0, len(X), 2):
+            ipca.partial_fit(X[i:i+2])
+
+        for j in range(len(X[0])):
+            self.failUnlessAlmostEqual(ipca.averages[j], X[:, j].mean(), accurate, 'wrong value in averages[%i]' % j)
+            self.failUnlessAlmostEqual(ipca.variances[j], X[:, j].var(), accurate, 'wrong value in variances[%i]' % j)
+
+        T = ipca.transform(X)
+        self.check_svd_pcs(T, ipca.Loadings, ipca.explained_var)
+
+        # averages large to the STDs
+        X_off = 1e6 + 0.07 * random.RandomState(0).randn(500, 20)
+        ipca = IncrementalPCA().partial_fit(X_off)
+        T_ref = dot((X_off - X_off.mean(0)) / X_off.std(0), ipca.Loadings.T)
+        self.failUnless(abs(ipca.transform(X_off) - T_ref).max() < 1e-10, 'wrong T (large averages)')
+
+    def test_pca_model(self):
+        # a fitted model gives the Scores of the engine for the same X, for any batch size
+        for engine, standardize in ((PCA_svd, True), (PCA_cov, False)):
+            self.check_pca_model(engine, standardize)
+
+        model = PCAModel.fit(X, PCA_svd, dtype=float32)
+        self.failUnlessEqual(model.transform(X).dtype, float32, 'wrong dtype')
+
+        # float32 with means large to the STDs, the Scores of the float64 engine
+        X_off = 1000 + 0.07 * random.RandomState(0).randn(500, 20)
+        model = PCAModel.fit(X_off, PCA_svd, dtype=float32)
+        T = PCA_svd(X_off)[0]
+        self.failUnless(abs(abs(model.transform(X_off)) - abs(T)).max() < 1e-4, 'wrong T (float32, large means)')
+
+    @needs_c_nipals
+    def test_pca_model_c(self):
+        self.check_pca_model(PCA_nipals_c, True)
+
+    def check_pca_model(self, engine, standardize):
+        T, P, e_var = engine(X, standardize)
+        model = PCAModel.fit(X, engine, standardize)
+        X_pre, averages, STDs = preprocess(X, standardize)
+        for j in range(len(X[0])):
+            self.failUnlessAlmostEqual(model.means[j], averages[j], accurate, 'wrong value in means[%i]' % j)
+        self.failUnlessEqual(model.scales is None, not standardize, 'wrong scales')
+        for i in range(len(P)):
+            self.failUnlessAlmostEqual(model.eigenvalues[i], (T[:, i]**2).mean(), accurate, 'wrong value in eigenvalues[%i]' % i)
+            self.failUnlessAlmostEqual(model.explained_var[i], e_var[i], accurate, 'wrong value in explained_var[%i]' % i)
+
+        for T_model in (model.transform(X), model.transform(X, batch_rows=3)):
+            self.failUnless(abs(T_model - T).max() < 10**-accurate, 'wrong T (%s)' % engine.__name__)
+
+    def test_pca_model_save(self):
+        # a saved model is loaded (memory-mapped or read) with the same arrays and Scores
+        path = tempfile.mkdtemp()
+        try:
+            for standardize in (True, False):
+                model = PCAModel.fit(X, PCA_svd, standardize)
+                model.save(path)
+                for mmap in (True, False):
+                    model2 = PCAModel.load(path, mmap)
+                    self.failUnlessEqual(model2.scales is None, not standardize, 'wrong scales')
+                    self.failUnlessEqual(isinstance(model2.Loadings, memmap), mmap, 'wrong type of Loadings')
+                    self.failUnless((model2.transform(X) == model.transform(X)).all(), 'wrong T')
+                    del model2
+                # a memory-mapped model saved back to its own directory
+                model2 = PCAModel.load(path)
+                model2.save(path)
+                del model2
+                model2 = PCAModel.load(path, False)
+                for name in PCAModel.__slots__:
+                    value = getattr(model, name)
+                    self.failUnless(value is None and getattr(model2, name) is None or
+                                    (getattr(model2, name) == value).all(), 'wrong %s' % name)
+                files = [name + '.npy' for name in PCAModel.__slots__ if getattr(model, name) is not None]
+                self.failUnlessEqual(sorted(os.listdir(path)), sorted(files), 'wrong files')
+        finally:
+            for name in os.listdir(path):
+                os.remove(os.path.join(path, name))
+            os.rmdir(path)
+
+    def test_pca_auto(self):
+        # the same PCs as the PCA function of the method
+        for method in ('auto', 'svd', 'nipals', 'nipals2', 'block', 'cov'):
+            self.check_pca_method(method)
+        # only NIPALS takes E_matrices
+        T, P, E = PCA(X, PCs=2, E_matrices=True)
+        self.failUnless(isinstance(E, ResidualMatrices), 'wrong method for E_matrices')
+        self.failUnlessRaises(ValueError, PCA, X, method='qr')
+
+    def test_pca_rank_deficient(self):
+        # more PCs than the rank of X, with the method chosen by the cost model and with each of the auto methods
+        B = random.RandomState(0).rand(200, 5)
+        X_low = hstack([B, 2*B + 1, B - 3, B/2])
+        e_var_svd = PCA_svd(X_low, PCs=10)[2]
+        for method in ('auto',) + auto_methods:
+            if method == 'nipals_c' and not pca_module.import_ok:
+                continue
+            T, P, e_var = PCA(X_low, PCs=10, method=method)
+            self.failUnlessEqual(T.shape, (200, 10), 'wrong shape (%s)' % method)
+            for j in range(5):
+                self.failUnless(abs(e_var[j] - e_var_svd[j]) < 1e-3, 'wrong value in e_var[%i] (%s)' % (j, method))
+
+    def test_select_method(self):
+        # the method with the lowest a + b*work, under a fixed cost model
+        costs = {'svd': [0.0, 2e-10], 'svd_gram': [0.0, 4e-11], 'nipals': [0.0, 2e-9], 'block': [0.0, 1e-10], 'cov': [0.0, 5e-11]}
+        try:
+            pca_module.cost_model = {'float64': costs}
+            self.failUnlessEqual(select_method(200, 2000, 10), 'svd', 'wrong method for wide X (svd_gram)')
+            self.failUnlessEqual(select_method(2000, 200, 10), 'cov', 'wrong method for tall X')
+            self.failUnlessEqual(select_method(1000, 1000, 2), 'nipals', 'wrong method for few PCs')
+            self.failUnlessEqual(select_method(1000, 1000, 2, methods=('svd', 'cov')), 'cov', 'wrong method of methods')
+            # without svd_gram, svd of wide X has the cost of svd
+            del costs['svd_gram']
+            self.failUnlessEqual(select_method(200, 2000, 10), 'nipals', 'wrong method without svd_gram')
+        finally:
+            pca_module.cost_model = None
+
+    @needs_c_nipals
+    def test_pca_auto_c(self):
+        self.check_pca_method('nipals_c')
+
+    def check_pca_method(self, method):
+        T, P, e_var = PCA(X, PCs=3, method=method)
+        if method == 'auto':
+            method = select_method(len(X), len(X[0]), 3)
+        T2, P2, e_var2 = engines[method](X, PCs=3)
+        self.failUnlessEqual(T.shape, (len(X), 3), 'wrong shape (%s)' % method)
+        self.failUnless(abs(T - T2).max() < 10**-accurate, 'wrong T (%s)' % method)
+
+    def test_calibrate(self):
+        fd, path = tempfile.mkstemp('.json'); os.close(fd)
+        try:
+            model = calibrate(shapes=((20, 10), (40, 30), (5, 60)), PCs=(2,), dtypes=(float,), repeat=1, path=path)
+            for method in ('svd', 'svd_gram', 'nipals', 'block', 'cov'):
+                a, b = model['float64'][method]
+                self.failUnless(a >= 0 and b > 0, 'wrong cost of %s' % method)
+            # a saved cost model is used once loaded
+            pca_module.cost_model, pca_module.cost_model_path = None, path
+            self.failUnlessEqual(get_cost_model(), model, 'cost model not loaded')
+        finally:
+            pca_module.cost_model, pca_module.cost_model_path = None, cost_model_path
+            os.remove(path)
+
+    def test_npy_file(self):
+        # a .npy file is memory-mapped, not loaded, and read a block of rows at a time
+        fd, path = tempfile.mkstemp('.npy'); os.close(fd)
+        try:
+            save(path, X)
+            X_pre, averages, STDs = preprocess(path, block_rows=4)
+            X_pre2 = preprocess(X)[0]
+            for i in range(len(X)):
+                for j in range(len(X[0])):
+                    self.failUnlessAlmostEqual(X_pre[i,j], X_pre2[i,j], accurate, 'wrong value in X_pre[%i,%i]' % (i,j))
+
+            for PCA in (PCA_nipals2, PCA_svd, PCA_cov):
+                T, P, e_var = PCA(path)
+                T2, P2, e_var2 = PCA(X)
+                self.failUnless(abs(T - T2).max() < 10**-accurate, 'wrong T (%s)' % PCA.__name__)
+                self.failUnless(abs(P - P2).max() < 10**-accurate, 'wrong P (%s)' % PCA.__name__)
+        finally:
+            os.remove(path)
+
+    def test_nipals_max_memory(self):
+        # disk-backed E, used two rows at a time
+        T, P, e_var = PCA_nipals(X, max_memory=2*2*4*8)
+        for i in range(len(Scores_nipals)):
+            for j in range(len(Scores_nipals[0])):
+                self.failUnlessAlmostEqual(T[i,j], Scores_nipals[i,j], accurate, 'wrong value in T[%i,%i]' % (i,j))
+
+        for i in range(len(Loadings_nipals)):
+            for j in range(len(Loadings_nipals[0])):
+                self.failUnlessAlmostEqual(P[i,j], Loadings_nipals[i,j], accurate, 'wrong value in P[%i,%i]' % (i,j))
+
+        for i in range(len(explained_var)):
+            self.failUnlessAlmostEqual(e_var[i], explained_var[i], not_so_accurate, 'wrong value in e_var['+str(i)+']')
+
+        self.failUnlessRaises(ValueError, PCA_nipals, X, E_matrices=True, max_memory=1000)
+
+    def test_overwrite_x(self):
+        # X is left alone by default, with overwrite_x=True it is used as working array
+        X_copy = X.copy()
+        T, P, e_var = PCA_nipals2(X_copy)
+        self.failUnless((X_copy == X).all(), 'X was overwritten')
+
+        T2, P2, e_var2 = PCA_nipals2(X_copy, overwrite_x=True)
+        self.failIf((X_copy == X).all(), 'X was not used as working array')
+        for i in range(len(Scores_nipals)):
+            for j in range(len(Scores_nipals[0])):
+                self.failUnlessAlmostEqual(T2[i,j], T[i,j], accurate, 'wrong value in T[%i,%i]' % (i,j))
+
+
+    @needs_c_nipals
     def test_nipals_c(self):
         # using default parameters (should be: standardize=True, PCs=10, threshold=0.0001)
         T, P, E = PCA_nipals_c(X, E_matrices=True)
@@ -204,6 +599,7 @@ class TestPCA(unittest.TestCase):
             #self.failUnlessAlmostEqual(e_var[i], explained_var[i], not_so_accurate, 'wrong value in e_var['+str(i)+'] (svd)')
   
 
+    @needs_c_nipals
     def test_nipals_c2(self):
         # using default parameters (should be: standardize=True, PCs=10, threshold=0.0001)
         T, P, e_var = PCA_nipals_c(X)
@@ -221,8 +617,95 @@ class TestPCA(unittest.TestCase):
         
         for i in range(len(explained_var)):
             self.failUnlessAlmostEqual(e_var[i], explained_var[i], not_so_accurate, 'wrong value in e_var['+str(i)+'] (svd)')
-  
-  
+
+    @needs_c_nipals
+    def test_nipals_c_threads(self):
+        # OpenMP threads give the same result as one thread
+        X_big = random.RandomState(0).rand(200, 50)
+        T, P, e_var = PCA_nipals_c(X_big, PCs=3, threads=1)
+        T2, P2, e_var2 = PCA_nipals_c(X_big, PCs=3, threads=4)
+        self.failUnless(abs(T - T2).max() < 10**-accurate, 'wrong T')
+        self.failUnless(abs(P - P2).max() < 10**-accurate, 'wrong P')
+
+
+    @needs_c_nipals
+    def test_nipals_c_tiles(self):
+        # rows not a multiple of the row tiles, more than one column tile
+        X_big = random.RandomState(1).rand(103, 1030)
+        T, P, e_var = PCA_nipals_c(X_big, PCs=4, threshold=10**-10)
+        T2, P2, e_var2 = PCA_nipals(X_big, PCs=4, threshold=10**-10)
+        self.failUnless(abs(T - T2).max() < 10**-not_so_accurate, 'wrong T')
+        self.failUnless(abs(P - P2).max() < 10**-not_so_accurate, 'wrong P')
+        self.failUnless(abs(e_var - e_var2).max() < 10**-accurate, 'wrong e_var')
+
+
+    @needs_c_nipals
+    def test_nipals_c_dtypes(self):
+        # float32 and Fortran ordered E are used as they are
+        E = mean_center(X)
+        T, P, e_var = nipals_c(E, 2, 10**-8, False)
+        for E2 in (E.astype('float32'), E.copy(order='F'), E.astype('float32').copy(order='F')):
+            T2, P2, e_var2 = nipals_c(E2, 2, 10**-8, False, overwrite_x=True)
+            self.failUnlessEqual(T2.dtype, E2.dtype, 'wrong dtype')
+            self.failUnlessEqual(e_var2.dtype, E2.dtype, 'wrong dtype')
+            self.failUnless(abs(T - T2).max() < 10**-4, 'wrong T')
+            self.failUnless(abs(P - P2).max() < 10**-4, 'wrong P')
+            self.failUnless(abs(e_var - e_var2).max() < 10**-4, 'wrong e_var')
+            # E2 was used as E, and has been deflated
+            self.failUnless(abs(E2 - E).max() > 0.1, 'E not used in place')
+
+        # arrays of wrong type or shape
+        Scores, Loadings = zeros((6, 2)), zeros((2, 4))
+        self.assertRaises(TypeError, c_nipals.nipals, Scores, Loadings, zeros((6, 4), int), 2, 10**-8)
+        self.assertRaises(TypeError, c_nipals.nipals, Scores, Loadings, zeros((6, 4), 'float32'), 2, 10**-8)
+        self.assertRaises(ValueError, c_nipals.nipals, Scores, Loadings, zeros((5, 4)), 2, 10**-8)
+        self.assertRaises(ValueError, c_nipals.nipals, Scores, Loadings, zeros((6, 4)), 3, 10**-8)
+        # residual variance arrays, both or none and (PCs, rows) and (PCs, cols)
+        self.assertRaises(TypeError, c_nipals.nipals, Scores, Loadings, zeros((6, 4)), 2, 10**-8, 1, zeros((2, 6)))
+        self.assertRaises(ValueError, c_nipals.nipals, Scores, Loadings, zeros((6, 4)), 2, 10**-8, 1, zeros((2, 6)), zeros((2, 6)))
+
+
+    @needs_c_nipals
+    def test_nipals_c_concurrent(self):
+        # fits on independent matrices from a thread pool give the serial results
+        data = [random.RandomState(i).rand(400, 300) for i in range(4)]
+        fit = lambda X_i: PCA_nipals_c(X_i, PCs=5, threads=1)
+        serial = [fit(X_i) for X_i in data]
+        with ThreadPoolExecutor(len(data)) as pool:
+            concurrent = list(pool.map(fit, data))
+
+        for (T, P, e_var), (T2, P2, e_var2) in zip(serial, concurrent):
+            self.failUnless(abs(T - T2).max() < 10**-accurate, 'wrong T')
+            self.failUnless(abs(P - P2).max() < 10**-accurate, 'wrong P')
+            self.failUnless(abs(e_var - e_var2).max() < 10**-accurate, 'wrong e_var')
+
+    @needs_c_nipals
+    def test_nipals_c_releases_gil(self):
+        # with a huge switch interval a thread only gets the GIL when it is released,
+        # so the main thread can only run while the call is running if c_nipals releases it
+        E = preprocess(random.RandomState(0).rand(1000, 300))[0]
+        Scores = zeros((1000, 3)); Loadings = zeros((3, 300))
+        entered = threading.Event(); done = threading.Event()
+
+        def call():
+            entered.set()
+            pca_module.c_nipals.nipals(Scores, Loadings, E, 3, 1e-12, 1)
+            done.set()
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1000)
+        try:
+            worker = threading.Thread(target=call)
+            worker.start()
+            entered.wait()
+            progressed = not done.is_set() # the main thread runs here while the call runs
+            worker.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.failUnless(progressed, 'the GIL is held by c_nipals.nipals')
+        self.failUnless(done.is_set(), 'c_nipals.nipals did not return')
+
+
     def test_svd(self):
         # using default parameters (should be: standardize=True)
         T, P, e_var = PCA_svd(X)       
@@ -242,6 +725,92 @@ class TestPCA(unittest.TestCase):
             self.failUnlessAlmostEqual(e_var[i], explained_var[i], not_so_accurate, 'wrong value in e_var['+str(i)+'] (svd)')
         
         
+    def test_svd_PCs(self):
+        # only the wanted PCs are returned, explained_var is still relative to all of X
+        T, P, e_var = PCA_svd(X)
+        T2, P2, e_var2 = PCA_svd(X, PCs=2)
+        self.failUnlessEqual(T2.shape, (6, 2), 'wrong shape')
+        self.failUnlessEqual(P2.shape, (2, 4), 'wrong shape')
+        self.failUnlessEqual(e_var2.shape, (2,), 'wrong shape')
+
+        for j in range(2):
+            self.failUnlessAlmostEqual(e_var2[j], e_var[j], accurate, 'wrong value in e_var[%i]' % j)
+            for i in range(len(T)):
+                self.failUnlessAlmostEqual(T2[i,j], T[i,j], accurate, 'wrong value in T[%i,%i]' % (i,j))
+
+        # economy SVD, wide X gives (rows, rows) Scores and (rows, cols) Loadings
+        T, P, e_var = PCA_svd(X.T)
+        self.failUnlessEqual(T.shape, (4, 4), 'wrong shape')
+        self.failUnlessEqual(P.shape, (4, 6), 'wrong shape')
+
+
+    def test_float32(self):
+        # with dtype='float32' everything is done in float32, PCs agree with float64 to float32_accurate places
+        for T, P, e_var in (PCA_nipals(X, dtype='float32'), PCA_nipals2(X, dtype='float32')):
+            self.check_nipals_float32(T, P, e_var)
+
+        for T, P, e_var in (PCA_svd(X, dtype='float32'), PCA_svd(X, gram=True, dtype='float32'),
+                            PCA_block(X, dtype='float32'), PCA_randomized(X, seed=0, dtype='float32'),
+                            PCA_cov(X, dtype='float32')):
+            self.failUnlessEqual((T.dtype, P.dtype, e_var.dtype), (float32, float32, float32), 'wrong dtype')
+            self.check_svd_pcs(T, P, e_var, float32_accurate)
+
+        # the preprocessing, in place in float32 X
+        X_32 = X.astype('float32')
+        X_s = standardization(X_32, out=X_32)
+        self.failUnless(X_s is X_32, 'not in place')
+        self.failUnless(abs(X_s - X_standardized).max() < 10**-float32_accurate, 'wrong X_s')
+
+    @needs_c_nipals
+    def test_float32_c(self):
+        self.check_nipals_float32(*PCA_nipals_c(X, dtype='float32'))
+
+    def check_nipals_float32(self, T, P, e_var):
+        self.failUnlessEqual((T.dtype, P.dtype, e_var.dtype), (float32, float32, float32), 'wrong dtype')
+        self.failUnless(abs(T - Scores_nipals).max() < 10**-float32_accurate, 'wrong T')
+        self.failUnless(abs(P - Loadings_nipals).max() < 10**-float32_accurate, 'wrong P')
+        self.failUnless(abs(e_var - explained_var).max() < 10**-not_so_accurate, 'wrong e_var')
+
+
+    def test_svd_gram(self):
+        # wide X, the Gram matrix gives the SVD PCs (up to sign)
+        X_wide = preprocess(X.T)[0]
+        T, P, e_var = svd_arr(X_wide)
+        T2, P2, e_var2 = svd_gram(X_wide)
+        self.failUnlessEqual(T2.shape, T.shape, 'wrong shape')
+        self.failUnlessEqual(P2.shape, P.shape, 'wrong shape')
+
+        for j in range(3): # mean centered X_wide has rank 3
+            sign = (T[:, j] * T2[:, j]).sum() > 0 and 1 or -1
+            self.failUnlessAlmostEqual(e_var2[j], e_var[j], accurate, 'wrong value in e_var[%i]' % j)
+            for i in range(len(T)):
+                self.failUnlessAlmostEqual(sign*T2[i,j], T[i,j], accurate, 'wrong value in T[%i,%i]' % (i,j))
+            for i in range(len(P[0])):
+                self.failUnlessAlmostEqual(sign*P2[j,i], P[j,i], accurate, 'wrong value in P[%i,%i]' % (j,i))
+
+    def test_svd_gram_rank_deficient(self):
+        # wide X with a decaying spectrum, the small eigenvalues of XX' are rounding error
+        rng = random.RandomState(0)
+        U = linalg.qr(rng.randn(30, 30))[0]
+        V = linalg.qr(rng.randn(3000, 30))[0]
+        X_wide = dot(U * 10.0 ** -arange(30.0), V.T)
+        T, P, e_var = svd_gram(X_wide)
+        for j in range(len(P)):
+            norm = sqrt((P[j] ** 2).sum())
+            self.failUnless(abs(norm - 1) < 1e-3 or norm == 0, 'norm of P[%i] is %g' % (j, norm))
+            if norm == 0:
+                self.failUnlessEqual(e_var[j], 0, 'e_var[%i] of a PC with no variance' % j)
+
+        # float32, 49 PCs with variance down to 5e-4 and the PC removed by mean centering
+        U = linalg.qr(rng.randn(50, 50))[0]
+        V = linalg.qr(rng.randn(20000, 50))[0]
+        X_wide = dot(U * 10.0 ** linspace(0, -3.3, 50), V.T)
+        T, P, e_var = PCA_svd(X_wide, standardize=False, dtype=float32)
+        norms = sqrt((P ** 2).sum(1))
+        self.failUnlessEqual((norms == 0).sum(), 1, 'PCs with variance are zero')
+        self.failUnless(abs(norms[:49] - 1).max() < 1e-2, 'wrong norms of P (float32)')
+
+
     def test_corr_loadings(self):
         T, P, e_var = PCA_svd(X)
         CorrLoad = CorrelationLoadings(X, T)
@@ -249,671 +818,33 @@ class TestPCA(unittest.TestCase):
         for i in range(len(Correlation_Loadings)):
             for j in range(len(Correlation_Loadings[0])):
                 self.failUnlessAlmostEqual(CorrLoad[i,j], Correlation_Loadings[i,j], accurate, 'wrong value in CorrLoad[%i,%i] (svd)' % (i,j))        
-           
-        
-        
-############## SPEED TESTING ############## 
-
-
-
-
-def speed_test():
-
-        # averaged Cheese data set:
-	Cheese = {}
-	Cheese[1] = array([[ 7.1 ,  2.7 ,  4.95,  5.35,  1.  ,  4.5 ,  6.75,  3.2 ,  3.9 ,
-		 5.2 ,  4.6 ,  5.15,  4.65,  4.9 ,  1.  ,  4.65,  4.9 ],
-	       [ 6.95,  1.95,  5.8 ,  5.65,  1.  ,  5.65,  7.15,  2.35,  3.45,
-		 5.05,  5.1 ,  5.9 ,  5.2 ,  5.1 ,  1.  ,  5.7 ,  5.  ],
-	       [ 6.55,  4.  ,  3.4 ,  2.65,  1.  ,  2.4 ,  6.3 ,  4.  ,  3.75,
-		 5.  ,  5.  ,  3.35,  4.1 ,  3.15,  1.  ,  2.2 ,  4.55],
-	       [ 6.95,  2.65,  5.35,  4.75,  1.  ,  4.9 ,  7.05,  2.55,  3.4 ,
-		 5.3 ,  5.25,  5.65,  4.4 ,  4.5 ,  1.  ,  4.55,  5.1 ],
-	       [ 7.3 ,  1.75,  6.  ,  5.35,  1.  ,  6.2 ,  7.15,  1.7 ,  3.45,
-		 5.8 ,  5.75,  6.1 ,  4.95,  4.95,  1.  ,  6.6 ,  5.1 ],
-	       [ 6.4 ,  4.05,  4.1 ,  2.95,  1.  ,  2.8 ,  6.15,  3.85,  4.  ,
-		 5.1 ,  5.  ,  4.15,  4.55,  3.6 ,  1.  ,  3.15,  4.65],
-	       [ 7.8 ,  1.6 ,  5.75,  5.65,  1.  ,  6.35,  7.8 ,  1.  ,  3.75,
-		 5.15,  5.15,  6.05,  5.05,  5.2 ,  1.  ,  7.8 ,  4.9 ],
-	       [ 7.8 ,  1.  ,  5.9 ,  5.5 ,  1.  ,  7.55,  7.95,  1.  ,  3.45,
-		 5.3 ,  5.7 ,  5.8 ,  5.05,  5.15,  1.  ,  7.65,  4.8 ],
-	       [ 6.55,  3.8 ,  3.65,  2.5 ,  1.  ,  2.15,  6.45,  3.4 ,  3.55,
-		 4.9 ,  4.75,  4.65,  4.3 ,  4.35,  1.  ,  3.15,  4.55],
-	       [ 6.75,  4.05,  3.85,  2.75,  1.9 ,  1.7 ,  6.65,  3.2 ,  3.3 ,
-		 5.  ,  4.85,  3.95,  3.6 ,  2.7 ,  1.95,  2.05,  4.6 ],
-	       [ 6.75,  4.25,  4.15,  3.35,  1.  ,  1.8 ,  6.55,  3.85,  4.05,
-		 5.2 ,  5.3 ,  4.65,  4.15,  3.6 ,  1.  ,  2.9 ,  4.95],
-	       [ 7.7 ,  1.  ,  5.9 ,  5.65,  1.  ,  6.9 ,  7.65,  1.  ,  3.65,
-		 5.05,  4.95,  6.15,  5.05,  5.5 ,  1.  ,  7.4 ,  5.15],
-	       [ 7.  ,  6.  ,  1.7 ,  1.  ,  1.  ,  1.  ,  6.65,  5.8 ,  4.2 ,
-		 5.45,  4.45,  1.6 ,  3.5 ,  1.  ,  1.  ,  1.  ,  5.15],
-	       [ 5.8 ,  5.35,  1.  ,  1.  ,  1.  ,  1.  ,  6.15,  5.95,  4.1 ,
-		 6.05,  4.95,  1.  ,  3.35,  1.  ,  1.  ,  1.  ,  4.75]])
-
-	Cheese[2] = array([[ 6.75,  1.  ,  4.65,  3.1 ,  2.6 ,  6.8 ,  7.7 ,  1.  ,  2.6 ,
-		 5.3 ,  5.5 ,  4.5 ,  2.6 ,  2.75,  2.4 ,  6.65,  2.4 ],
-	       [ 7.15,  1.  ,  4.75,  2.75,  1.65,  5.25,  6.7 ,  1.  ,  2.  ,
-		 4.9 ,  5.5 ,  4.55,  1.95,  2.6 ,  1.65,  3.65,  2.8 ],
-	       [ 6.05,  1.  ,  4.45,  3.9 ,  2.45,  7.65,  7.15,  1.  ,  2.25,
-		 5.9 ,  5.9 ,  4.55,  3.5 ,  3.45,  2.9 ,  8.2 ,  3.25],
-	       [ 5.3 ,  1.75,  4.35,  3.1 ,  1.  ,  1.  ,  6.15,  1.6 ,  2.05,
-		 5.85,  5.8 ,  3.95,  1.9 ,  3.35,  1.  ,  1.  ,  4.85],
-	       [ 5.6 ,  1.  ,  5.  ,  2.95,  1.15,  2.8 ,  6.55,  1.  ,  2.25,
-		 6.4 ,  5.95,  5.65,  2.3 ,  3.  ,  1.5 ,  3.3 ,  3.05],
-	       [ 5.95,  1.  ,  4.9 ,  2.75,  1.7 ,  3.7 ,  6.95,  1.  ,  2.15,
-		 4.6 ,  5.85,  5.1 ,  2.45,  2.35,  1.55,  3.75,  4.15],
-	       [ 8.1 ,  1.  ,  4.65,  2.95,  2.7 ,  9.  ,  7.95,  1.  ,  2.25,
-		 5.5 ,  6.2 ,  4.4 ,  3.4 ,  4.1 ,  2.45,  9.  ,  1.85],
-	       [ 7.6 ,  1.  ,  3.85,  3.8 ,  2.45,  8.45,  7.45,  1.  ,  2.3 ,
-		 5.05,  6.45,  4.35,  2.6 ,  3.9 ,  3.  ,  8.4 ,  2.95],
-	       [ 6.95,  1.  ,  5.4 ,  3.3 ,  2.  ,  5.5 ,  7.4 ,  1.  ,  2.05,
-		 4.8 ,  5.85,  5.15,  2.95,  2.95,  2.35,  6.65,  2.4 ],
-	       [ 5.5 ,  1.  ,  5.2 ,  3.1 ,  1.45,  1.  ,  5.9 ,  1.  ,  2.  ,
-		 4.85,  5.3 ,  4.9 ,  2.1 ,  3.  ,  1.  ,  1.  ,  3.35],
-	       [ 6.4 ,  1.  ,  4.9 ,  2.9 ,  1.7 ,  3.4 ,  6.55,  1.  ,  2.1 ,
-		 4.9 ,  5.6 ,  4.9 ,  2.8 ,  3.95,  1.65,  3.85,  3.4 ],
-	       [ 7.35,  1.  ,  3.85,  3.15,  2.6 ,  9.  ,  8.4 ,  1.  ,  1.95,
-		 4.5 ,  6.15,  3.9 ,  3.5 ,  3.65,  3.4 ,  9.  ,  2.2 ],
-	       [ 5.45,  5.15,  1.55,  1.  ,  1.  ,  1.  ,  6.35,  5.  ,  2.35,
-		 5.9 ,  5.9 ,  1.95,  1.9 ,  1.  ,  1.  ,  1.  ,  2.9 ],
-	       [ 5.6 ,  4.8 ,  1.5 ,  1.  ,  1.  ,  1.  ,  6.15,  4.95,  1.95,
-		 6.45,  5.4 ,  2.2 ,  1.4 ,  1.  ,  1.  ,  1.  ,  3.35]])
-
-	Cheese[3] = array([[ 6.35,  4.55,  2.65,  2.  ,  6.8 ,  3.5 ,  2.6 ,  5.5 ,  6.25,
-		 3.4 ,  3.2 ,  4.15,  5.  ],
-	       [ 6.5 ,  4.45,  2.6 ,  3.5 ,  6.65,  3.95,  2.35,  4.85,  6.5 ,
-		 2.4 ,  2.95,  3.85,  4.7 ],
-	       [ 6.6 ,  4.2 ,  3.8 ,  1.  ,  7.  ,  2.6 ,  2.65,  5.65,  6.35,
-		 4.25,  3.05,  4.05,  4.7 ],
-	       [ 5.3 ,  5.3 ,  2.9 ,  2.1 ,  6.7 ,  4.5 ,  2.4 ,  4.95,  6.35,
-		 3.35,  2.65,  2.5 ,  4.85],
-	       [ 7.4 ,  1.8 ,  4.5 ,  5.8 ,  7.95,  1.7 ,  1.8 ,  5.6 ,  6.5 ,
-		 3.8 ,  3.1 ,  5.65,  4.55],
-	       [ 5.8 ,  6.1 ,  1.45,  1.  ,  6.35,  5.45,  2.85,  4.6 ,  5.1 ,
-		 1.55,  2.1 ,  1.  ,  4.9 ],
-	       [ 6.75,  4.6 ,  4.05,  2.55,  7.15,  2.85,  2.5 ,  4.6 ,  6.3 ,
-		 4.5 ,  3.15,  5.2 ,  4.85],
-	       [ 5.7 ,  4.55,  3.55,  1.  ,  6.4 ,  4.05,  2.3 ,  4.6 ,  6.35,
-		 3.75,  2.95,  2.05,  5.1 ],
-	       [ 6.1 ,  4.75,  2.3 ,  1.  ,  6.75,  4.05,  2.8 ,  5.1 ,  6.1 ,
-		 3.  ,  2.75,  2.5 ,  4.9 ],
-	       [ 6.3 ,  3.65,  3.8 ,  1.  ,  6.9 ,  3.2 ,  2.4 ,  5.  ,  6.7 ,
-		 4.15,  3.15,  3.8 ,  4.95],
-	       [ 6.45,  4.2 ,  2.9 ,  3.  ,  6.85,  3.65,  2.1 ,  4.9 ,  6.2 ,
-		 2.75,  1.95,  3.9 ,  4.8 ],
-	       [ 6.75,  3.8 ,  3.25,  1.85,  7.3 ,  1.8 ,  2.15,  5.  ,  6.9 ,
-		 3.25,  3.1 ,  4.9 ,  4.85],
-	       [ 5.75,  5.75,  1.  ,  1.  ,  6.8 ,  4.75,  2.45,  5.6 ,  6.6 ,
-		 3.95,  3.  ,  1.  ,  4.95],
-	       [ 5.65,  5.65,  1.5 ,  1.  ,  6.75,  4.  ,  1.95,  5.65,  6.8 ,
-		 3.2 ,  2.8 ,  1.  ,  5.3 ]])
-
-	Cheese[4] = array([[ 6.5 ,  3.85,  5.  ,  2.7 ,  1.3 ,  2.55,  6.6 ,  4.7 ,  3.9 ,
-		 6.55,  6.  ,  3.15,  3.4 ,  1.55,  1.  ,  1.6 ,  4.8 ],
-	       [ 6.3 ,  3.8 ,  5.5 ,  2.35,  1.4 ,  1.7 ,  7.05,  4.05,  4.  ,
-		 6.8 ,  5.6 ,  5.55,  4.3 ,  1.9 ,  1.  ,  3.45,  4.75],
-	       [ 6.25,  3.85,  2.95,  1.75,  2.05,  1.  ,  6.55,  4.55,  3.5 ,
-		 6.1 ,  5.5 ,  3.2 ,  3.75,  1.45,  1.  ,  1.25,  4.8 ],
-	       [ 6.65,  3.25,  5.45,  2.7 ,  1.  ,  2.5 ,  6.8 ,  3.8 ,  4.3 ,
-		 5.8 ,  6.25,  5.1 ,  4.15,  2.65,  1.  ,  2.65,  4.85],
-	       [ 6.65,  3.6 ,  5.8 ,  2.5 ,  1.  ,  3.95,  7.05,  3.5 ,  4.05,
-		 7.2 ,  6.1 ,  4.75,  4.15,  1.9 ,  1.  ,  2.6 ,  4.5 ],
-	       [ 6.5 ,  5.75,  3.1 ,  2.25,  1.  ,  2.15,  6.45,  6.45,  3.95,
-		 5.5 ,  5.25,  3.05,  3.65,  2.2 ,  1.  ,  2.15,  4.55],
-	       [ 6.25,  6.3 ,  2.05,  1.  ,  1.  ,  1.  ,  6.5 ,  5.5 ,  3.85,
-		 5.75,  5.65,  3.15,  3.2 ,  2.05,  1.  ,  1.  ,  4.65],
-	       [ 7.4 ,  1.95,  7.95,  2.25,  1.  ,  5.2 ,  7.6 ,  2.5 ,  3.8 ,
-		 5.55,  5.95,  6.4 ,  4.4 ,  2.55,  1.  ,  4.15,  4.6 ],
-	       [ 6.45,  3.85,  5.05,  2.65,  1.5 ,  2.  ,  6.8 ,  3.65,  3.75,
-		 5.95,  5.35,  5.3 ,  3.8 ,  1.95,  1.  ,  3.05,  4.45],
-	       [ 6.05,  4.55,  3.35,  2.  ,  1.  ,  1.35,  6.95,  4.8 ,  4.2 ,
-		 5.75,  6.1 ,  4.1 ,  3.9 ,  2.  ,  1.4 ,  2.  ,  4.45],
-	       [ 6.1 ,  3.85,  5.25,  1.  ,  1.  ,  2.35,  7.1 ,  3.  ,  4.1 ,
-		 5.9 ,  6.05,  6.  ,  4.45,  2.05,  1.  ,  4.6 ,  4.3 ],
-	       [ 6.5 ,  3.4 ,  5.55,  2.75,  1.2 ,  3.3 ,  7.2 ,  2.25,  3.6 ,
-		 5.45,  5.5 ,  6.7 ,  4.25,  2.95,  1.  ,  4.6 ,  4.8 ],
-	       [ 6.5 ,  7.25,  1.  ,  1.  ,  1.  ,  1.  ,  7.05,  7.9 ,  4.4 ,
-		 6.2 ,  5.1 ,  1.  ,  2.9 ,  1.  ,  1.  ,  1.  ,  4.8 ],
-	       [ 6.5 ,  5.1 ,  4.1 ,  1.  ,  1.  ,  1.25,  6.9 ,  4.1 ,  4.1 ,
-		 7.5 ,  5.65,  3.9 ,  4.1 ,  1.  ,  1.  ,  1.3 ,  4.8 ]])
-
-	Cheese[5] = array([[ 6.85,  3.9 ,  3.75,  2.05,  1.7 ,  3.45,  7.2 ,  3.3 ,  2.25,
-		 5.15,  5.1 ,  4.  ,  4.  ,  2.15,  1.65,  3.5 ,  3.25],
-	       [ 6.9 ,  2.75,  4.15,  1.6 ,  1.  ,  3.75,  7.05,  2.7 ,  2.65,
-		 4.8 ,  4.6 ,  4.  ,  3.45,  1.8 ,  1.45,  3.85,  3.1 ],
-	       [ 6.4 ,  2.35,  4.9 ,  2.4 ,  1.  ,  5.05,  7.3 ,  1.75,  2.2 ,
-		 4.9 ,  5.6 ,  5.15,  4.7 ,  2.65,  1.9 ,  5.9 ,  3.55],
-	       [ 7.15,  2.35,  4.65,  2.2 ,  1.75,  4.85,  7.6 ,  1.85,  2.15,
-		 4.6 ,  5.45,  5.25,  4.1 ,  2.2 ,  2.25,  5.85,  3.25],
-	       [ 6.35,  3.5 ,  3.6 ,  1.4 ,  2.05,  3.4 ,  6.85,  3.25,  2.3 ,
-		 4.7 ,  4.4 ,  3.75,  3.55,  1.65,  2.15,  3.3 ,  3.15],
-	       [ 7.05,  2.6 ,  4.5 ,  1.85,  4.25,  4.  ,  7.2 ,  2.55,  2.75,
-		 5.05,  4.8 ,  4.45,  3.7 ,  1.6 ,  2.6 ,  4.05,  3.25],
-	       [ 7.2 ,  2.65,  4.75,  2.25,  4.2 ,  4.15,  7.45,  2.6 ,  2.55,
-		 5.1 ,  5.6 ,  5.15,  5.05,  1.8 ,  3.3 ,  4.55,  3.7 ],
-	       [ 7.  ,  2.45,  4.55,  2.25,  1.5 ,  4.7 ,  7.1 ,  2.55,  2.65,
-		 4.55,  4.45,  4.45,  3.35,  1.5 ,  1.45,  4.75,  3.1 ],
-	       [ 6.65,  3.5 ,  3.7 ,  1.85,  1.  ,  2.15,  6.35,  3.7 ,  3.05,
-		 4.65,  4.15,  3.5 ,  3.55,  1.  ,  1.  ,  2.1 ,  3.1 ],
-	       [ 6.55,  3.8 ,  3.1 ,  1.  ,  1.  ,  2.1 ,  6.5 ,  3.55,  3.05,
-		 4.5 ,  3.7 ,  3.05,  3.15,  1.  ,  1.  ,  2.25,  3.15],
-	       [ 6.7 ,  3.5 ,  3.65,  1.65,  1.4 ,  3.2 ,  6.95,  2.95,  2.45,
-		 4.95,  4.85,  4.25,  4.05,  1.75,  1.5 ,  4.25,  3.15],
-	       [ 7.  ,  2.85,  3.15,  2.05,  2.  ,  3.35,  7.45,  2.3 ,  3.25,
-		 5.1 ,  5.35,  4.8 ,  4.15,  1.75,  2.65,  5.2 ,  3.1 ],
-	       [ 6.5 ,  4.2 ,  3.15,  1.  ,  1.  ,  1.55,  6.75,  3.25,  2.5 ,
-		 4.7 ,  4.25,  3.4 ,  3.85,  1.75,  1.  ,  2.8 ,  3.05],
-	       [ 6.3 ,  5.  ,  2.2 ,  1.  ,  1.  ,  1.  ,  6.15,  5.45,  2.25,
-		 4.6 ,  2.75,  1.45,  3.35,  1.  ,  1.  ,  1.  ,  3.1 ]])
-
-	Cheese[6] = array([[ 5.5 ,  2.85,  3.2 ,  1.45,  1.  ,  4.15,  6.65,  2.6 ,  1.  ,
-		 5.75,  4.2 ,  2.4 ,  2.5 ,  1.  ,  3.45,  4.75],
-	       [ 6.3 ,  1.  ,  3.9 ,  1.  ,  1.55,  7.3 ,  5.7 ,  1.  ,  1.  ,
-		 4.75,  3.4 ,  3.65,  2.6 ,  1.  ,  5.9 ,  4.65],
-	       [ 6.  ,  4.5 ,  3.8 ,  1.  ,  1.  ,  4.3 ,  6.4 ,  3.95,  1.  ,
-		 5.7 ,  4.3 ,  2.2 ,  2.8 ,  1.  ,  2.15,  4.9 ],
-	       [ 5.65,  1.35,  3.95,  1.  ,  1.  ,  7.1 ,  5.5 ,  2.  ,  1.  ,
-		 4.25,  3.  ,  2.95,  2.6 ,  1.  ,  5.5 ,  4.85],
-	       [ 6.35,  1.  ,  4.  ,  1.  ,  1.  ,  7.45,  5.9 ,  2.05,  1.  ,
-		 5.3 ,  3.95,  3.35,  2.65,  1.  ,  7.1 ,  5.05],
-	       [ 5.85,  1.9 ,  3.25,  2.15,  1.  ,  4.8 ,  6.15,  3.5 ,  1.4 ,
-		 4.65,  3.75,  1.65,  2.3 ,  1.  ,  2.15,  4.5 ],
-	       [ 5.8 ,  2.9 ,  3.15,  1.  ,  1.  ,  4.55,  5.8 ,  2.2 ,  1.  ,
-		 4.7 ,  3.65,  3.45,  2.35,  1.  ,  4.  ,  5.  ],
-	       [ 5.9 ,  2.6 ,  3.85,  1.  ,  1.  ,  5.05,  5.95,  1.6 ,  1.  ,
-		 5.1 ,  4.05,  3.5 ,  2.9 ,  1.6 ,  5.7 ,  4.55],
-	       [ 6.15,  4.35,  3.25,  1.  ,  1.  ,  3.95,  5.9 ,  2.7 ,  1.  ,
-		 5.15,  4.  ,  3.4 ,  2.4 ,  1.  ,  4.5 ,  4.9 ],
-	       [ 5.8 ,  4.8 ,  2.85,  1.  ,  1.  ,  2.2 ,  5.9 ,  2.6 ,  1.  ,
-		 5.  ,  3.6 ,  3.2 ,  2.35,  1.  ,  3.2 ,  4.6 ],
-	       [ 6.1 ,  1.  ,  4.25,  1.  ,  1.  ,  6.7 ,  6.15,  1.5 ,  1.  ,
-		 4.5 ,  3.65,  3.65,  2.65,  1.  ,  6.65,  5.05],
-	       [ 5.9 ,  1.  ,  4.1 ,  1.65,  1.  ,  7.75,  6.  ,  1.  ,  1.  ,
-		 5.5 ,  4.35,  3.7 ,  2.3 ,  1.6 ,  7.75,  5.05],
-	       [ 6.15,  5.7 ,  1.  ,  1.  ,  1.  ,  1.  ,  6.35,  5.3 ,  1.4 ,
-		 5.1 ,  3.65,  1.  ,  2.35,  1.  ,  1.  ,  4.85],
-	       [ 5.6 ,  5.6 ,  1.75,  1.  ,  1.  ,  1.  ,  6.  ,  5.35,  1.  ,
-		 5.35,  3.9 ,  1.  ,  2.8 ,  1.  ,  1.  ,  5.15]])
-
-	Cheese[7] = array([[ 4.55,  2.15,  1.7 ,  1.  ,  1.  ,  1.  ,  5.55,  2.8 ,  2.15,
-		 3.55,  2.4 ,  2.55,  2.05,  1.  ,  1.  ,  1.  ,  4.05],
-	       [ 5.1 ,  1.7 ,  2.8 ,  1.95,  1.6 ,  1.7 ,  5.8 ,  1.75,  1.9 ,
-		 4.1 ,  2.7 ,  3.6 ,  2.25,  1.  ,  1.45,  3.35,  4.2 ],
-	       [ 5.5 ,  2.2 ,  2.8 ,  1.8 ,  1.  ,  1.45,  5.7 ,  2.8 ,  1.95,
-		 3.75,  3.5 ,  3.35,  2.15,  1.  ,  1.  ,  1.3 ,  4.5 ],
-	       [ 4.95,  2.1 ,  2.5 ,  1.  ,  1.  ,  1.75,  5.65,  2.25,  1.9 ,
-		 3.65,  3.2 ,  2.45,  2.5 ,  1.  ,  1.05,  2.15,  4.15],
-	       [ 6.5 ,  1.  ,  3.65,  1.4 ,  1.  ,  4.7 ,  6.05,  1.  ,  1.9 ,
-		 3.9 ,  3.7 ,  3.6 ,  2.75,  1.75,  1.  ,  5.1 ,  4.15],
-	       [ 5.4 ,  1.75,  2.95,  1.5 ,  1.3 ,  2.  ,  5.85,  2.25,  2.25,
-		 4.35,  3.15,  3.55,  2.25,  1.6 ,  1.35,  2.6 ,  4.35],
-	       [ 5.4 ,  1.5 ,  3.25,  1.6 ,  1.4 ,  2.7 ,  6.05,  1.4 ,  2.1 ,
-		 2.75,  3.6 ,  3.1 ,  2.25,  1.05,  1.75,  3.2 ,  4.  ],
-	       [ 5.3 ,  1.8 ,  3.25,  1.4 ,  1.  ,  1.45,  6.  ,  1.4 ,  1.9 ,
-		 3.45,  3.45,  3.7 ,  3.45,  2.  ,  1.7 ,  3.25,  3.85],
-	       [ 4.85,  2.15,  2.  ,  1.4 ,  1.  ,  1.  ,  5.6 ,  2.1 ,  2.2 ,
-		 3.7 ,  2.85,  3.4 ,  2.55,  1.35,  1.  ,  1.6 ,  4.  ],
-	       [ 4.75,  1.4 ,  2.5 ,  1.9 ,  1.  ,  1.  ,  5.7 ,  1.5 ,  2.1 ,
-		 3.65,  2.85,  3.15,  1.9 ,  1.  ,  1.35,  3.2 ,  4.  ],
-	       [ 5.4 ,  2.6 ,  3.15,  1.55,  1.45,  1.  ,  5.7 ,  2.6 ,  2.15,
-		 4.25,  3.05,  2.9 ,  2.75,  1.  ,  1.25,  2.4 ,  3.95],
-	       [ 5.55,  1.  ,  3.75,  2.1 ,  1.  ,  4.2 ,  6.05,  1.4 ,  2.2 ,
-		 3.55,  3.4 ,  3.85,  2.65,  1.75,  1.35,  4.45,  4.1 ],
-	       [ 5.5 ,  3.15,  2.15,  1.  ,  1.  ,  1.  ,  5.7 ,  3.8 ,  2.2 ,
-		 3.6 ,  3.35,  2.2 ,  1.6 ,  1.  ,  1.  ,  1.  ,  3.7 ],
-	       [ 5.15,  2.5 ,  1.4 ,  1.  ,  1.  ,  1.  ,  5.7 ,  3.2 ,  2.1 ,
-		 4.15,  2.85,  1.45,  2.1 ,  1.  ,  1.  ,  1.  ,  4.2 ]])
-
-	Cheese[8] = array([[ 5.75,  3.5 ,  3.6 ,  1.6 ,  2.5 ,  6.55,  3.2 ,  2.95,  5.75,
-		 3.95,  3.25,  3.  ,  1.65,  1.  ,  2.35,  4.55],
-	       [ 5.75,  4.3 ,  3.5 ,  1.75,  1.4 ,  5.95,  4.9 ,  3.05,  5.5 ,
-		 4.1 ,  3.55,  2.75,  1.55,  1.6 ,  1.5 ,  4.75],
-	       [ 5.85,  4.1 ,  2.8 ,  1.85,  1.85,  6.15,  4.75,  2.7 ,  4.9 ,
-		 3.4 ,  3.25,  2.7 ,  1.  ,  1.  ,  2.05,  4.65],
-	       [ 6.3 ,  2.75,  4.5 ,  2.4 ,  2.85,  6.45,  3.55,  2.8 ,  4.7 ,
-		 4.05,  4.7 ,  3.1 ,  1.2 ,  1.  ,  3.  ,  4.65],
-	       [ 6.85,  1.  ,  5.5 ,  4.15,  4.95,  7.8 ,  1.  ,  2.  ,  4.95,
-		 5.35,  5.75,  2.7 ,  3.9 ,  1.  ,  5.35,  4.3 ],
-	       [ 6.1 ,  3.7 ,  3.75,  2.25,  2.2 ,  6.1 ,  4.2 ,  3.1 ,  4.7 ,
-		 3.3 ,  3.8 ,  2.5 ,  1.25,  1.  ,  1.8 ,  5.05],
-	       [ 6.85,  1.65,  5.45,  3.6 ,  3.95,  7.6 ,  1.  ,  2.4 ,  4.7 ,
-		 4.55,  5.3 ,  3.8 ,  3.6 ,  1.  ,  4.6 ,  4.3 ],
-	       [ 6.25,  3.35,  4.9 ,  1.55,  1.9 ,  6.15,  3.9 ,  2.5 ,  4.85,
-		 4.05,  4.5 ,  3.3 ,  1.55,  1.  ,  1.95,  4.45],
-	       [ 5.95,  3.85,  3.55,  2.25,  2.15,  6.3 ,  3.35,  2.95,  4.85,
-		 3.95,  3.7 ,  3.3 ,  1.85,  1.  ,  2.35,  4.3 ],
-	       [ 5.4 ,  4.05,  3.55,  1.3 ,  1.55,  5.6 ,  3.9 ,  2.7 ,  4.6 ,
-		 3.35,  4.25,  2.75,  1.3 ,  1.  ,  1.55,  4.35],
-	       [ 6.  ,  3.45,  4.45,  2.85,  3.25,  7.3 ,  1.  ,  2.3 ,  4.75,
-		 4.55,  5.  ,  3.  ,  3.8 ,  1.  ,  4.95,  4.35],
-	       [ 6.15,  2.1 ,  4.9 ,  3.25,  3.2 ,  6.5 ,  2.05,  2.5 ,  4.7 ,
-		 4.  ,  4.85,  3.2 ,  2.6 ,  1.  ,  3.75,  4.4 ],
-	       [ 5.75,  5.75,  1.5 ,  1.  ,  1.  ,  5.6 ,  6.  ,  3.45,  5.4 ,
-		 3.5 ,  1.5 ,  2.75,  1.  ,  1.  ,  1.  ,  5.  ],
-	       [ 5.95,  4.45,  3.1 ,  1.  ,  1.45,  6.1 ,  4.85,  2.45,  6.2 ,
-		 4.3 ,  2.3 ,  2.25,  1.  ,  1.  ,  1.  ,  5.1 ]])
-
-	Cheese[9] = array([[ 6.4 ,  5.45,  1.4 ,  1.  ,  1.  ,  1.  ,  6.5 ,  4.65,  2.55,
-		 3.15,  3.15,  1.65,  1.  ,  1.  ,  1.  ,  1.  ,  2.9 ],
-	       [ 8.  ,  1.55,  5.9 ,  4.65,  1.  ,  4.9 ,  8.05,  1.45,  1.4 ,
-		 3.1 ,  5.25,  3.95,  2.35,  4.65,  3.45,  4.1 ,  2.7 ],
-	       [ 6.9 ,  4.7 ,  1.85,  1.9 ,  1.  ,  1.7 ,  6.9 ,  5.15,  3.05,
-		 3.1 ,  3.05,  1.65,  1.  ,  1.55,  1.55,  1.6 ,  2.5 ],
-	       [ 7.  ,  4.85,  1.95,  1.  ,  1.  ,  1.  ,  6.65,  4.75,  2.5 ,
-		 2.85,  2.8 ,  1.9 ,  1.  ,  1.  ,  1.4 ,  1.  ,  2.05],
-	       [ 7.3 ,  3.05,  4.4 ,  2.1 ,  1.  ,  2.15,  7.75,  3.45,  2.1 ,
-		 3.8 ,  5.05,  3.9 ,  2.15,  3.05,  2.45,  3.  ,  2.4 ],
-	       [ 6.5 ,  4.2 ,  1.9 ,  1.65,  1.  ,  1.6 ,  6.3 ,  5.05,  2.4 ,
-		 2.7 ,  2.7 ,  1.65,  1.  ,  1.7 ,  1.45,  2.  ,  2.95],
-	       [ 7.95,  1.  ,  5.1 ,  4.15,  2.  ,  3.5 ,  7.7 ,  1.  ,  1.85,
-		 2.95,  5.15,  4.9 ,  1.  ,  3.75,  3.05,  4.5 ,  2.55],
-	       [ 7.35,  4.1 ,  3.  ,  2.1 ,  1.  ,  2.15,  7.55,  3.8 ,  1.75,
-		 2.2 ,  4.2 ,  3.95,  2.3 ,  3.55,  3.  ,  3.  ,  2.65],
-	       [ 7.5 ,  1.  ,  3.9 ,  3.55,  1.  ,  3.25,  6.95,  1.  ,  2.6 ,
-		 3.75,  4.8 ,  4.4 ,  2.35,  4.45,  3.8 ,  4.25,  2.75],
-	       [ 6.65,  2.8 ,  2.95,  1.  ,  1.  ,  1.  ,  6.7 ,  4.6 ,  2.3 ,
-		 2.75,  2.75,  2.1 ,  1.  ,  1.  ,  1.  ,  1.  ,  2.6 ],
-	       [ 6.75,  3.05,  3.6 ,  3.2 ,  1.  ,  2.8 ,  7.7 ,  1.8 ,  1.75,
-		 2.85,  5.5 ,  4.45,  2.6 ,  4.9 ,  4.35,  4.6 ,  2.3 ],
-	       [ 7.85,  1.  ,  4.75,  4.95,  2.1 ,  3.95,  7.7 ,  1.  ,  1.95,
-		 3.65,  4.9 ,  3.7 ,  2.7 ,  5.  ,  3.85,  3.8 ,  2.15],
-	       [ 7.1 ,  4.6 ,  1.25,  1.65,  1.  ,  1.6 ,  6.55,  4.8 ,  2.4 ,
-		 3.25,  3.65,  1.85,  1.  ,  1.85,  2.65,  1.8 ,  2.55],
-	       [ 6.65,  5.5 ,  1.85,  1.  ,  1.  ,  1.  ,  7.15,  5.25,  2.05,
-		 3.35,  4.25,  1.35,  1.  ,  1.  ,  1.3 ,  1.  ,  1.65]])
-
-	Cheese[10] = array([[ 4.2 ,  4.15,  1.45,  2.3 ,  1.55,  1.45,  5.05,  3.5 ,  1.8 ,
-		 2.5 ,  2.55,  2.35,  2.5 ,  2.9 ,  1.35,  3.5 ,  4.25],
-	       [ 4.8 ,  3.  ,  1.65,  2.05,  1.5 ,  2.7 ,  5.45,  2.9 ,  1.6 ,
-		 1.9 ,  2.65,  1.3 ,  1.9 ,  1.95,  1.  ,  3.25,  5.05],
-	       [ 5.9 ,  4.2 ,  3.45,  1.4 ,  1.  ,  2.7 ,  5.7 ,  3.15,  1.5 ,
-		 2.9 ,  3.9 ,  2.65,  2.7 ,  2.1 ,  1.9 ,  4.35,  4.85],
-	       [ 5.4 ,  4.1 ,  1.4 ,  1.25,  1.  ,  1.6 ,  6.5 ,  3.05,  1.4 ,
-		 2.7 ,  3.75,  1.4 ,  1.55,  1.7 ,  1.  ,  2.95,  4.8 ],
-	       [ 6.5 ,  3.55,  2.6 ,  1.65,  1.3 ,  3.5 ,  5.8 ,  2.65,  1.4 ,
-		 2.7 ,  3.75,  2.25,  1.9 ,  1.8 ,  1.  ,  4.35,  4.85],
-	       [ 4.95,  4.35,  1.5 ,  1.  ,  1.  ,  1.  ,  4.75,  3.95,  1.75,
-		 2.8 ,  3.65,  2.  ,  1.95,  2.5 ,  1.75,  2.7 ,  5.55],
-	       [ 5.2 ,  4.2 ,  1.55,  1.  ,  1.  ,  1.  ,  5.6 ,  4.  ,  1.45,
-		 3.  ,  3.9 ,  2.25,  2.85,  1.9 ,  1.  ,  2.  ,  4.75],
-	       [ 7.  ,  3.95,  2.1 ,  1.85,  1.  ,  2.3 ,  6.35,  3.7 ,  1.65,
-		 2.4 ,  3.65,  1.55,  1.25,  2.2 ,  1.4 ,  4.9 ,  4.15],
-	       [ 7.  ,  4.85,  1.9 ,  2.05,  1.  ,  1.9 ,  6.7 ,  3.8 ,  1.6 ,
-		 3.85,  4.55,  2.65,  2.9 ,  2.1 ,  1.7 ,  3.75,  4.95],
-	       [ 6.2 ,  2.9 ,  2.95,  1.  ,  1.  ,  1.  ,  5.75,  3.2 ,  1.2 ,
-		 2.6 ,  4.4 ,  3.15,  1.65,  2.1 ,  1.6 ,  4.9 ,  5.  ],
-	       [ 5.7 ,  3.4 ,  2.05,  1.7 ,  1.  ,  2.35,  5.05,  2.1 ,  1.55,
-		 1.95,  2.4 ,  1.35,  1.8 ,  2.6 ,  2.3 ,  3.15,  5.1 ],
-	       [ 5.5 ,  4.25,  1.9 ,  1.35,  1.  ,  3.2 ,  5.3 ,  3.2 ,  1.3 ,
-		 2.2 ,  4.3 ,  1.35,  2.  ,  3.3 ,  1.4 ,  4.35,  5.  ],
-	       [ 6.4 ,  4.65,  1.25,  1.  ,  1.  ,  1.  ,  5.45,  3.65,  1.7 ,
-		 2.7 ,  2.35,  1.  ,  1.65,  1.8 ,  1.  ,  1.35,  5.05],
-	       [ 6.1 ,  4.55,  2.05,  1.  ,  1.  ,  1.  ,  4.85,  3.2 ,  1.5 ,
-		 2.55,  2.65,  1.25,  2.1 ,  1.  ,  1.  ,  1.  ,  4.45]])
-
-	Cheese[11] = array([[ 4.05,  2.4 ,  2.25,  1.3 ,  1.25,  1.  ,  4.3 ,  3.15,  1.8 ,
-		 3.  ,  1.7 ,  1.  ,  1.  ,  1.2 ,  1.25,  1.2 ,  3.8 ],
-	       [ 4.5 ,  2.25,  1.65,  1.  ,  1.  ,  1.  ,  3.45,  2.1 ,  1.3 ,
-		 1.95,  1.15,  1.  ,  1.  ,  1.  ,  1.  ,  1.  ,  3.05],
-	       [ 4.9 ,  2.05,  5.1 ,  1.75,  1.  ,  1.55,  4.15,  3.5 ,  1.55,
-		 3.2 ,  1.6 ,  2.  ,  1.45,  1.3 ,  1.  ,  1.45,  3.9 ],
-	       [ 6.  ,  2.15,  5.1 ,  1.7 ,  1.35,  4.75,  4.4 ,  2.4 ,  1.55,
-		 2.35,  1.9 ,  1.8 ,  1.5 ,  1.  ,  1.  ,  1.8 ,  3.2 ],
-	       [ 6.1 ,  2.2 ,  4.65,  1.7 ,  1.  ,  5.6 ,  5.15,  2.55,  2.05,
-		 3.1 ,  2.9 ,  3.45,  2.05,  1.55,  1.  ,  4.  ,  3.85],
-	       [ 4.55,  3.55,  3.45,  1.25,  1.8 ,  2.5 ,  4.1 ,  2.5 ,  1.9 ,
-		 2.4 ,  1.8 ,  1.9 ,  1.  ,  1.  ,  1.6 ,  2.05,  3.6 ],
-	       [ 4.25,  1.6 ,  4.  ,  1.5 ,  1.5 ,  1.85,  5.1 ,  1.9 ,  1.8 ,
-		 3.45,  3.25,  4.55,  2.75,  1.45,  1.9 ,  1.95,  3.5 ],
-	       [ 5.9 ,  2.05,  4.75,  1.6 ,  1.4 ,  4.2 ,  5.2 ,  2.2 ,  1.9 ,
-		 2.05,  3.7 ,  3.5 ,  1.45,  1.4 ,  1.4 ,  3.45,  3.8 ],
-	       [ 4.45,  2.5 ,  3.25,  2.4 ,  1.  ,  1.4 ,  4.2 ,  2.7 ,  2.  ,
-		 3.2 ,  2.45,  2.6 ,  1.  ,  1.55,  1.  ,  1.9 ,  3.75],
-	       [ 4.8 ,  2.65,  2.9 ,  1.25,  1.2 ,  1.9 ,  4.75,  2.85,  1.85,
-		 3.1 ,  2.6 ,  2.65,  1.95,  2.1 ,  1.55,  2.35,  3.8 ],
-	       [ 5.6 ,  2.6 ,  4.55,  2.3 ,  1.25,  4.05,  6.  ,  2.55,  1.85,
-		 2.65,  3.65,  4.8 ,  2.4 ,  1.45,  1.25,  5.2 ,  3.9 ],
-	       [ 5.1 ,  2.55,  4.8 ,  1.45,  2.5 ,  2.85,  5.2 ,  2.05,  2.2 ,
-		 3.5 ,  2.05,  4.9 ,  1.65,  2.  ,  2.25,  3.15,  4.8 ],
-	       [ 4.35,  2.8 ,  1.2 ,  1.2 ,  1.  ,  1.  ,  4.45,  3.  ,  1.45,
-		 2.4 ,  1.15,  1.  ,  1.15,  1.  ,  1.  ,  1.  ,  3.65],
-	       [ 4.15,  3.05,  1.  ,  1.3 ,  1.  ,  1.  ,  4.9 ,  3.4 ,  1.65,
-		 3.25,  1.35,  1.  ,  1.  ,  1.  ,  1.  ,  1.  ,  4.1 ]])
-
-	Cheese[12] = array([[ 4.75,  4.5 ,  3.5 ,  2.05,  1.  ,  1.  ,  5.  ,  7.05,  1.25,
-		 4.75,  6.55,  2.  ,  1.7 ,  2.8 ,  1.35,  1.4 ,  4.75],
-	       [ 4.65,  5.15,  1.4 ,  1.  ,  1.  ,  1.75,  5.05,  5.15,  1.  ,
-		 3.5 ,  2.85,  1.  ,  1.35,  1.  ,  1.  ,  1.2 ,  4.3 ],
-	       [ 6.5 ,  4.75,  2.95,  1.3 ,  1.  ,  1.9 ,  4.65,  4.3 ,  1.  ,
-		 4.  ,  4.1 ,  2.15,  1.3 ,  1.25,  1.  ,  1.85,  4.05],
-	       [ 6.4 ,  5.6 ,  4.05,  1.  ,  1.  ,  1.9 ,  4.9 ,  4.45,  1.  ,
-		 4.55,  5.8 ,  2.55,  1.5 ,  1.1 ,  1.5 ,  1.05,  5.95],
-	       [ 6.8 ,  5.7 ,  3.05,  1.  ,  1.  ,  2.75,  4.55,  5.7 ,  1.  ,
-		 5.45,  3.45,  1.  ,  1.25,  1.  ,  1.4 ,  2.1 ,  2.95],
-	       [ 6.45,  6.2 ,  4.25,  2.25,  1.  ,  1.75,  5.75,  5.65,  1.35,
-		 2.85,  4.8 ,  2.5 ,  1.  ,  2.  ,  1.45,  2.2 ,  5.75],
-	       [ 5.7 ,  5.05,  3.6 ,  1.  ,  1.1 ,  1.3 ,  6.  ,  5.8 ,  1.  ,
-		 4.4 ,  5.3 ,  1.85,  2.2 ,  1.4 ,  1.95,  2.45,  2.6 ],
-	       [ 6.3 ,  5.5 ,  3.35,  1.  ,  1.  ,  1.5 ,  5.  ,  4.7 ,  1.4 ,
-		 2.8 ,  5.95,  2.25,  1.2 ,  1.3 ,  1.  ,  1.55,  4.2 ],
-	       [ 3.35,  3.65,  1.2 ,  1.25,  1.  ,  1.55,  5.4 ,  5.  ,  1.  ,
-		 3.3 ,  7.2 ,  1.  ,  1.25,  1.35,  1.55,  1.7 ,  2.55],
-	       [ 5.2 ,  4.6 ,  1.6 ,  1.  ,  1.  ,  1.9 ,  6.  ,  5.9 ,  1.  ,
-		 4.35,  3.7 ,  1.4 ,  1.4 ,  1.  ,  1.25,  1.  ,  3.75],
-	       [ 4.75,  3.55,  2.7 ,  1.2 ,  1.  ,  1.5 ,  4.3 ,  3.75,  1.25,
-		 4.1 ,  3.9 ,  2.05,  1.  ,  1.  ,  1.2 ,  1.15,  4.3 ],
-	       [ 4.65,  3.85,  3.6 ,  1.  ,  1.  ,  2.7 ,  6.25,  4.1 ,  1.  ,
-		 3.75,  5.15,  2.7 ,  1.  ,  1.2 ,  1.45,  2.45,  3.4 ],
-	       [ 3.45,  2.95,  1.2 ,  1.  ,  1.  ,  1.  ,  5.5 ,  4.65,  1.  ,
-		 5.5 ,  3.95,  1.  ,  1.  ,  1.25,  1.  ,  1.  ,  3.45],
-	       [ 4.35,  4.4 ,  1.7 ,  1.  ,  1.  ,  1.2 ,  5.5 ,  5.6 ,  1.  ,
-		 4.55,  4.6 ,  1.45,  1.25,  1.  ,  1.  ,  1.  ,  4.65]]) 
- 
- 
-        
-        ost = True
-        N = 1000
-        M = 1000
-        times = 10
-        t = 0.0001
-        PCs = 4
+
+    def test_corr_loadings_chunks(self):
+        # the same correlation loadings from any chunk size, and from a .npy file
+        fd, path = tempfile.mkstemp('.npy'); os.close(fd)
+        try:
+            save(path, X)
+            for CorrLoad in (CorrelationLoadings(X, Scores_svd, 1), CorrelationLoadings(X, Scores_svd, 3),
+                             CorrelationLoadings(path, Scores_svd, 2)):
+                for i in range(len(Correlation_Loadings)):
+                    for j in range(len(Correlation_Loadings[0])):
+                        self.failUnlessAlmostEqual(CorrLoad[i,j], Correlation_Loadings[i,j], accurate, 'wrong value in CorrLoad[%i,%i]' % (i,j))
+        finally:
+            os.remove(path)
+
+    def test_benchmarks(self):
+        from benchmarks.suite import cases, compare, run
+        self.failUnlessEqual(len(cases('full', ['svd'])), 4 * 2 * 2, 'wrong number of cases')
+        results = run('quick', ['svd', 'cov'], repeat=1, report=None)
+        self.failUnlessEqual(len(results['results']), 4, 'wrong number of results')
+        for result in results['results']:
+            self.failUnless(0 < result['min'] <= result['median'], 'wrong times of %s' % result['name'])
+        # a copy of the results that ran twice as fast is a regression of +100%
+        baseline = {'results': [dict(result, median=result['median'] / 2) for result in results['results']]}
+        changes, regressions = compare(results, baseline, threshold=50)
+        self.failUnlessEqual(len(regressions), 4, 'regressions not found')
+        self.failUnlessAlmostEqual(changes[0][3], 100.0, accurate, 'wrong change')
         
-        r = zeros((M, N), float)
-        for i in range(0, M):
-            r[i] = random.rand(N)
         
-
-	if ost:
-	    X = Cheese
-	else:
-            X = r
-        """
-	print 
-	print "nipals numeric array (5x)"
-	c0 = time.clock()
-	#T1, P1, explained_var1 = PCA_nipals(Ost, False)
-	#T1, P1, explained_var1 = PCA_nipals(Ost, False)
-	#T1, P1, explained_var1 = PCA_nipals(Ost, False)
-	#T1, P1, explained_var1 = PCA_nipals(Ost, False)
-	#T1, P1, explained_var1 = PCA_nipals(Ost, False)
-	cpu_time = time.clock() - c0
-	print "time: " + str(cpu_time*1000) + " ms\n"
-	#print T1
-	#print P1
-	#print explained_var1
-
-	print 
-	print "nipals c (5x)"
-	c0 = time.clock()
-	#T2, P2, explained_var2 = PCA_nipals_c(Ost, False)
-	#T2, P2, explained_var2 = PCA_nipals_c(Ost, False)
-	#T2, P2, explained_var2 = PCA_nipals_c(Ost, False)
-	#T2, P2, explained_var2 = PCA_nipals_c(Ost, False)
-	#T2, P2, explained_var2 = PCA_nipals_c(Ost, False)
-	cpu_time = time.clock() - c0
-	print "time: " + str(cpu_time*1000) + " ms\n"
-	#print T2
-	#print P2
-	#print explained_var2
-        """
- 
-
- 
-	#print T1
-	#print P1
-	#print explained_var1
-
-        if ost:
-		print(str(len(list(Cheese.keys()))) + "X PCA of matrix A (cheese data set)")
-		print("Scores, loadings and total explained variances are retrieved")
-		print()
-                (rows, cols) = shape(X[1])
-
-                PCs_ = PCs #min(rows, cols)
-                PCs_2 = PCs #min(rows, cols)
-                
-
-		print("numpy.linalg.svd PCA (numpy array)")
-		c0 = time.clock()
-		for i in list(Cheese.keys()):
-		    T1, P1, explained_var1 = PCA_svd(X[i], False)
-		cpu_time = time.clock() - c0
-		print(str(min(rows, cols)) + " PCs, time: " + str(cpu_time*1000) + " ms\n")  
-
-               
-		print("py-nipals PCA (numpy matrix)")
-		c0 = time.clock()
-		for i in list(Cheese.keys()):
-		    #pass
-		    T2, P2, explained_var2 = PCA_nipals(X[i], False, PCs_, t)
-		cpu_time = time.clock() - c0
-		print(str(PCs_) + " PCs, time: " + str(cpu_time*1000) + " ms\n")
-		#print T2
-		#print P2
-		#print explained_var2
-
-		print("py-nipals PCA (numpy array)")
-		c0 = time.clock()
-		for i in list(Cheese.keys()):
-		    #pass
-		    T3, P3, explained_var3 = PCA_nipals2(X[i], False, PCs_, t)
-		cpu_time = time.clock() - c0
-		print(str(PCs_) + " PCs, time: " + str(cpu_time*1000) + " ms\n")
-		#print T3
-		#print P3
-		#print explained_var3
-
-		print("c-nipals PCA (numpy array)")
-		c0 = time.clock()
-		for i in list(Cheese.keys()):
-		    T4, P4, explained_var4 = PCA_nipals_c(X[i], False, PCs_2, t)
-		cpu_time = time.clock() - c0
-		print(str(PCs_2) + " PCs, time: " + str(cpu_time*1000) + " ms\n")
-		#print T4
-		#print P4
-		#print explained_var4
-
-
- 
- 
- 
- 
- 
- 
-        else:
-
-		print(str(times) + "X PCA of matrix A (" + str(M) + " x " + str(N) + ") of random values")
-		print("Scores, loadings and total explained variances are retrieved")
-		print()
-
-
-
-
-
-		#print T1
-		#print P1
-		#print explained_var1
-
-		print("py nipals PCA (numpy matrix)")
-		c0 = time.clock()
-		for i in range(0, times):
-		    #pass
-		    T2, P2, explained_var2 = PCA_nipals(X, False, PCs, t)
-		cpu_time = time.clock() - c0
-		print(str(PCs) + " PCs, time: " + str(cpu_time*1000) + " ms\n")
-		#print T2
-		#print P2
-		#print explained_var2
-
-		print("py nipals PCA (numpy array)")
-		c0 = time.clock()
-		for i in range(0, times):
-		    #pass
-		    T3, P3, explained_var3 = PCA_nipals2(X, False, PCs, t)
-		cpu_time = time.clock() - c0
-		print(str(PCs) + " PCs, time: " + str(cpu_time*1000) + " ms\n")
-		#print T3
-		#print P3
-		#print explained_var3
-
-		print("c nipals PCA (numpy array)")
-		c0 = time.clock()
-		for i in range(0, times):
-		    T4, P4, explained_var4 = PCA_nipals_c(X, False, PCs, t)
-		cpu_time = time.clock() - c0
-		print(str(PCs) + " PCs, time: " + str(cpu_time*1000) + " ms\n")
-		#print T4
-		#print P4
-		#print explained_var4
-
-		print("numpy.linalg.svd PCA (numpy array)")
-		c0 = time.clock()
-		for i in range(0, times):
-		    T1, P1, explained_var1 = PCA_svd(X, False)
-		cpu_time = time.clock() - c0
-		print(str(min(N,M)) + " PCs, time: " + str(cpu_time*1000) + " ms\n")
-
-
-"""
-
-12X PCA of matrix A (cheese data set)
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-14 PCs, time: 20.0 ms
-
-py-nipals PCA (numpy matrix)
-14 PCs, time: 930.0 ms
-
-py-nipals PCA (numpy array)
-14 PCs, time: 950.0 ms
-
-c-nipals PCA (numpy array)
-14 PCs, time: 10.0 ms
-
-
-12X PCA of matrix A (cheese data set)
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-14 PCs, time: 20.0 ms
-
-py-nipals PCA (numpy matrix)
-4 PCs, time: 290.0 ms
-
-py-nipals PCA (numpy array)
-4 PCs, time: 340.0 ms
-
-c-nipals PCA (numpy array)
-4 PCs, time: 10.0 ms
-
-
-
-
-
-1X PCA of matrix A (17 x 336) of random values
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-17 PCs, time: 50.0 ms
-
-py nipals PCA (numpy matrix)
-4 PCs, time: 420.0 ms
-
-py nipals PCA (numpy array)
-4 PCs, time: 590.0 ms
-
-c nipals PCA (numpy array)
-17 PCs, time: 20.0 ms
-
-
-
-12X PCA of matrix A (17 x 28) of random values
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-17 PCs, time: 20.0 ms
-
-py nipals PCA (numpy matrix)
-4 PCs, time: 530.0 ms
-
-py nipals PCA (numpy array)
-4 PCs, time: 600.0 ms
-
-c nipals PCA (numpy array)
-17 PCs, time: 10.0 ms
-
-
-
-15X PCA of matrix A (40 x 20) of random values
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-20 PCs, time: 40.0 ms
-
-py nipals PCA (numpy matrix)
-20 PCs, time: 5260.0 ms
-
-py nipals PCA (numpy array)
-20 PCs, time: 5450.0 ms
-
-c nipals PCA (numpy array)
-20 PCs, time: 40.0 ms
-
-
-
-1X PCA of matrix A (1000 x 200) of random values
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-200 PCs, time: 2420.0 ms
-
-py nipals PCA (numpy matrix)
-4 PCs, time: 14710.0 ms
-
-py nipals PCA (numpy array)
-4 PCs, time: 6470.0 ms
-
-c nipals PCA (numpy array)
-200 PCs, time: 8110.0 ms
-
-
-
-1X PCA of matrix A (2000 x 100) of random values
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-100 PCs, time: 8770.0 ms
-
-py nipals PCA (numpy matrix)
-4 PCs, time: 15100.0 ms
-
-py nipals PCA (numpy array)
-4 PCs, time: 12880.0 ms
-
-c nipals PCA (numpy array)
-100 PCs, time: 4700.0 ms
-
-
-
-10X PCA of matrix A (1000 x 1000) of random values
-Scores, loadings and total explained variances are retrieved
-
-numpy.linalg.svd PCA (numpy array)
-1000 PCs, time: 118620.0 ms
-
-py nipals PCA (numpy matrix)
-4 PCs, time: 765490.0 ms
-
-py nipals PCA (numpy array)
-4 PCs, time: 188840.0 ms
-
-c nipals PCA (numpy array)
-4 PCs, time: 18740.0 ms
-
-"""
-
-
 if __name__ == '__main__':
-    speed_test()
     unittest.main()